@@ -0,0 +1,46 @@
+"""add_lease_columns_to_extraction_requests
+
+Revision ID: d4e5f6a7b8c9
+Revises: 1c1f10d637dc
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4e5f6a7b8c9'
+down_revision = '1c1f10d637dc'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add lease tracking so several cron workers can drain the queue in parallel."""
+    with op.batch_alter_table("extraction_requests", schema="condition") as batch_op:
+        batch_op.add_column(sa.Column("lease_owner", sa.String(255), nullable=True))
+        batch_op.add_column(sa.Column("lease_expires_at", sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column("processing_started_at", sa.DateTime(), nullable=True))
+        batch_op.create_index(
+            "ix_condition_extraction_requests_status_created_date",
+            ["status", "created_date"],
+        )
+
+    op.execute(
+        """
+        UPDATE condition.extraction_requests
+        SET processing_started_at = updated_date
+        WHERE status = 'processing'
+          AND processing_started_at IS NULL
+        """
+    )
+
+
+def downgrade():
+    """Remove extraction request lease tracking."""
+    with op.batch_alter_table("extraction_requests", schema="condition") as batch_op:
+        batch_op.drop_index("ix_condition_extraction_requests_status_created_date")
+        batch_op.drop_column("processing_started_at")
+        batch_op.drop_column("lease_expires_at")
+        batch_op.drop_column("lease_owner")
@@ -0,0 +1,31 @@
+"""add_checkpoint_data_to_extraction_requests
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5f6a7b8c9d0'
+down_revision = 'd4e5f6a7b8c9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Store partial extraction progress so a re-claimed request can resume."""
+    with op.batch_alter_table("extraction_requests", schema="condition") as batch_op:
+        batch_op.add_column(
+            sa.Column("checkpoint_data", postgresql.JSONB(astext_type=sa.Text()), nullable=True)
+        )
+
+
+def downgrade():
+    """Remove extraction checkpoint storage."""
+    with op.batch_alter_table("extraction_requests", schema="condition") as batch_op:
+        batch_op.drop_column("checkpoint_data")
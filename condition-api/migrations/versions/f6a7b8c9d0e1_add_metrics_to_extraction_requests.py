@@ -0,0 +1,31 @@
+"""add_metrics_to_extraction_requests
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6a7b8c9d0e1'
+down_revision = 'e5f6a7b8c9d0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Store per-stage timings and LLM token usage for each extraction run."""
+    with op.batch_alter_table("extraction_requests", schema="condition") as batch_op:
+        batch_op.add_column(
+            sa.Column("metrics", postgresql.JSONB(astext_type=sa.Text()), nullable=True)
+        )
+
+
+def downgrade():
+    """Remove extraction run metrics."""
+    with op.batch_alter_table("extraction_requests", schema="condition") as batch_op:
+        batch_op.drop_column("metrics")
@@ -2,7 +2,7 @@
 
 Tracks documents uploaded via the UI pending cron-based extraction.
 """
-from sqlalchemy import Column, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 
@@ -28,6 +28,11 @@ class ExtractionRequest(BaseModel):
     status = Column(String(50), nullable=False, default='pending')
     error_message = Column(Text, nullable=True)
     extracted_data = Column(JSONB, nullable=True)
+    lease_owner = Column(String(255), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    processing_started_at = Column(DateTime, nullable=True)
+    checkpoint_data = Column(JSONB, nullable=True)
+    metrics = Column(JSONB, nullable=True)
     uploaded_by_staff_user = relationship('StaffUser', foreign_keys=[uploaded_by_staff_user_id])
     imported_by_staff_user = relationship('StaffUser', foreign_keys=[imported_by_staff_user_id])
     __table_args__ = ({'schema': 'condition'},)
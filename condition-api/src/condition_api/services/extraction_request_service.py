@@ -128,7 +128,14 @@ class ExtractionRequestService:
             request.estimated_ready_minutes = None
 
             if request.status == 'processing':
-                started_at = request.updated_date or request.created_date or now
+                # updated_date moves with every cron heartbeat, so prefer the
+                # time the current worker actually started on the request.
+                started_at = (
+                    request.processing_started_at
+                    or request.updated_date
+                    or request.created_date
+                    or now
+                )
                 elapsed_minutes = ExtractionRequestService._get_minutes_elapsed(started_at, now)
                 request.estimated_wait_minutes = 0
                 request.estimated_ready_minutes = max(
@@ -175,6 +182,7 @@ class ExtractionRequestService:
         try:
             req.status = 'manual'
             req.extracted_data = None
+            req.checkpoint_data = None
             req.error_message = None
 
             # Activate the document and project now that the user has completed manual entry.
@@ -226,6 +234,7 @@ class ExtractionRequestService:
         try:
             req.status = 'rejected'
             req.extracted_data = None
+            req.checkpoint_data = None
             req.error_message = None
 
             if req.document_id:
@@ -267,6 +276,7 @@ class ExtractionRequestService:
             req.status = 'imported'
             req.imported_by_staff_user_id = current_staff_user.id if current_staff_user else None
             req.extracted_data = None
+            req.checkpoint_data = None
 
             if req.document_id:
                 document = db.session.query(Document).filter_by(document_id=req.document_id).first()
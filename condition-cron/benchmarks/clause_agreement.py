@@ -0,0 +1,105 @@
+"""Measure the local clause parser against stored model enrichment.
+
+Usage (from condition-cron/):
+
+    psql "$DATABASE_URL" -Atc "select extracted_data from extraction_requests \\
+        where extracted_data is not null" > extracted_data.jsonl
+    PYTHONPATH=src python benchmarks/clause_agreement.py extracted_data.jsonl [--min-confidence 0.9]
+
+Each input file holds one extracted_data object per line, a JSON list of
+them, or a single object. For every condition the model's stored `clauses`
+are compared with `parse_clauses` on its condition_text; "calls avoided" are
+the conditions the parser would answer at the given confidence threshold.
+"""
+
+import argparse
+import json
+import re
+from collections import Counter
+
+from condition_cron.extraction.clauses import DEFAULT_MIN_CONFIDENCE, parse_clauses
+
+
+def _load(path):
+    with open(path, encoding="utf-8") as f:
+        content = f.read().strip()
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        data = [json.loads(line) for line in content.splitlines() if line.strip()]
+    return data if isinstance(data, list) else [data]
+
+
+def _norm_text(text):
+    return re.sub(r"\s+", " ", text or "").strip().rstrip(";,.").strip().lower()
+
+
+def _norm_id(identifier):
+    return (identifier or "").strip()
+
+
+def _shape(nodes, id_key, text_key):
+    return [
+        (
+            _norm_id(node.get(id_key)),
+            _norm_text(node.get(text_key)),
+            tuple(_shape(node.get("subconditions") or [], "subcondition_identifier", "subcondition_text")),
+        )
+        for node in nodes or []
+    ]
+
+
+def _identifiers(shape):
+    return [(identifier, _identifiers(children)) for identifier, _, children in shape]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--min-confidence", type=float, default=DEFAULT_MIN_CONFIDENCE)
+    parser.add_argument("--show", type=int, default=0, help="print this many disagreements")
+    args = parser.parse_args()
+
+    totals = Counter()
+    reasons = Counter()
+    shown = 0
+    for path in args.paths:
+        for extracted in _load(path):
+            for condition in (extracted or {}).get("conditions", []):
+                if "clauses" not in condition:
+                    continue
+                parsed = parse_clauses(condition.get("condition_text", ""))
+                totals["conditions"] += 1
+                reasons[parsed.reason] += 1
+                if parsed.confidence < args.min_confidence:
+                    continue
+                totals["local"] += 1
+                expected = _shape(condition["clauses"], "clause_identifier", "clause_text")
+                actual = _shape(parsed.clauses, "clause_identifier", "clause_text")
+                if actual == expected:
+                    totals["exact"] += 1
+                elif _identifiers(actual) == _identifiers(expected):
+                    totals["same_structure"] += 1
+                elif shown < args.show:
+                    shown += 1
+                    print(f"--- condition {condition.get('condition_number')}: {parsed.reason}")
+                    print(condition.get("condition_text", ""))
+                    print("model:", json.dumps(condition["clauses"])[:600])
+                    print("local:", json.dumps(parsed.clauses)[:600])
+
+    conditions, local = totals["conditions"], totals["local"]
+    if not conditions:
+        print("No enriched conditions found.")
+        return
+    print(f"conditions with stored clauses: {conditions}")
+    print(f"parsed locally (calls avoided): {local} ({local / conditions:.1%})")
+    if local:
+        print(f"  identical to the model:       {totals['exact']} ({totals['exact'] / local:.1%})")
+        print(f"  same structure, other text:   {totals['same_structure']} ({totals['same_structure'] / local:.1%})")
+        other = local - totals["exact"] - totals["same_structure"]
+        print(f"  different structure:          {other} ({other / local:.1%})")
+    print("parser outcomes:", ", ".join(f"{reason} {count}" for reason, count in reasons.most_common()))
+
+
+if __name__ == "__main__":
+    main()
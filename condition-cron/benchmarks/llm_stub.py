@@ -0,0 +1,251 @@
+"""OpenAI-compatible chat completions stub for offline pipeline benchmarks.
+
+Usage (from condition-cron/):
+
+    PYTHONPATH=src python benchmarks/llm_stub.py [--port 8099] [--latency-ms 300] [--error-rate 0.02]
+                                                 [--recorded llm-cache.sqlite3]
+
+then point the pipeline at it with EXTRACTOR_API_URL=http://127.0.0.1:8099.
+
+Requests are answered from recorded completions when `--recorded` names an
+LLM cache file from a real run (EXTRACTION_LLM_CACHE_PATH) and the request is
+in it; otherwise with a synthetic tool call that fills the requested
+function's schema. Synthetic answers copy numbered conditions out of the
+prompt, so chunking, range validation and the per-condition stages run as
+they would against the model. Every answer waits for a log-normal latency
+(median `--latency-ms`), and `--error-rate` of requests get a 429 with
+Retry-After instead. GET /stats returns request counts.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from condition_cron.extraction.chunking import estimate_tokens
+from condition_cron.extraction.llm_cache import CompletionCache, request_key
+
+_NUMBERED_LINE = re.compile(r"^(\d+)\.\s+(\S.*)$", re.MULTILINE)
+_WANTED = re.compile(r"Extract conditions ([\d ,]+(?:and \d+|to \d+)?)\.\s*$")
+
+
+def _fake(schema, rng, yes_rate, depth=0):
+    """A minimal value matching a JSON schema; booleans are true `yes_rate` of the time."""
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if "enum" in schema:
+        return schema["enum"][0]
+    if kind == "object":
+        return {name: _fake(prop, rng, yes_rate, depth + 1) for name, prop in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [] if depth > 3 else [_fake(schema.get("items", {}), rng, yes_rate, depth + 1)]
+    if kind == "boolean":
+        return rng.random() < yes_rate
+    if kind == "integer":
+        return 1
+    if kind == "number":
+        return 1.0
+    if kind == "string":
+        return "Synthetic answer"
+    return None
+
+
+def _requested_numbers(prompt):
+    """Condition numbers a numbered-range prompt asks for, or None for page chunks."""
+    match = _WANTED.search(prompt)
+    if not match:
+        return None
+    wanted = match.group(1)
+    if " to " in wanted:
+        first, last = (int(n) for n in wanted.split(" to "))
+        return list(range(first, last + 1))
+    return [int(n) for n in re.findall(r"\d+", wanted)]
+
+
+def synthetic_arguments(name, parameters, prompt, rng, yes_rate):
+    """Tool-call arguments for function `name` that the pipeline will accept."""
+    arguments = _fake(parameters, rng, yes_rate)
+    numbered = {}
+    for number, text in _NUMBERED_LINE.findall(prompt):
+        numbered.setdefault(int(number), text)
+
+    if name == "classify_document_eligibility":
+        arguments.update(is_supported_document=True, confidence=0.95, evidence=["Schedule B"])
+        families = parameters["properties"]["document_family"].get("enum", [])
+        arguments["document_family"] = next((f for f in families if "certificate" in f), arguments["document_family"])
+    elif name == "classify_document_structure":
+        arguments.update(
+            document_type="numbered_conditions",
+            has_numbered_conditions=True,
+            section_headers=[],
+            estimated_item_count=max(numbered, default=0),
+        )
+    elif "conditions" in arguments and "condition_number" in parameters["properties"]["conditions"]["items"]["properties"]:
+        wanted = _requested_numbers(prompt)
+        template = arguments["conditions"][0]
+        arguments["conditions"] = [
+            dict(template, condition_number=number, condition_name=f"Condition {number}",
+                 condition_text=numbered.get(number, "The Holder must comply."))
+            for number in (sorted(numbered) if wanted is None else wanted)
+        ]
+    return arguments
+
+
+class StubState:
+    """Options and thread-safe counters shared by the request handlers."""
+
+    def __init__(self, latency_ms=300.0, latency_sigma=0.5, error_rate=0.0, retry_after=1.0,
+                 yes_rate=0.3, recorded=None, seed=0):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.yes_rate = yes_rate
+        self.seed = seed
+        self.recorded = CompletionCache(recorded, max_bytes=2**62) if recorded else None
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self.counts = {"requests": 0, "replayed": 0, "synthetic": 0, "throttled": 0,
+                       "prompt_tokens": 0, "completion_tokens": 0}
+
+    def count(self, **amounts):
+        with self._lock:
+            for name, amount in amounts.items():
+                self.counts[name] += amount
+
+    def draw(self):
+        """(latency seconds, throttle?) for the next request."""
+        with self._lock:
+            latency = self.latency_ms / 1000 * math.exp(self._rng.gauss(0, self.latency_sigma)) if self.latency_ms else 0.0
+            return latency, self._rng.random() < self.error_rate
+
+    def answer(self, body):
+        if self.recorded:
+            completion = self.recorded.get(request_key(body))
+            if completion is not None:
+                self.count(replayed=1)
+                return completion.model_dump(mode="json")
+        self.count(synthetic=1)
+        return self._synthetic(body)
+
+    def _synthetic(self, body):
+        prompt = "\n".join(m["content"] for m in body.get("messages", []) if isinstance(m.get("content"), str))
+        # Same request, same answer, whichever order the threads arrive in.
+        rng = random.Random(f"{self.seed}:{request_key(body)}")
+        message = {"role": "assistant", "content": None}
+        tools = {tool["function"]["name"]: tool["function"] for tool in body.get("tools", [])}
+        if tools:
+            chosen = (body.get("tool_choice") or {}).get("function", {}).get("name") or next(iter(tools))
+            arguments = synthetic_arguments(chosen, tools[chosen].get("parameters", {}), prompt, rng, self.yes_rate)
+            message["tool_calls"] = [{
+                "id": f"call_{rng.getrandbits(32):08x}",
+                "type": "function",
+                "function": {"name": chosen, "arguments": json.dumps(arguments)},
+            }]
+            output = message["tool_calls"][0]["function"]["arguments"]
+        else:
+            message["content"] = output = "Synthetic answer"
+        prompt_tokens = estimate_tokens(prompt) + estimate_tokens(json.dumps(body.get("tools", [])))
+        completion_tokens = estimate_tokens(output)
+        return {
+            "id": f"chatcmpl-stub-{rng.getrandbits(32):08x}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "finish_reason": "stop", "message": message, "logprobs": None}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+
+def make_server(state, host="127.0.0.1", port=0):
+    """A threading HTTP server answering chat completions from `state`; port 0 picks a free one."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):  # noqa: ARG002
+            return
+
+        def _send(self, status, payload, headers=None):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):  # noqa: N802
+            if self.path.rstrip("/") == "/stats":
+                self._send(200, dict(state.counts))
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):  # noqa: N802
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send(404, {"error": "not found"})
+                return
+            state.count(requests=1)
+            latency, throttle = state.draw()
+            time.sleep(latency)
+            if throttle:
+                state.count(throttled=1)
+                self._send(429, {"error": {"message": "Rate limit exceeded (stub)", "type": "rate_limit"}},
+                           {"Retry-After": f"{state.retry_after:g}"})
+                return
+            completion = state.answer(body)
+            usage = completion.get("usage") or {}
+            state.count(prompt_tokens=usage.get("prompt_tokens", 0), completion_tokens=usage.get("completion_tokens", 0))
+            self._send(200, completion)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def add_stub_arguments(parser):
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="median response latency (0 for none)")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="log-normal spread of the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with a 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with a 429")
+    parser.add_argument("--yes-rate", type=float, default=0.3, help="share of synthetic booleans that are true")
+    parser.add_argument("--recorded", help="LLM cache file to replay recorded completions from")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def state_from_arguments(args):
+    return StubState(
+        latency_ms=args.latency_ms, latency_sigma=args.latency_sigma, error_rate=args.error_rate,
+        retry_after=args.retry_after, yes_rate=args.yes_rate, recorded=args.recorded, seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    if args.recorded and not os.path.exists(args.recorded):
+        sys.exit(f"No recorded completions at {args.recorded}")
+    server = make_server(state_from_arguments(args), args.host, args.port)
+    print(f"LLM stub listening on http://{args.host}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
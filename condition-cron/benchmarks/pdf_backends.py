@@ -0,0 +1,102 @@
+"""Compare the pdfium and pdfplumber page-text backends, and the table pre-check.
+
+Usage (from condition-cron/):
+
+    PYTHONPATH=src python benchmarks/pdf_backends.py [--pages 100] [--processes 4] [--pdf real.pdf ...]
+
+Without --pdf a synthetic document is generated, with a ruled table on every
+third page. Parity compares each page's text with whitespace collapsed.
+"""
+
+import argparse
+import difflib
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_pdf import write_pdf  # noqa: E402
+
+from condition_cron.extraction import pdf_reader  # noqa: E402
+
+
+def _timed_pages(path, backend):
+    pages, seconds = [], []
+    iterator = pdf_reader.iter_pdf_pages(path, backend=backend)
+    while True:
+        started = time.perf_counter()
+        try:
+            text = next(iterator)
+        except StopIteration:
+            return pages, seconds
+        seconds.append(time.perf_counter() - started)
+        pages.append(text)
+
+
+def _collapsed(text):
+    return " ".join(text.split())
+
+
+def _timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def compare(path, processes=1):
+    print(f"\n{path}")
+    results = {backend: _timed_pages(path, backend) for backend in ("pdfplumber", "pdfium")}
+    for backend, (_, seconds) in results.items():
+        print(
+            f"  {backend:<10} {statistics.mean(seconds) * 1000:8.1f} ms/page mean, "
+            f"{sorted(seconds)[int(len(seconds) * 0.95) - 1] * 1000:8.1f} ms p95, {sum(seconds):6.1f} s total"
+        )
+
+    reference, fast = results["pdfplumber"][0], results["pdfium"][0]
+    ratios = [
+        difflib.SequenceMatcher(None, _collapsed(a), _collapsed(b), autojunk=False).ratio() if a or b else 1.0
+        for a, b in zip(reference, fast)
+    ]
+    identical = sum(_collapsed(a) == _collapsed(b) for a, b in zip(reference, fast))
+    print(
+        f"  parity: {identical}/{len(reference)} pages identical, "
+        f"mean similarity {statistics.mean(ratios):.4f}, worst {min(ratios):.4f} (page {ratios.index(min(ratios)) + 1})"
+    )
+
+    all_tables, all_seconds = _timed(pdf_reader.read_pdf_page_tables, path, skip_pages_without_lines=False)
+    checked_tables, checked_seconds = _timed(pdf_reader.read_pdf_page_tables, path)
+    print(
+        f"  tables: {all_seconds:.1f} s scanning every page, {checked_seconds:.1f} s with the ruling-line "
+        f"pre-check; {'same' if all_tables == checked_tables else 'DIFFERENT'} tables "
+        f"({sum(map(len, all_tables))} found)"
+    )
+
+    if processes > 1:
+        for backend in ("pdfplumber", "pdfium"):
+            pages, seconds = _timed(pdf_reader.read_pdf_pages, path, backend=backend, processes=processes, min_pages=1)
+            same = "same" if pages == results[backend][0] else "DIFFERENT"
+            print(f"  {backend:<10} text in {processes} processes: {seconds:.1f} s ({same} pages)")
+        tables, seconds = _timed(pdf_reader.read_pdf_page_tables, path, processes=processes, min_pages=1)
+        print(f"  tables in {processes} processes: {seconds:.1f} s ({'same' if tables == all_tables else 'DIFFERENT'})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--processes", type=int, default=1, help="also time parsing split across this many processes")
+    parser.add_argument("--pdf", nargs="*", default=[], help="real PDFs to compare instead of a synthetic one")
+    args = parser.parse_args()
+
+    if args.pdf:
+        for path in args.pdf:
+            compare(path, args.processes)
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        compare(write_pdf(os.path.join(tmp, "synthetic.pdf"), args.pages, table_every=3), args.processes)
+
+
+if __name__ == "__main__":
+    main()
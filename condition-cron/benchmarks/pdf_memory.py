@@ -0,0 +1,77 @@
+"""Compare peak memory of the whole-document and streaming PDF readers.
+
+Usage (from condition-cron/):
+
+    PYTHONPATH=src python benchmarks/pdf_memory.py [--pages 300] [--image-kb 512]
+
+Each reader runs in a fresh subprocess so its peak RSS is measured alone.
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_pdf import write_pdf  # noqa: E402
+
+
+def _legacy_read(path):
+    """The reader before streaming: every page stays parsed until the file closes."""
+    import pdfplumber
+
+    pdf_text = ""
+    with pdfplumber.open(path) as pdf:
+        for page in pdf.pages:
+            text = page.extract_text()
+            if text:
+                pdf_text += text + "\n"
+    return pdf_text
+
+
+def _streaming_read(path):
+    from condition_cron.extraction.pdf_reader import read_pdf
+
+    return read_pdf(path)
+
+
+READERS = {"legacy": _legacy_read, "streaming": _streaming_read}
+
+
+def _measure(reader, path):
+    started = time.perf_counter()
+    text = READERS[reader](path)
+    elapsed = time.perf_counter() - started
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{reader}\t{peak_mb:.0f}\t{elapsed:.1f}\t{len(text)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--image-kb", type=int, default=512, help="embedded scan size per page (0 for text only)")
+    parser.add_argument("--measure", nargs=2, metavar=("READER", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        _measure(*args.measure)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_pdf(os.path.join(tmp, "synthetic.pdf"), args.pages, image_kb=args.image_kb)
+        print(f"{args.pages} pages, {os.path.getsize(path) / 2**20:.0f} MB on disk")
+        print("reader\tpeak_rss_mb\tseconds\tchars")
+        for reader in READERS:
+            result = subprocess.run(
+                [sys.executable, __file__, "--measure", reader, path],
+                check=True, capture_output=True, text=True,
+            )
+            print(result.stdout.strip())
+
+
+if __name__ == "__main__":
+    main()
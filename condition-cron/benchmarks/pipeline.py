@@ -0,0 +1,144 @@
+"""Measure the whole extraction pipeline offline against the LLM stub.
+
+Usage (from condition-cron/):
+
+    PYTHONPATH=src python benchmarks/pipeline.py [--documents 3] [--pages 5] [--lines-per-page 8]
+                                                 [--pdf path/to/real.pdf ...] [--latency-ms 300]
+                                                 [--error-rate 0.02] [--recorded llm-cache.sqlite3]
+                                                 [--json results.json] [--baseline previous.json]
+
+Starts `llm_stub.py` in-process, then runs `extract_and_enrich` on each
+document (synthetic numbered-condition PDFs, plus any `--pdf`) in a fresh
+subprocess so its peak RSS is measured alone. Reports wall clock, LLM calls,
+retries, tokens sent and peak RSS per document and in total. EXTRACTION_*
+settings in the environment apply to the runs, so the same corpus can be
+compared across settings or commits; `--baseline` prints the change from a
+previous `--json` file.
+"""
+
+import argparse
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from llm_stub import add_stub_arguments, make_server, state_from_arguments  # noqa: E402
+from synthetic_pdf import write_pdf  # noqa: E402
+
+TOTALS = ("seconds", "calls", "retries", "prompt_tokens", "completion_tokens")
+
+
+def _measure(path):
+    """Run the pipeline on one document and print its measurements as JSON."""
+    logging.basicConfig(level=logging.WARNING)
+    from condition_cron.services import extraction_service
+
+    started = time.perf_counter()
+    status, conditions, metrics = "completed", 0, {}
+    try:
+        result = extraction_service.extract_and_enrich(path)
+        conditions = len(result.get("conditions", []))
+        metrics = result.get("metrics", {})
+    except extraction_service.UnsupportedDocumentError:
+        status = "unsupported"
+    except Exception as exc:  # noqa: BLE001 - reported, not raised
+        status = f"failed: {exc}"
+    llm = metrics.get("llm", {})
+    print(json.dumps({
+        "document": os.path.basename(path),
+        "status": status,
+        "pages": metrics.get("pdf", {}).get("pages"),
+        "conditions": conditions,
+        "seconds": round(time.perf_counter() - started, 2),
+        "calls": llm.get("calls", 0),
+        "retries": llm.get("retries", 0),
+        "prompt_tokens": llm.get("prompt_tokens", 0),
+        "completion_tokens": llm.get("completion_tokens", 0),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024),
+        "stage_timings": metrics.get("stage_timings", {}),
+    }))
+
+
+def _run(path, base_url):
+    env = dict(
+        os.environ,
+        EXTRACTOR_API_URL=base_url,
+        EXTRACTOR_API_KEY="benchmark",
+        # Every run must reach the stub, not completions cached by an earlier run.
+        EXTRACTION_LLM_CACHE_ENABLED="false",
+    )
+    result = subprocess.run(
+        [sys.executable, __file__, "--measure", path],
+        check=True, capture_output=True, text=True, env=env,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def _print_table(rows, baseline):
+    print("document\tstatus\tpages\tconditions\tseconds\tcalls\tretries\tprompt_tokens\tcompletion_tokens\tpeak_rss_mb")
+    for row in rows:
+        print("\t".join(str(row[k]) for k in (
+            "document", "status", "pages", "conditions", "seconds", "calls", "retries",
+            "prompt_tokens", "completion_tokens", "peak_rss_mb",
+        )))
+    totals = {name: round(sum(row[name] for row in rows), 2) for name in TOTALS}
+    totals["peak_rss_mb"] = max((row["peak_rss_mb"] for row in rows), default=0)
+    print("total\t\t\t\t" + "\t".join(str(totals[k]) for k in TOTALS) + f"\t{totals['peak_rss_mb']}")
+    if baseline:
+        before = baseline["totals"]
+        print("change vs baseline: " + ", ".join(
+            f"{name} {totals[name] - before.get(name, 0):+g}"
+            + (f" ({(totals[name] / before[name] - 1) * 100:+.0f}%)" if before.get(name) else "")
+            for name in TOTALS + ("peak_rss_mb",)
+        ))
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=3, help="synthetic documents to generate")
+    parser.add_argument("--pages", type=int, default=5, help="pages per synthetic document")
+    parser.add_argument("--lines-per-page", type=int, default=8, help="numbered conditions per synthetic page")
+    parser.add_argument("--pdf", nargs="*", default=[], help="real PDFs to add to the corpus")
+    parser.add_argument("--json", help="write per-document results and totals here")
+    parser.add_argument("--baseline", help="earlier --json output to compare against")
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    if args.measure:
+        _measure(args.measure)
+        return
+
+    state = state_from_arguments(args)
+    server = make_server(state)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    baseline = json.load(open(args.baseline)) if args.baseline else None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = [
+            write_pdf(os.path.join(tmp, f"synthetic-{i + 1}.pdf"), args.pages, lines_per_page=args.lines_per_page)
+            for i in range(args.documents)
+        ] + list(args.pdf)
+        started = time.perf_counter()
+        rows = [_run(path, base_url) for path in corpus]
+        wall = time.perf_counter() - started
+    server.shutdown()
+
+    totals = _print_table(rows, baseline)
+    print(f"stub: {json.dumps(state.counts)}; corpus wall clock {wall:.1f}s")
+    if args.json:
+        with open(args.json, "w") as out:
+            json.dump({"documents": rows, "totals": totals, "stub": state.counts}, out, indent=2)
+
+
+if __name__ == "__main__":
+    main()
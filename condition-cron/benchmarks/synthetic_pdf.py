@@ -0,0 +1,113 @@
+"""Write large synthetic condition PDFs for the benchmarks, without a PDF library.
+
+Each page carries numbered condition text and, optionally, an uncompressed
+greyscale image standing in for an embedded scan and a ruled table of
+commitments.
+"""
+
+import os
+
+_CONDITION = (
+    "The Holder must develop a {topic} management plan in consultation with "
+    "Indigenous nations and provide it to EAO thirty days before construction."
+)
+_TOPICS = ("wildlife", "water quality", "noise", "air quality", "heritage", "fish habitat")
+
+
+def page_lines(page_number, lines_per_page=40):
+    """The text lines written to `page_number` (1-based)."""
+    lines = [f"Schedule B - Table of Conditions    Page {page_number}"]
+    for i in range(lines_per_page):
+        number = (page_number - 1) * lines_per_page + i + 1
+        lines.append(f"{number}. " + _CONDITION.format(topic=_TOPICS[number % len(_TOPICS)]))
+    return lines
+
+
+def table_rows(page_number, rows=6):
+    """The rows of the ruled table drawn on `page_number`, header first."""
+    return [["Ref #", "Component", "Commitment"]] + [
+        [f"C{page_number}.{row}", _TOPICS[row % len(_TOPICS)].title(), f"Monitor {_TOPICS[row % len(_TOPICS)]} monthly"]
+        for row in range(1, rows)
+    ]
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _table_ops(rows, left=36, top=400, widths=(60, 90, 150), height=20):
+    ops = ["0.5 w"]
+    right = left + sum(widths)
+    for i in range(len(rows) + 1):
+        y = top - i * height
+        ops.append(f"{left} {y} m {right} {y} l S")
+    x = left
+    for width in (0,) + widths:
+        x += width
+        ops.append(f"{x} {top} m {x} {top - len(rows) * height} l S")
+    for i, row in enumerate(rows):
+        x = left
+        for width, cell in zip(widths, row):
+            ops.append(f"BT /F1 7 Tf {x + 3} {top - (i + 1) * height + 7} Td ({_escape(cell)}) Tj ET")
+            x += width
+    return ops
+
+
+def _content_stream(lines, with_image, rows=None):
+    ops = []
+    if with_image:
+        ops.append("q 200 0 0 150 380 20 cm /Im1 Do Q")
+    ops.append("BT /F1 7 Tf 9 TL 36 800 Td")
+    ops.extend(f"({_escape(line)}) Tj T*" for line in lines)
+    ops.append("ET")
+    if rows:
+        ops.extend(_table_ops(rows))
+    return "\n".join(ops).encode("latin-1")
+
+
+def write_pdf(path, pages, lines_per_page=40, image_kb=0, table_every=0):
+    """Write a `pages`-page PDF to `path`.
+
+    `image_kb` > 0 embeds a scan-sized image on every page, and `table_every`
+    > 0 draws a ruled table on every `table_every`-th page.
+    """
+    objects = {}
+    objects[1] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[3] = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"
+    kids = []
+    side = int((image_kb * 1024) ** 0.5) if image_kb else 0
+    next_id = 4
+    for number in range(1, pages + 1):
+        page_id, content_id, image_id = next_id, next_id + 1, next_id + 2
+        next_id += 3 if image_kb else 2
+        kids.append(f"{page_id} 0 R")
+        resources = "/Font << /F1 3 0 R >>"
+        if image_kb:
+            resources += f" /XObject << /Im1 {image_id} 0 R >>"
+            pixels = os.urandom(side * side)
+            objects[image_id] = (
+                f"<< /Type /XObject /Subtype /Image /Width {side} /Height {side} "
+                f"/ColorSpace /DeviceGray /BitsPerComponent 8 /Length {len(pixels)} >>\nstream\n"
+            ).encode("latin-1") + pixels + b"\nendstream"
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << {resources} >> /Contents {content_id} 0 R >>"
+        ).encode("latin-1")
+        rows = table_rows(number) if table_every and number % table_every == 0 else None
+        content = _content_stream(page_lines(number, lines_per_page), bool(image_kb), rows)
+        objects[content_id] = f"<< /Length {len(content)} >>\nstream\n".encode("latin-1") + content + b"\nendstream"
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode("latin-1")
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = {}
+        for object_id in sorted(objects):
+            offsets[object_id] = f.tell()
+            f.write(f"{object_id} 0 obj\n".encode("latin-1") + objects[object_id] + b"\nendobj\n")
+        xref = f.tell()
+        size = max(objects) + 1
+        f.write(f"xref\n0 {size}\n0000000000 65535 f \n".encode("latin-1"))
+        for object_id in range(1, size):
+            f.write(f"{offsets[object_id]:010d} 00000 n \n".encode("latin-1"))
+        f.write(f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1"))
+    return path
@@ -61,6 +61,89 @@ class _Config:
         '0.75',
     )
 
+    # Extraction concurrency. Condition extraction chunks and the per-condition
+    # stages (clauses, deliverables, reports) each fan out across
+    # EXTRACTION_MAX_WORKERS threads, and every LLM call in the process shares
+    # the EXTRACTION_REQUESTS_PER_MINUTE budget (0 = off).
+    EXTRACTION_MAX_WORKERS = int(os.getenv('EXTRACTION_MAX_WORKERS', '8'))
+    EXTRACTION_REQUESTS_PER_MINUTE = int(os.getenv('EXTRACTION_REQUESTS_PER_MINUTE', '0'))
+    # Shared limiter settings: an estimated-tokens budget per minute (0 = off),
+    # an in-flight cap that halves when the provider throttles and creeps back
+    # up, and retries with exponential backoff for 429/5xx responses.
+    EXTRACTION_TOKENS_PER_MINUTE = int(os.getenv('EXTRACTION_TOKENS_PER_MINUTE', '0'))
+    EXTRACTION_LLM_MAX_CONCURRENCY = int(os.getenv('EXTRACTION_LLM_MAX_CONCURRENCY', '32'))
+    EXTRACTION_LLM_MAX_RETRIES = int(os.getenv('EXTRACTION_LLM_MAX_RETRIES', '4'))
+    EXTRACTION_LLM_BACKOFF_MAX_SECONDS = _float_env('EXTRACTION_LLM_BACKOFF_MAX_SECONDS', '60')
+    # Eligibility, classification and First Nations extraction run at the same
+    # time, and condition extraction starts once the first two finish; false
+    # runs them one after another.
+    EXTRACTION_CONCURRENT_STAGES = os.getenv('EXTRACTION_CONCURRENT_STAGES', 'true')
+
+    # Asyncio pipeline. When enabled, chunk extraction and the per-condition
+    # stages run on AsyncOpenAI in one thread, with at most
+    # EXTRACTION_ASYNC_MAX_IN_FLIGHT requests open at once.
+    EXTRACTION_ASYNC_ENABLED = os.getenv('EXTRACTION_ASYNC_ENABLED', 'false')
+    EXTRACTION_ASYNC_MAX_IN_FLIGHT = int(os.getenv('EXTRACTION_ASYNC_MAX_IN_FLIGHT', '32'))
+
+    # PDFs are parsed one page at a time. When the process's resident memory
+    # passes EXTRACTION_PDF_MAX_RSS_MB mid-parse the request fails instead of
+    # the pod being OOM-killed (0 = off).
+    EXTRACTION_PDF_MAX_RSS_MB = int(os.getenv('EXTRACTION_PDF_MAX_RSS_MB', '0'))
+    # Page text comes from pdfplumber (the original layout engine) or, opt-in,
+    # pdfium (fast, but whitespace differs so prompts change); tables are always
+    # read with pdfplumber, on pages with ruling lines.
+    EXTRACTION_PDF_TEXT_BACKEND = os.getenv('EXTRACTION_PDF_TEXT_BACKEND', 'pdfplumber')
+    # Documents with at least EXTRACTION_PDF_PARALLEL_MIN_PAGES pages to parse
+    # are split into page ranges read by EXTRACTION_PDF_PROCESSES worker
+    # processes (1 = parse in the job's own process). The memory guard applies
+    # to each worker separately.
+    EXTRACTION_PDF_PROCESSES = int(os.getenv('EXTRACTION_PDF_PROCESSES', '1'))
+    EXTRACTION_PDF_PARALLEL_MIN_PAGES = int(os.getenv('EXTRACTION_PDF_PARALLEL_MIN_PAGES', '40'))
+
+    # Drop running headers, footers and page numbers repeated across pages
+    # (keeping their first occurrence) and collapse whitespace before any
+    # page text is sent to the model.
+    EXTRACTION_STRIP_BOILERPLATE = os.getenv('EXTRACTION_STRIP_BOILERPLATE', 'false')
+
+    # Page-based extraction packs pages into chunks by estimated tokens so each
+    # request's page text and expected JSON answer fit these budgets. Setting
+    # either to 0 falls back to a fixed number of pages per chunk.
+    EXTRACTION_CHUNK_INPUT_TOKENS = int(os.getenv('EXTRACTION_CHUNK_INPUT_TOKENS', '8000'))
+    EXTRACTION_CHUNK_OUTPUT_TOKENS = int(os.getenv('EXTRACTION_CHUNK_OUTPUT_TOKENS', '3000'))
+
+    # Parse table_format pages whose tables have a Ref # / commitment layout
+    # locally and only ask the model to tag their rows; other pages are still
+    # extracted by the model.
+    EXTRACTION_TABLE_PARSER = os.getenv('EXTRACTION_TABLE_PARSER', 'false')
+
+    # Split regularly structured conditions (one "a)", "(i)", "1.1" item per
+    # line) into clauses locally instead of calling the model, when the parser's
+    # confidence reaches EXTRACTION_LOCAL_CLAUSES_MIN_CONFIDENCE.
+    EXTRACTION_LOCAL_CLAUSES = os.getenv('EXTRACTION_LOCAL_CLAUSES', 'false')
+    EXTRACTION_LOCAL_CLAUSES_MIN_CONFIDENCE = _float_env('EXTRACTION_LOCAL_CLAUSES_MIN_CONFIDENCE', '0.9')
+
+    # Pack short conditions into shared clause-enrichment requests of up to this
+    # many estimated tokens of condition text (0 = one request per condition).
+    EXTRACTION_ENRICHMENT_BATCH_TOKENS = int(os.getenv('EXTRACTION_ENRICHMENT_BATCH_TOKENS', '0'))
+
+    # Ask for clauses, deliverables and report submissions in one call per
+    # condition; conditions whose combined answer fails validation fall back to
+    # the dedicated per-stage calls.
+    EXTRACTION_COMBINED_ENRICHMENT = os.getenv('EXTRACTION_COMBINED_ENRICHMENT', 'false')
+
+    # Lexical pre-filter for the deliverable/report gating calls: off, shadow
+    # (ask the model anyway and log agreement) or on (skip the call when the
+    # condition has no plan/report trigger words).
+    EXTRACTION_LEXICAL_PREFILTER = os.getenv('EXTRACTION_LEXICAL_PREFILTER', 'shadow')
+
+    # On-disk cache of temperature-0 LLM completions, keyed by a hash of the
+    # request. Point EXTRACTION_LLM_CACHE_PATH at a persistent volume so retries
+    # on a new pod can reuse earlier responses. Off by default.
+    EXTRACTION_LLM_CACHE_ENABLED = os.getenv('EXTRACTION_LLM_CACHE_ENABLED', 'false')
+    EXTRACTION_LLM_CACHE_PATH = os.getenv('EXTRACTION_LLM_CACHE_PATH', '')
+    EXTRACTION_LLM_CACHE_MAX_MB = int(os.getenv('EXTRACTION_LLM_CACHE_MAX_MB', '512'))
+    EXTRACTION_LLM_CACHE_BYPASS = os.getenv('EXTRACTION_LLM_CACHE_BYPASS', 'false')
+
     # Queue timing settings shared with condition-api for UI estimates.
     #
     # The cron schedule itself is still managed by cron/crontab or a deployment
@@ -77,6 +160,28 @@ class _Config:
         os.getenv('EXTRACTION_PROCESSING_STALE_AFTER_MINUTES', '120')
     )
 
+    # Queue leasing. Each worker leases the request it claims for
+    # EXTRACTION_LEASE_MINUTES and renews the lease every
+    # EXTRACTION_HEARTBEAT_SECONDS; a request whose lease lapses is reclaimed by
+    # the next worker. EXTRACTION_MAX_REQUESTS_PER_RUN caps how many requests
+    # one cron run claims (0 = keep going until the queue is empty).
+    EXTRACTION_LEASE_MINUTES = int(os.getenv('EXTRACTION_LEASE_MINUTES', '10'))
+    EXTRACTION_HEARTBEAT_SECONDS = int(os.getenv('EXTRACTION_HEARTBEAT_SECONDS', '60'))
+    EXTRACTION_MAX_REQUESTS_PER_RUN = int(os.getenv('EXTRACTION_MAX_REQUESTS_PER_RUN', '0'))
+
+    # Resumable extraction. Finished stages and chunks are saved to the request
+    # at most every EXTRACTION_CHECKPOINT_INTERVAL_SECONDS, so a request
+    # reclaimed after a crash or lost lease picks up where the last worker
+    # stopped.
+    EXTRACTION_CHECKPOINT_INTERVAL_SECONDS = int(os.getenv('EXTRACTION_CHECKPOINT_INTERVAL_SECONDS', '30'))
+
+    # Prometheus metrics, exported once at the end of each run: pushed to a
+    # Pushgateway, written for the node-exporter textfile collector, or both.
+    # Leave both blank to turn metrics off.
+    EXTRACTION_METRICS_PUSHGATEWAY_URL = os.getenv('EXTRACTION_METRICS_PUSHGATEWAY_URL', '')
+    EXTRACTION_METRICS_TEXTFILE = os.getenv('EXTRACTION_METRICS_TEXTFILE', '')
+    EXTRACTION_METRICS_JOB = os.getenv('EXTRACTION_METRICS_JOB', 'condition-cron')
+
 
 class DevConfig(_Config):
     DEBUG = True
@@ -0,0 +1,121 @@
+"""Removal of running headers, footers and page numbers repeated on every page.
+
+EAO certificates print the same letterhead, "Schedule B" banner and page
+footer on each page, and every prompt built from the page text (chunk
+extraction, classification, First Nations) would otherwise pay for them
+again. A line near the top or bottom of a page that recurs on at least half
+of the pages is kept where it first appears and dropped everywhere else.
+Only the digits of page numbers are ignored, so "Page 3 of 40" matches
+"Page 4 of 40" while "Condition 3" and "Condition 4" stay different, and
+condition headings and numbered lines are never dropped. Off by default.
+"""
+
+import logging
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from condition_cron.extraction.chunking import estimate_tokens
+from condition_cron.extraction.condition_index import CONDITION_HEADING, NUMBERED_LINE
+from condition_cron.extraction.settings import get_bool_setting
+
+logger = logging.getLogger(__name__)
+
+# Non-blank lines at each end of a page that may be a running header/footer.
+EDGE_LINES = 3
+MIN_REPEAT_FRACTION = 0.5
+MIN_REPEAT_PAGES = 3
+
+_DIGITS = re.compile(r"\d+")
+# Page numbers whose digits are ignored when comparing lines: "Page 12" and
+# "Page 12 of 40" anywhere in a line, or a line that is only "12", "- 12 -",
+# "12/40" or "12 of 40".
+_PAGE_NUMBER = re.compile(r"\bpage \d+(?: of \d+)?\b|^-? ?\d+(?:/\d+| of \d+)? ?-?$")
+
+
+@dataclass(frozen=True)
+class BoilerplateReport:
+    """What `strip_boilerplate` removed from one document."""
+
+    lines_removed: int
+    tokens_before: int
+    tokens_after: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+def is_boilerplate_stripping_enabled() -> bool:
+    return get_bool_setting("EXTRACTION_STRIP_BOILERPLATE", False)
+
+
+def strip_boilerplate(pages: List[str]) -> Tuple[List[str], BoilerplateReport]:
+    """Collapse whitespace and drop repeated header/footer lines from `pages`."""
+    page_lines = [_collapse_whitespace(page) for page in pages]
+    threshold = max(MIN_REPEAT_PAGES, math.ceil(len(pages) * MIN_REPEAT_FRACTION))
+
+    counts: Counter = Counter()
+    for lines in page_lines:
+        counts.update({_line_key(lines[i]) for i in _edge_indices(lines)})
+    repeated = {key for key, count in counts.items() if count >= threshold}
+
+    seen = set()
+    removed = 0
+    cleaned = []
+    for lines in page_lines:
+        drop = set()
+        for i in _edge_indices(lines) if repeated else ():
+            key = _line_key(lines[i])
+            if key not in repeated or _is_condition_anchor(lines[i]):
+                continue
+            if key in seen:
+                drop.add(i)
+            seen.add(key)
+        removed += len(drop)
+        cleaned.append(_join([line for i, line in enumerate(lines) if i not in drop]))
+
+    report = BoilerplateReport(
+        lines_removed=removed,
+        tokens_before=sum(estimate_tokens(page) for page in pages),
+        tokens_after=sum(estimate_tokens(page) for page in cleaned),
+    )
+    return cleaned, report
+
+
+def _collapse_whitespace(page: str) -> List[str]:
+    """Lines with inner whitespace runs collapsed and blank runs reduced to one."""
+    lines: List[str] = []
+    for raw in page.splitlines():
+        line = " ".join(raw.split())
+        if line or (lines and lines[-1]):
+            lines.append(line)
+    while lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+
+def _edge_indices(lines: List[str]) -> List[int]:
+    filled = [i for i, line in enumerate(lines) if line]
+    if len(filled) <= 2 * EDGE_LINES:
+        return filled
+    return filled[:EDGE_LINES] + filled[-EDGE_LINES:]
+
+
+def _line_key(line: str) -> str:
+    return _PAGE_NUMBER.sub(lambda match: _DIGITS.sub("#", match.group()), line.lower())
+
+
+def _is_condition_anchor(line: str) -> bool:
+    """Lines condition_index anchors on ("Condition 3", "3. The Holder ...")."""
+    return bool(CONDITION_HEADING.match(line) or NUMBERED_LINE.match(line))
+
+
+def _join(lines: List[str]) -> str:
+    while lines and not lines[0]:
+        lines.pop(0)
+    while lines and not lines[-1]:
+        lines.pop()
+    return "\n".join(lines)
@@ -0,0 +1,91 @@
+"""Resumable checkpoints for long-running extractions.
+
+Pipeline stages record each finished unit of work (a classification, a chunk
+of conditions, one condition's clauses, ...) in an `ExtractionCheckpoint`.
+The checkpoint is persisted through a save callback, so when a worker dies
+mid-document the next worker to claim the request resumes from the last
+completed unit instead of starting over.
+"""
+
+import copy
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_VERSION = 1
+DEFAULT_SAVE_INTERVAL_SECONDS = 30
+
+
+class ExtractionCheckpoint:
+    """Completed extraction work, keyed by stage and unit key.
+
+    `put` records a unit and persists at most once per `save_interval_seconds`;
+    `flush` persists immediately. Without a save callback the checkpoint only
+    lives in memory, which lets the pipeline run the same way outside the cron.
+    """
+
+    def __init__(
+        self,
+        data: Optional[Dict[str, Any]] = None,
+        save: Optional[Callable[[Dict[str, Any]], None]] = None,
+        save_interval_seconds: float = DEFAULT_SAVE_INTERVAL_SECONDS,
+    ):
+        if data and data.get("version") == CHECKPOINT_VERSION:
+            self._data = copy.deepcopy(data)
+            logger.info("Resuming from checkpoint with stages: %s", ", ".join(sorted(self._data["stages"])) or "none")
+        else:
+            if data:
+                logger.info("Ignoring checkpoint with unsupported version %r", data.get("version"))
+            self._data = {"version": CHECKPOINT_VERSION, "stages": {}}
+        self._save = save
+        self._save_interval_seconds = save_interval_seconds
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._last_saved = time.monotonic()
+
+    def get(self, stage: str, key: str) -> Any:
+        """Return a recorded unit of work, or None if it has not completed."""
+        with self._lock:
+            return copy.deepcopy(self._data["stages"].get(stage, {}).get(key))
+
+    def put(self, stage: str, key: str, value: Any) -> None:
+        """Record a completed unit of work."""
+        with self._lock:
+            self._data["stages"].setdefault(stage, {})[key] = copy.deepcopy(value)
+            self._dirty = True
+            due = time.monotonic() - self._last_saved >= self._save_interval_seconds
+        if due:
+            self.flush()
+
+    def cached(self, stage: str, compute: Callable[[], Any]) -> Any:
+        """Return a whole-stage result from the checkpoint, computing and saving it if missing."""
+        value = self.get(stage, "result")
+        if value is not None:
+            logger.info("Reusing checkpointed %s", stage)
+            return value
+        value = compute()
+        self.put(stage, "result", value)
+        self.flush()
+        return value
+
+    def flush(self) -> None:
+        """Persist any unsaved work now."""
+        if not self._save:
+            return
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                snapshot = copy.deepcopy(self._data)
+                self._dirty = False
+                self._last_saved = time.monotonic()
+            try:
+                self._save(snapshot)
+            except Exception as e:
+                with self._lock:
+                    self._dirty = True
+                logger.warning("Could not save extraction checkpoint: %s", e)
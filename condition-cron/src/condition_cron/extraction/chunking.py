@@ -0,0 +1,130 @@
+"""Token-aware packing of document pages into extraction chunks.
+
+Page-based extraction asks the model to copy every condition on a chunk of
+pages back out as JSON, so the response is roughly as long as the input. A
+fixed number of pages per chunk sends sparse pages in needlessly small
+requests and dense table pages in requests whose answers get cut off
+(`finish_reason == "length"`). Packing pages by estimated tokens keeps each
+chunk inside the input and output budgets instead.
+"""
+
+import logging
+import math
+import re
+from dataclasses import dataclass
+from typing import List
+
+from condition_cron.extraction.settings import get_int_setting
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_INPUT_TOKENS = 8000
+# gpt-4o-2024-05-13 stops at 4096 completion tokens; leave room for JSON
+# keys, condition names and estimation error.
+DEFAULT_CHUNK_OUTPUT_TOKENS = 3000
+
+# Extracted JSON repeats the condition text verbatim plus field names and
+# numbering, so it runs slightly longer than the text it came from.
+OUTPUT_TOKENS_PER_INPUT_TOKEN = 1.1
+
+_TOKEN_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+@dataclass(frozen=True)
+class PageChunk:
+    """One extraction request's worth of document text."""
+
+    start_page: int
+    end_page: int
+    text: str
+    part: int = 0
+    parts: int = 0
+
+    @property
+    def label(self) -> str:
+        label = f"pages {self.start_page}-{self.end_page}"
+        if self.parts:
+            label += f" (part {self.part} of {self.parts})"
+        return label
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate BPE token count without a tokenizer.
+
+    Words and punctuation marks are about one token each, and long words
+    split into several. Table-heavy text (short cells, reference numbers,
+    punctuation) therefore counts as denser than prose of the same length.
+    """
+    return sum(1 + len(piece) // 8 for piece in _TOKEN_PIECES.findall(text))
+
+
+def estimate_output_tokens(input_tokens: int) -> int:
+    """Approximate completion tokens needed to extract conditions from `input_tokens` of text."""
+    return math.ceil(input_tokens * OUTPUT_TOKENS_PER_INPUT_TOKEN)
+
+
+def get_chunk_token_budget() -> int:
+    """Return the largest page-text token count one chunk may carry (0 disables packing)."""
+    input_tokens = get_int_setting("EXTRACTION_CHUNK_INPUT_TOKENS", DEFAULT_CHUNK_INPUT_TOKENS)
+    output_tokens = get_int_setting("EXTRACTION_CHUNK_OUTPUT_TOKENS", DEFAULT_CHUNK_OUTPUT_TOKENS)
+    if input_tokens <= 0 or output_tokens <= 0:
+        return 0
+    return min(input_tokens, math.floor(output_tokens / OUTPUT_TOKENS_PER_INPUT_TOKEN))
+
+
+def fixed_page_chunks(pages: List[str], pages_per_chunk: int) -> List[PageChunk]:
+    """Chunk a fixed number of pages at a time."""
+    return [
+        PageChunk(start, min(start + pages_per_chunk - 1, len(pages)), _page_text(pages[start - 1:start + pages_per_chunk - 1]))
+        for start in range(1, len(pages) + 1, pages_per_chunk)
+    ]
+
+
+def pack_page_chunks(pages: List[str], token_budget: int) -> List[PageChunk]:
+    """Greedily merge consecutive pages while the chunk stays within `token_budget`.
+
+    A page that is over budget on its own is split at line boundaries into
+    parts, so it is never sent in a request whose answer would not fit.
+    """
+    chunks: List[PageChunk] = []
+    start, tokens = 1, 0
+    for number, page in enumerate(pages, start=1):
+        page_tokens = estimate_tokens(page)
+        if number > start and tokens + page_tokens > token_budget:
+            chunks.append(PageChunk(start, number - 1, _page_text(pages[start - 1:number - 1])))
+            start, tokens = number, 0
+        tokens += page_tokens
+        if tokens > token_budget:
+            parts = _split_lines(_page_text([page]), token_budget)
+            chunks.extend(PageChunk(number, number, part, i, len(parts)) for i, part in enumerate(parts, start=1))
+            start, tokens = number + 1, 0
+    if start <= len(pages):
+        chunks.append(PageChunk(start, len(pages), _page_text(pages[start - 1:])))
+
+    logger.info(
+        "Packed %d page(s) into %d chunk(s) of at most ~%d tokens",
+        len(pages), len(chunks), token_budget,
+    )
+    return chunks
+
+
+def _page_text(pages: List[str]) -> str:
+    """Join pages the way `ParsedDocument.page_range_text` does."""
+    return "".join(f"{page}\n" for page in pages if page)
+
+
+def _split_lines(text: str, token_budget: int) -> List[str]:
+    """Split text at line boundaries into pieces of at most `token_budget` tokens."""
+    pieces: List[str] = []
+    current: List[str] = []
+    tokens = 0
+    for line in text.splitlines(keepends=True):
+        line_tokens = estimate_tokens(line)
+        if current and tokens + line_tokens > token_budget:
+            pieces.append("".join(current))
+            current, tokens = [], 0
+        current.append(line)
+        tokens += line_tokens
+    if current:
+        pieces.append("".join(current))
+    return pieces
@@ -0,0 +1,204 @@
+"""Local clause parser for conditions with regular, line-based structure.
+
+`enrich_condition` asks the model to split a condition into its nested
+clauses ("1.1", "a)", "(i)", ...). Most conditions either have no
+sub-structure or list their parts one per line with a consistent numbering
+scheme, which can be parsed without a model call. `parse_clauses` returns the
+same `clauses` structure as enrichment_schema.json together with a confidence
+score; callers fall back to the model below EXTRACTION_LOCAL_CLAUSES_MIN_CONFIDENCE.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from condition_cron.extraction.settings import get_bool_setting, get_float_setting
+
+DEFAULT_MIN_CONFIDENCE = 0.9
+
+# Structure the parser is sure about, and cases it leaves to the model.
+CONFIDENT = 0.95
+UNSURE = 0.5
+
+_ROMAN = re.compile(r"^(x{0,3})(ix|iv|v?i{0,3})$")
+_ITEM = re.compile(
+    r"^(?P<id>"
+    r"\d+(?:\.\d+)+\.?"  # 1.1, 2.3.1
+    r"|\((?:\d+|[a-z]|[A-Z]|[ivx]+)\)"  # (1), (a), (A), (iv)
+    r"|(?:\d+|[a-z]|[A-Z]|[ivx]+)[.)]"  # 1. 1) a. a) A) iv.
+    r")\s+(?P<text>\S.*)$"
+)
+# Enumerations run together on one line, e.g. "...the following: (a) x; (b) y".
+_INLINE_ITEMS = re.compile(r"(?:^|[\s:;,])\((?:[a-z]|[ivx]+|\d+)\)\s|[:;]\s+(?:and\s+|or\s+)?(?:[a-z]|[ivx]+|\d+)\)\s")
+_BULLET = re.compile(r"^[•●▪◦‣\-–*]\s")
+
+
+@dataclass
+class ClauseParse:
+    """Result of `parse_clauses`: enrichment-schema clauses and how sure the parser is."""
+
+    clauses: List[Dict[str, Any]]
+    confidence: float
+    reason: str = ""
+
+
+@dataclass
+class _Item:
+    identifier: str
+    text: str
+    style: Tuple[str, str]
+    ordinal: int
+    children: List["_Item"] = field(default_factory=list)
+
+
+def is_local_clause_parser_enabled() -> bool:
+    return get_bool_setting("EXTRACTION_LOCAL_CLAUSES", False)
+
+
+def get_min_confidence() -> float:
+    return get_float_setting("EXTRACTION_LOCAL_CLAUSES_MIN_CONFIDENCE", DEFAULT_MIN_CONFIDENCE)
+
+
+def local_clauses(condition_text: str) -> Optional[List[Dict[str, Any]]]:
+    """Clauses parsed locally when enabled and confident enough, else None (ask the model)."""
+    if not is_local_clause_parser_enabled():
+        return None
+    parsed = parse_clauses(condition_text)
+    return parsed.clauses if parsed.confidence >= get_min_confidence() else None
+
+
+def parse_clauses(condition_text: str) -> ClauseParse:
+    """Split `condition_text` into nested clauses using line-start identifiers."""
+    lines = [" ".join(line.split()) for line in condition_text.splitlines()]
+    lines = [line for line in lines if line]
+
+    lead: List[str] = []
+    roots: List[_Item] = []
+    stack: List[_Item] = []
+    for previous, line in zip([None] + lines, lines):
+        match = _ITEM.match(line)
+        if match is not None and previous is not None and not _ends_clause(previous):
+            # "... section\n3.1 of the Act" or "... within\n1. year": a wrapped
+            # line that happens to start like an identifier.
+            return ClauseParse([], UNSURE, "identifier after unfinished line")
+        if match is None:
+            if _BULLET.match(line):
+                return ClauseParse([], UNSURE, "bullets")
+            if not stack:
+                lead.append(line)
+                continue
+            if _ends_sentence(stack[-1].text) and line[0].isupper():
+                return ClauseParse([], UNSURE, "text after list")
+            stack[-1].text += " " + line
+            continue
+
+        item = _place(match.group("id"), match.group("text"), stack)
+        if item is None:
+            return ClauseParse([], UNSURE, "irregular numbering")
+        if stack:
+            stack[-1].children.append(item)
+        else:
+            roots.append(item)
+        stack.append(item)
+
+    texts = lead + [text for item in roots for text in _texts(item)]
+    if any(_INLINE_ITEMS.search(text) for text in texts):
+        return ClauseParse([], UNSURE, "inline enumeration")
+    if not roots:
+        return ClauseParse([], 1.0, "no structure")
+
+    if lead:
+        if _depth(roots) > 2:
+            return ClauseParse([], UNSURE, "too deep")
+        clauses = [{
+            "clause_identifier": "",
+            "clause_text": " ".join(lead),
+            "subconditions": [_subcondition(item, nested=True) for item in roots],
+        }]
+    else:
+        if _depth(roots) > 3:
+            return ClauseParse([], UNSURE, "too deep")
+        clauses = [
+            {
+                "clause_identifier": item.identifier,
+                "clause_text": item.text,
+                "subconditions": [_subcondition(child, nested=True) for child in item.children],
+            }
+            for item in roots
+        ]
+    return ClauseParse(clauses, CONFIDENT, "line structure")
+
+
+def _place(identifier: str, text: str, stack: List[_Item]) -> Optional[_Item]:
+    """Pop `stack` to where `identifier` belongs and return its item, or None if it fits nowhere.
+
+    An identifier continues an open level when it has that level's style and
+    the next ordinal (so "i" after "h)" is a letter, but after "(a)" starts
+    roman numerals); otherwise it must be the first of a new, deeper level.
+    """
+    candidates = _styles(identifier)
+    for depth in range(len(stack) - 1, -1, -1):
+        open_item = stack[depth]
+        for style, ordinal in candidates:
+            if style == open_item.style and ordinal == open_item.ordinal + 1:
+                del stack[depth:]
+                return _Item(identifier, text, style, ordinal)
+    open_styles = {item.style for item in stack}
+    for style, ordinal in candidates:
+        if ordinal == 1 and style not in open_styles:
+            return _Item(identifier, text, style, ordinal)
+    return None
+
+
+def _styles(identifier: str) -> List[Tuple[Tuple[str, str], int]]:
+    """Possible (style, ordinal) readings of an identifier; "i" can be a letter or a numeral."""
+    if identifier[0].isdigit() and "." in identifier.rstrip("."):
+        parts = identifier.rstrip(".").split(".")
+        return [((f"decimal{len(parts)}", ".".join(parts[:-1])), int(parts[-1]))]
+
+    if identifier.startswith("("):
+        value, wrapper = identifier[1:-1], "()"
+    else:
+        value, wrapper = identifier[:-1], identifier[-1]
+    if value.isdigit():
+        return [(("number", wrapper), int(value))]
+
+    readings = []
+    if len(value) == 1:
+        kind = "lower" if value.islower() else "upper"
+        readings.append(((kind, wrapper), ord(value.lower()) - ord("a") + 1))
+    if value.islower() and _ROMAN.match(value):
+        readings.append((("roman", wrapper), _roman_value(value)))
+    return readings
+
+
+def _roman_value(numeral: str) -> int:
+    values = {"i": 1, "v": 5, "x": 10}
+    total = 0
+    for current, following in zip(numeral, numeral[1:] + " "):
+        value = values[current]
+        total += -value if following != " " and values[following] > value else value
+    return total
+
+
+def _ends_sentence(text: str) -> bool:
+    return text.endswith((".", ":"))
+
+
+def _ends_clause(text: str) -> bool:
+    return text.endswith((".", ":", ";", ", and", ", or", "; and", "; or"))
+
+
+def _texts(item: _Item) -> List[str]:
+    return [item.text] + [text for child in item.children for text in _texts(child)]
+
+
+def _depth(items: List[_Item]) -> int:
+    return max((1 + _depth(item.children) for item in items), default=0)
+
+
+def _subcondition(item: _Item, nested: bool) -> Dict[str, Any]:
+    subcondition = {"subcondition_identifier": item.identifier, "subcondition_text": item.text}
+    if nested:
+        subcondition["subconditions"] = [_subcondition(child, nested=False) for child in item.children]
+    return subcondition
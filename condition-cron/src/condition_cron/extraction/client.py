@@ -1,13 +1,179 @@
+import asyncio
+import logging
 import os
+import time
+from contextlib import asynccontextmanager
 from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, Optional
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+
+from condition_cron.extraction.llm_cache import (
+    CompletionCache,
+    get_completion_cache,
+    is_cacheable,
+    is_cache_bypassed,
+    is_complete,
+    request_key,
+)
+from condition_cron.extraction.rate_limit import RateLimiter, get_rate_limiter, request_tokens
+from condition_cron.extraction.telemetry import record_call
+
+logger = logging.getLogger(__name__)
+
+
+class _CachedCompletions:
+    """Completion cache lookups shared by the sync and async `chat.completions` stand-ins.
+
+    `create(bypass_cache=True, ...)` is how a retry loop resends a request
+    whose answer it rejected (wrong condition count, unparseable tool call):
+    the cached entry is dropped and the model is asked again.
+    """
+
+    def __init__(self, completions, rate_limiter: RateLimiter, cache: Optional[CompletionCache]):
+        self._completions = completions
+        self._rate_limiter = rate_limiter
+        self._cache = cache
+
+    def _cache_key(self, kwargs: Dict[str, Any]) -> Optional[str]:
+        return request_key(kwargs) if self._cache and is_cacheable(kwargs) else None
+
+    def _cached(self, key: Optional[str], bypass_cache: bool):
+        if not key:
+            return None
+        if bypass_cache:
+            self._cache.discard(key)
+            return None
+        if is_cache_bypassed():
+            return None
+        return self._cache.get(key)
+
+    def _request_tokens(self, kwargs: Dict[str, Any]) -> int:
+        return request_tokens(kwargs) if self._rate_limiter.counts_tokens else 0
+
+    def _store(self, key: Optional[str], kwargs: Dict[str, Any], completion) -> None:
+        if not key or not is_complete(completion):
+            return
+        try:
+            self._cache.put(key, kwargs.get("model"), completion)
+        except Exception as e:
+            logger.warning("Could not store completion in LLM cache: %s", e)
+
+
+class _Completions(_CachedCompletions):
+    """`chat.completions` stand-in that consults the completion cache and
+    calls the model through the shared rate limiter, which paces and retries it.
+    Every call is recorded for the document's telemetry."""
+
+    def create(self, bypass_cache: bool = False, **kwargs):
+        started = time.perf_counter()
+        key = self._cache_key(kwargs)
+        cached = self._cached(key, bypass_cache)
+        if cached is not None:
+            record_call(cached, time.perf_counter() - started, cached=True)
+            return cached
+
+        retries = []
+        try:
+            completion = self._rate_limiter.call(
+                lambda: self._completions.create(**kwargs),
+                self._request_tokens(kwargs),
+                on_retry=lambda: retries.append(1),
+            )
+        except Exception:
+            record_call(None, time.perf_counter() - started, retries=len(retries))
+            raise
+        record_call(completion, time.perf_counter() - started, retries=len(retries))
+        self._store(key, kwargs, completion)
+        return completion
+
+
+class _AsyncCompletions(_CachedCompletions):
+    """Async `chat.completions` stand-in; a semaphore caps requests in flight."""
+
+    def __init__(self, completions, rate_limiter: RateLimiter, cache: Optional[CompletionCache], max_in_flight: int):
+        super().__init__(completions, rate_limiter, cache)
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+
+    async def create(self, bypass_cache: bool = False, **kwargs):
+        started = time.perf_counter()
+        key = self._cache_key(kwargs)
+        cached = self._cached(key, bypass_cache)
+        if cached is not None:
+            record_call(cached, time.perf_counter() - started, cached=True)
+            return cached
+
+        retries = []
+        try:
+            async with self._in_flight:
+                completion = await self._rate_limiter.call_async(
+                    lambda: self._completions.create(**kwargs),
+                    self._request_tokens(kwargs),
+                    on_retry=lambda: retries.append(1),
+                )
+        except Exception:
+            record_call(None, time.perf_counter() - started, retries=len(retries))
+            raise
+        record_call(completion, time.perf_counter() - started, retries=len(retries))
+        self._store(key, kwargs, completion)
+        return completion
+
+
+class ExtractorClient:
+    """OpenAI client facade shared by every extraction module.
+
+    Callers only use `client.chat.completions.create`, so routing that call
+    through here applies the same cache and process-wide limits to every stage.
+    """
+
+    def __init__(self, client: OpenAI, rate_limiter: RateLimiter, cache: Optional[CompletionCache] = None):
+        self.chat = SimpleNamespace(
+            completions=_Completions(client.chat.completions, rate_limiter, cache),
+        )
+
+
+class AsyncExtractorClient:
+    """AsyncOpenAI counterpart of `ExtractorClient` for the asyncio pipeline."""
+
+    def __init__(
+        self,
+        client: AsyncOpenAI,
+        rate_limiter: RateLimiter,
+        cache: Optional[CompletionCache] = None,
+        max_in_flight: int = 32,
+    ):
+        self.chat = SimpleNamespace(
+            completions=_AsyncCompletions(client.chat.completions, rate_limiter, cache, max_in_flight),
+        )
+
+
+def _client_options() -> Dict[str, Any]:
+    """Connection settings shared by the sync and async OpenAI clients."""
+    return {
+        "api_key": os.getenv("EXTRACTOR_API_KEY") or os.getenv("OPENAI_API_KEY") or "not-set",
+        "base_url": f"{os.getenv('EXTRACTOR_API_URL', '').rstrip('/')}/v1" if os.getenv("EXTRACTOR_API_URL") else None,
+        # Retries and backoff are handled by the shared RateLimiter.
+        "max_retries": 0,
+    }
 
 
 @lru_cache(maxsize=1)
-def get_openai_client() -> OpenAI:
+def get_openai_client() -> ExtractorClient:
     """Return a single, cached instance of the OpenAI client based on environment variables."""
-    return OpenAI(
-        api_key=os.getenv("EXTRACTOR_API_KEY") or os.getenv("OPENAI_API_KEY") or "not-set",
-        base_url=f"{os.getenv('EXTRACTOR_API_URL', '').rstrip('/')}/v1" if os.getenv("EXTRACTOR_API_URL") else None,
-    )
+    client = OpenAI(**_client_options())
+    return ExtractorClient(client, get_rate_limiter(), get_completion_cache())
+
+
+@asynccontextmanager
+async def async_openai_client(max_in_flight: int) -> AsyncIterator[AsyncExtractorClient]:
+    """Open an async client for one event loop and close its connections afterwards.
+
+    Unlike the sync client this is not cached: httpx connection pools belong to
+    the loop that opened them, and each pipeline run gets its own loop.
+    """
+    client = AsyncOpenAI(**_client_options())
+    try:
+        yield AsyncExtractorClient(client, get_rate_limiter(), get_completion_cache(), max_in_flight)
+    finally:
+        await client.close()
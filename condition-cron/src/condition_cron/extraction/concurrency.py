@@ -0,0 +1,174 @@
+"""Bounded-concurrency fan-out for per-condition extraction stages.
+
+`map_conditions` runs a stage on a thread pool; `gather_conditions` is the
+asyncio counterpart used when EXTRACTION_ASYNC_ENABLED is set.
+"""
+
+import asyncio
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, TypeVar
+
+from condition_cron.extraction.checkpoint import ExtractionCheckpoint
+from condition_cron.extraction.llm_steps import LlmSteps, run_steps, run_steps_async
+from condition_cron.extraction.settings import get_bool_setting, get_int_setting
+from condition_cron.extraction.telemetry import in_stage, llm_stage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_ASYNC_MAX_IN_FLIGHT = 32
+
+T = TypeVar("T")
+
+
+def get_max_workers() -> int:
+    """Return the configured number of concurrent LLM workers (at least 1)."""
+    return max(1, get_int_setting("EXTRACTION_MAX_WORKERS", DEFAULT_MAX_WORKERS))
+
+
+def is_async_enabled() -> bool:
+    """Whether the pipeline should run on the asyncio client instead of threads."""
+    return get_bool_setting("EXTRACTION_ASYNC_ENABLED", False)
+
+
+def get_async_max_in_flight() -> int:
+    """Return how many LLM requests the async pipeline may have open at once."""
+    return max(1, get_int_setting("EXTRACTION_ASYNC_MAX_IN_FLIGHT", DEFAULT_ASYNC_MAX_IN_FLIGHT))
+
+
+def map_conditions(
+    stage: str,
+    fn: Callable[[Dict[str, Any]], T],
+    conditions: Sequence[Dict[str, Any]],
+    default_factory: Callable[[], T],
+    max_workers: Optional[int] = None,
+    checkpoint: Optional[ExtractionCheckpoint] = None,
+) -> List[T]:
+    """Run `fn` over every condition with bounded concurrency.
+
+    Results are returned in the same order as `conditions`. A failure on one
+    condition is logged and replaced with `default_factory()` so it cannot sink
+    the rest of the document. Each task runs in a copy of the caller's context,
+    so the Flask app context stays visible inside worker threads. LLM calls
+    are recorded under `stage` and the condition's number.
+
+    With a `checkpoint`, results already recorded for this stage are reused
+    and each newly successful result is recorded under the condition's
+    position in the list.
+    """
+    if not conditions:
+        return []
+
+    def run_one(position: int, condition: Dict[str, Any]) -> T:
+        key = str(position)
+        if checkpoint:
+            recorded = checkpoint.get(stage, key)
+            if recorded is not None:
+                return recorded
+        try:
+            result = in_stage(stage, _condition_label(position, condition), fn, condition)
+        except Exception as e:
+            logger.error(
+                "%s failed for condition %s: %s",
+                stage, condition.get("condition_number", "?"), e,
+                exc_info=True,
+            )
+            return default_factory()
+        if checkpoint:
+            checkpoint.put(stage, key, result)
+        return result
+
+    workers = min(max_workers or get_max_workers(), len(conditions))
+    if workers == 1:
+        results = [run_one(position, condition) for position, condition in enumerate(conditions)]
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"extract-{stage}") as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, run_one, position, condition)
+                for position, condition in enumerate(conditions)
+            ]
+            results = [future.result() for future in futures]
+
+    if checkpoint:
+        checkpoint.flush()
+    return results
+
+
+def run_chunks(stage: str, client, chunks: Sequence[LlmSteps[T]], max_workers: Optional[int] = None) -> List[T]:
+    """Run independent chunk steps on a bounded pool and return results in chunk order.
+
+    Length-splits inside a chunk (`Parallel` sub-steps) are scheduled onto the
+    same pool, so the EXTRACTION_MAX_WORKERS bound covers them too. A failed
+    chunk fails the whole call, as it did when chunks ran one at a time.
+    """
+    workers = min(max_workers or get_max_workers(), len(chunks))
+    if workers <= 1:
+        return [in_stage(stage, f"chunk {i}", run_steps, client, chunk) for i, chunk in enumerate(chunks, start=1)]
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"extract-{stage}") as executor:
+        futures = [
+            executor.submit(contextvars.copy_context().run, in_stage, stage, f"chunk {i}", run_steps, client, chunk, executor)
+            for i, chunk in enumerate(chunks, start=1)
+        ]
+        try:
+            return [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+
+async def gather_chunks(stage: str, client, chunks: Sequence[LlmSteps[T]]) -> List[T]:
+    """Async `run_chunks`: request every chunk at once and return results in chunk order."""
+    async def run_one(label: str, chunk: LlmSteps[T]) -> T:
+        with llm_stage(stage, label):
+            return await run_steps_async(client, chunk)
+
+    return list(await asyncio.gather(*(run_one(f"chunk {i}", chunk) for i, chunk in enumerate(chunks, start=1))))
+
+
+async def gather_conditions(
+    stage: str,
+    make_steps: Callable[[Dict[str, Any]], LlmSteps[T]],
+    conditions: Sequence[Dict[str, Any]],
+    default_factory: Callable[[], T],
+    client,
+    checkpoint: Optional[ExtractionCheckpoint] = None,
+) -> List[T]:
+    """Async `map_conditions`: run every condition's steps on `client` at once.
+
+    Same ordering, error isolation and checkpoint behaviour as
+    `map_conditions`; concurrency is bounded by the client's in-flight limit
+    rather than a worker count.
+    """
+    async def run_one(position: int, condition: Dict[str, Any]) -> T:
+        key = str(position)
+        if checkpoint:
+            recorded = checkpoint.get(stage, key)
+            if recorded is not None:
+                return recorded
+        try:
+            with llm_stage(stage, _condition_label(position, condition)):
+                result = await run_steps_async(client, make_steps(condition))
+        except Exception as e:
+            logger.error(
+                "%s failed for condition %s: %s",
+                stage, condition.get("condition_number", "?"), e,
+                exc_info=True,
+            )
+            return default_factory()
+        if checkpoint:
+            checkpoint.put(stage, key, result)
+        return result
+
+    results = await asyncio.gather(*(run_one(position, condition) for position, condition in enumerate(conditions)))
+    if checkpoint:
+        checkpoint.flush()
+    return list(results)
+
+
+def _condition_label(position: int, condition: Dict[str, Any]) -> str:
+    number = condition.get("condition_number") if isinstance(condition, dict) else None
+    return f"condition {number}" if number is not None else f"item {position + 1}"
@@ -0,0 +1,141 @@
+"""Local index of where each numbered condition starts in the document text.
+
+Numbered-condition extraction asks the model for a few conditions at a time.
+Without an index every one of those prompts carries the whole document; with
+it, each prompt only needs the text of its own conditions plus a margin.
+
+Anchors are found with two patterns: explicit "Condition 12" headings and
+line-leading numbers ("12.", "12)", "12 Title"). A line-leading number only
+counts when its line reads like a heading and its text runs on for a while,
+so list items inside a condition ("1. baseline surveys;") are not taken for
+conditions. Because tables of contents and nested lists can still produce
+runs of anchors, every chain starting at 1 is scored and the longest chain
+wins, with ties going to the chain whose conditions carry the most text. A
+chain that skips over a second anchor with the same number is ambiguous and
+dropped, and an index whose spans vary too much is not trusted at all.
+"""
+
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Characters of surrounding text included on each side of a condition span,
+# so headings and sentences split across an anchor are not lost.
+CONTEXT_MARGIN_CHARS = 1500
+
+# Shorter spans are almost certainly table-of-contents or list entries.
+MIN_CONDITION_CHARS = 20
+
+# A condition this many times shorter than the median one suggests the index
+# picked up a list inside a condition; the full text is sent instead.
+SUSPICIOUS_SPAN_RATIO = 10
+
+CONDITION_HEADING = re.compile(r"^[ \t]*condition[ \t]*(?:no\.?|#)?[ \t]*(\d{1,3})\b", re.IGNORECASE | re.MULTILINE)
+# "12." / "12)" / "12 Title"; a bare number must be followed by a capitalized
+# word so wrapped lines such as "30 days prior to ..." are not anchors.
+NUMBERED_LINE = re.compile(r"^[ \t]*(\d{1,3})(?:[.)](?!\d)[ \t]*(?=\S)|[ \t]+(?=[A-Z]))", re.MULTILINE)
+
+
+def _looks_like_heading(text: str, match: re.Match) -> bool:
+    """Whether a numbered line reads like a condition title, not a list item."""
+    line_end = text.find("\n", match.end())
+    title = text[match.end():line_end if line_end != -1 else len(text)].strip()
+    return title[:1].isupper() and not title.endswith((";", ",", " and", " or"))
+
+
+def _candidates(text: str) -> List[Tuple[int, int]]:
+    """Return (position, number) anchors, preferring explicit condition headings."""
+    headings = [(m.start(), int(m.group(1))) for m in CONDITION_HEADING.finditer(text)]
+    if any(number == 1 for _, number in headings):
+        return headings
+
+    lines = list(NUMBERED_LINE.finditer(text))
+    ends = [m.start() for m in lines[1:]] + [len(text)]
+    return [
+        (m.start(), int(m.group(1)))
+        for m, end in zip(lines, ends)
+        if end - m.start() >= MIN_CONDITION_CHARS and _looks_like_heading(text, m)
+    ]
+
+
+def _chain_from(candidates: List[Tuple[int, int]], start_index: int, limit: int) -> Optional[List[int]]:
+    """Follow anchors 1, 2, 3, ... in document order from one starting anchor.
+
+    Returns None when another anchor with the number just taken turns up
+    before the next one in the chain (or, for the last, anywhere after it):
+    that later anchor is as likely to be the real start of the condition.
+    """
+    positions = [candidates[start_index][0]]
+    expected = 2
+    for position, number in candidates[start_index + 1:]:
+        if number == expected - 1:
+            return None
+        if expected > limit:
+            continue
+        if number == expected:
+            positions.append(position)
+            expected += 1
+    return positions
+
+
+def _spans_look_suspicious(spans: List[int]) -> bool:
+    """Whether some condition is far shorter than the median one."""
+    if len(spans) < 3:
+        return False
+    median = sorted(spans)[len(spans) // 2]
+    return min(spans) * SUSPICIOUS_SPAN_RATIO < median
+
+
+def build_condition_index(text: str, condition_count: int) -> Dict[int, Tuple[int, int]]:
+    """Map condition numbers to (start, end) character spans in `text`.
+
+    Returns only the conditions that could be located; an empty dict means no
+    usable anchors were found and callers should send the full text.
+    """
+    if condition_count <= 0 or not text:
+        return {}
+
+    candidates = _candidates(text)
+    best: List[int] = []
+    for i, (_, number) in enumerate(candidates):
+        if number != 1:
+            continue
+        chain = _chain_from(candidates, i, condition_count)
+        if chain is None or any(end - start < MIN_CONDITION_CHARS for start, end in zip(chain, chain[1:])):
+            continue
+        # More conditions located wins; among equally long chains, prefer the
+        # one spread over more text (real conditions, not a contents page).
+        if (len(chain), chain[-1] - chain[0]) > (len(best), best[-1] - best[0] if best else 0):
+            best = chain
+
+    # The last span runs to the end of the document, so it is left out.
+    if _spans_look_suspicious([end - start for start, end in zip(best, best[1:])]):
+        logger.warning("Condition index spans vary too much; sending the full text instead")
+        return {}
+
+    ends = best[1:] + [len(text)]
+    index = {number: (start, end) for number, (start, end) in enumerate(zip(best, ends), start=1)}
+    logger.info("Condition index located %d of %d conditions", len(index), condition_count)
+    return index
+
+
+def text_for_range(
+    text: str,
+    index: Dict[int, Tuple[int, int]],
+    first: int,
+    last: int,
+    margin: int = CONTEXT_MARGIN_CHARS,
+) -> Optional[str]:
+    """Return the text of conditions first..last plus a context margin.
+
+    Returns None when any condition in the range is missing from the index,
+    in which case the caller should fall back to the full text.
+    """
+    if any(number not in index for number in range(first, last + 1)):
+        return None
+
+    start = max(0, index[first][0] - margin)
+    end = min(len(text), index[last][1] + margin)
+    return text[start:end]
@@ -0,0 +1,128 @@
+"""Parsed document model shared by every extraction stage.
+
+`load_document` opens the source file once; stages then read page text,
+page counts and tables from the resulting `ParsedDocument` instead of
+re-parsing the PDF for every prompt.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import List, Union
+
+from condition_cron.extraction import pdf_reader
+from condition_cron.extraction.boilerplate import is_boilerplate_stripping_enabled, strip_boilerplate
+from condition_cron.extraction.settings import get_int_setting, get_setting
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ParsedDocument:
+    """Page-level text of one document, parsed once per extraction request."""
+
+    file_path: str
+    pages: List[str]
+    _tables: List[List[List[List[str]]]] = field(default=None, init=False, repr=False)
+    _tables_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    @property
+    def is_pdf(self) -> bool:
+        return self.file_path.endswith(".pdf")
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pages)
+
+    @cached_property
+    def text(self) -> str:
+        """Full document text, one newline-terminated block per non-empty page."""
+        return "".join(f"{page}\n" for page in self.pages if page)
+
+    @cached_property
+    def page_offsets(self) -> List[int]:
+        """Character offset in `text` where each page starts."""
+        offsets = []
+        position = 0
+        for page in self.pages:
+            offsets.append(position)
+            if page:
+                position += len(page) + 1
+        return offsets
+
+    def page_range_text(self, start_page: int, end_page: int) -> str:
+        """Text of a page range (1-indexed, inclusive), formatted like `text`."""
+        return "".join(f"{page}\n" for page in self.pages[start_page - 1:end_page] if page)
+
+    def tables(self, page_number: int) -> List[List[List[str]]]:
+        """Tables on a page (1-indexed). Parsed lazily, once, on first access."""
+        with self._tables_lock:
+            if self._tables is None:
+                self._tables = self._load_tables()
+        if 1 <= page_number <= len(self._tables):
+            return self._tables[page_number - 1]
+        return []
+
+    def _load_tables(self) -> List[List[List[List[str]]]]:
+        if not self.is_pdf:
+            return []
+        return pdf_reader.read_pdf_page_tables(
+            self.file_path, get_pdf_max_rss_mb(), processes=get_pdf_processes(), min_pages=get_pdf_parallel_min_pages()
+        )
+
+
+def get_pdf_max_rss_mb() -> int:
+    """Resident memory (MB) at which PDF parsing gives up; 0 disables the guard."""
+    return get_int_setting("EXTRACTION_PDF_MAX_RSS_MB", 0)
+
+
+def get_pdf_processes() -> int:
+    """Worker processes PDF parsing may split a document across (1 = parse in-process)."""
+    return max(1, get_int_setting("EXTRACTION_PDF_PROCESSES", 1))
+
+
+def get_pdf_parallel_min_pages() -> int:
+    """Pages a document needs before parsing it is split across processes."""
+    return get_int_setting("EXTRACTION_PDF_PARALLEL_MIN_PAGES", pdf_reader.DEFAULT_PARALLEL_MIN_PAGES)
+
+
+def get_pdf_text_backend() -> str:
+    """Return the configured PDF text backend, falling back to the default on bad values."""
+    backend = str(get_setting("EXTRACTION_PDF_TEXT_BACKEND", pdf_reader.DEFAULT_PDF_TEXT_BACKEND)).strip().lower()
+    if backend not in pdf_reader.PDF_TEXT_BACKENDS:
+        logger.warning(
+            "Invalid EXTRACTION_PDF_TEXT_BACKEND=%r; using %s", backend, pdf_reader.DEFAULT_PDF_TEXT_BACKEND
+        )
+        return pdf_reader.DEFAULT_PDF_TEXT_BACKEND
+    return backend
+
+
+def load_document(file_path: str) -> ParsedDocument:
+    """Parse a PDF or TXT file into a `ParsedDocument`."""
+    if file_path.endswith(".pdf"):
+        pages = pdf_reader.read_pdf_pages(
+            file_path, get_pdf_max_rss_mb(), get_pdf_text_backend(),
+            processes=get_pdf_processes(), min_pages=get_pdf_parallel_min_pages(),
+        )
+    elif file_path.endswith(".txt"):
+        with open(file_path, "rb") as f:
+            pages = [f.read().decode("utf-8", errors="ignore")]
+    else:
+        raise ValueError("Unsupported file type. Only PDF and TXT files are supported.")
+
+    logger.info("Parsed %s: %d page(s)", file_path, len(pages))
+    if is_boilerplate_stripping_enabled():
+        pages, report = strip_boilerplate(pages)
+        logger.info(
+            "Stripped %d repeated header/footer line(s) from %s: ~%d -> ~%d tokens (~%d saved per full-text prompt)",
+            report.lines_removed, file_path, report.tokens_before, report.tokens_after, report.tokens_saved,
+        )
+    return ParsedDocument(file_path=file_path, pages=pages)
+
+
+def ensure_document(source: Union[str, ParsedDocument]) -> ParsedDocument:
+    """Accept either a file path or an already parsed document."""
+    if isinstance(source, ParsedDocument):
+        return source
+    return load_document(source)
@@ -1,16 +1,49 @@
+import asyncio
 import os
 import json
 import logging
 
-from condition_cron.extraction import pdf_reader
+from condition_cron.extraction.checkpoint import ExtractionCheckpoint
+from condition_cron.extraction.chunking import (
+    PageChunk,
+    estimate_tokens,
+    fixed_page_chunks,
+    get_chunk_token_budget,
+    pack_page_chunks,
+)
+from condition_cron.extraction.clauses import local_clauses
+from condition_cron.extraction.concurrency import (
+    gather_chunks,
+    gather_conditions,
+    get_async_max_in_flight,
+    is_async_enabled,
+    map_conditions,
+    run_chunks,
+)
+from condition_cron.extraction.condition_index import build_condition_index, text_for_range
+from condition_cron.extraction.document import ParsedDocument, ensure_document, load_document
 from condition_cron.extraction.document_classifier import classify_document
-from condition_cron.extraction.pdf_reader import read_pdf_page_range, get_page_count
-from condition_cron.extraction.management_plans import extract_management_plan_info_from_json
-from condition_cron.extraction.reports import extract_report_info_from_json
+from condition_cron.extraction.llm_steps import LlmSteps, Parallel, run_steps
+from condition_cron.extraction.management_plans import (
+    DELIVERABLES_TOOL,
+    PLAN_REQUIREMENT_TOOL,
+    condition_deliverables_steps,
+    extract_management_plan_info_from_json,
+    extract_management_plan_info_from_json_async,
+)
+from condition_cron.extraction.reports import (
+    REPORT_REQUIREMENT_TOOL,
+    REPORTS_TOOL,
+    condition_report_submissions_steps,
+    extract_report_info_from_json,
+    extract_report_info_from_json_async,
+)
+from condition_cron.extraction.settings import get_bool_setting, get_int_setting
+from condition_cron.extraction.table_rows import is_table_parser_enabled, parse_table_pages
 
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
-from condition_cron.extraction.client import get_openai_client
+from condition_cron.extraction.client import async_openai_client, get_openai_client
 
 logger = logging.getLogger(__name__)
 
@@ -40,13 +73,7 @@ def load_schema(schema_name):
 # ---------------------------------------------------------------------------
 def _read_file_text(file_path: str) -> str:
     """Read text from a PDF or TXT file path."""
-    with open(file_path, "rb") as f:
-        if file_path.endswith(".pdf"):
-            return pdf_reader.read_pdf(file_path)
-        elif file_path.endswith(".txt"):
-            return f.read().decode("utf-8", errors="ignore")
-        else:
-            raise ValueError("Unsupported file type. Only PDF and TXT files are supported.")
+    return load_document(file_path).text
 
 
 def read_file_text(file_path: str) -> str:
@@ -65,6 +92,11 @@ class LengthFinishReasonError(FinishReasonError):
     pass
 
 
+NUMBERED_RANGE_FAILURE = "Failed to extract the correct number of conditions after multiple attempts"
+TAG_CONDITIONS_TOOL_NAME = "tag_conditions"
+ENRICH_BATCH_TOOL_NAME = "enrich_conditions"
+
+
 # ---------------------------------------------------------------------------
 # Document classification + count (new entry point, replaces count_conditions)
 # ---------------------------------------------------------------------------
@@ -85,12 +117,44 @@ def classify_and_count(file_path: str, file_text: str = None) -> Dict[str, Any]:
 # Page-based condition extraction (universal — works for all doc types)
 # ---------------------------------------------------------------------------
 
-def extract_conditions_from_pages(file_path: str, classification: Dict[str, Any], pages_per_chunk: int = 3) -> Dict[str, Any]:
+def extract_conditions_from_pages(
+    document: Union[str, ParsedDocument],
+    classification: Dict[str, Any],
+    pages_per_chunk: int = 3,
+    checkpoint: Optional[ExtractionCheckpoint] = None,
+) -> Dict[str, Any]:
     """Extract all conditions from a document using page-based chunking.
 
     Works for numbered conditions, table formats, and bulleted commitments.
     Returns a dict: {"conditions": [...]}.
     """
+    chunks, combine = _plan_condition_chunks(ensure_document(document), classification, pages_per_chunk, checkpoint)
+    return combine(run_chunks("chunks", get_openai_client(), chunks))
+
+
+async def _extract_conditions_async(
+    client,
+    document: ParsedDocument,
+    classification: Dict[str, Any],
+    pages_per_chunk: int = 3,
+    checkpoint: Optional[ExtractionCheckpoint] = None,
+) -> Dict[str, Any]:
+    """Async `extract_conditions_from_pages`: every chunk is requested at once."""
+    chunks, combine = _plan_condition_chunks(document, classification, pages_per_chunk, checkpoint)
+    return combine(await gather_chunks("chunks", client, chunks))
+
+
+def _plan_condition_chunks(
+    document: ParsedDocument,
+    classification: Dict[str, Any],
+    pages_per_chunk: Optional[int],
+    checkpoint: Optional[ExtractionCheckpoint],
+) -> Tuple[List[LlmSteps[Any]], Callable[[List[Any]], Dict[str, Any]]]:
+    """Split condition extraction into independent chunks.
+
+    Returns the steps for each chunk and a function that combines the chunk
+    results (in chunk order) into {"conditions": [...]}.
+    """
     doc_type = classification.get("document_type", "numbered_conditions")
     has_numbered = classification.get("has_numbered_conditions", True)
 
@@ -99,7 +163,7 @@ def extract_conditions_from_pages(file_path: str, classification: Dict[str, Any]
     if has_numbered and doc_type == "numbered_conditions":
         estimated_count = classification.get("estimated_item_count", 0)
         if estimated_count > 0:
-            return _extract_numbered_conditions(file_path, estimated_count)
+            return _plan_numbered_chunks(document, estimated_count, checkpoint=checkpoint)
 
     # Table-format docs pack many conditions per page; use smaller chunks to avoid
     # the AI stopping early (finish_reason="stop") before extracting all conditions.
@@ -107,128 +171,401 @@ def extract_conditions_from_pages(file_path: str, classification: Dict[str, Any]
         pages_per_chunk = 2 if doc_type == "table_format" else 5
 
     # For all other formats, use page-based extraction
-    return _extract_by_pages(file_path, classification, pages_per_chunk)
-
-
-def _extract_numbered_conditions(file_path: str, number_of_conditions: int, chunk_size: int = 5) -> Dict[str, Any]:
-    """Extract numbered conditions using the proven chunk-by-number approach."""
-    chunks = []
-    for i in range(0, number_of_conditions, chunk_size):
-        end = min(i + chunk_size, number_of_conditions)
-        logger.info("Extracting conditions %d to %d (of %d)", i + 1, end, number_of_conditions)
-        _, chunk = _extract_numbered_range(file_path, i + 1, end)
+    return _plan_page_chunks(document, classification, pages_per_chunk, checkpoint=checkpoint)
+
+
+def _plan_numbered_chunks(
+    document: ParsedDocument,
+    number_of_conditions: int,
+    chunk_size: int = 5,
+    checkpoint: Optional[ExtractionCheckpoint] = None,
+) -> Tuple[List[LlmSteps[Any]], Callable[[List[Any]], Dict[str, Any]]]:
+    """Plan the proven chunk-by-number approach for numbered conditions."""
+    index = build_condition_index(document.text, number_of_conditions)
+
+    def chunk_steps(start: int, end: int) -> LlmSteps[Any]:
+        key = f"{start}-{end}"
+        chunk = checkpoint.get("numbered_chunks", key) if checkpoint else None
+        if chunk is not None:
+            logger.info("Reusing checkpointed conditions %d to %d", start, end)
+        else:
+            logger.info("Extracting conditions %d to %d (of %d)", start, end, number_of_conditions)
+            _, chunk = yield from _extract_numbered_range_steps(document, start, end, index)
+            if checkpoint and chunk != NUMBERED_RANGE_FAILURE:
+                checkpoint.put("numbered_chunks", key, chunk)
         logger.debug("Extracted chunk: %s", chunk)
-        chunks.append(chunk)
+        return chunk
+
+    def combine(chunks: List[Any]) -> Dict[str, Any]:
+        merged = json.loads(_merge_json_chunks(chunks))
+        logger.info("Successfully extracted all numbered conditions!")
+        return merged
+
+    chunks = [
+        chunk_steps(i + 1, min(i + chunk_size, number_of_conditions))
+        for i in range(0, number_of_conditions, chunk_size)
+    ]
+    return chunks, combine
+
+
+def _extract_numbered_conditions(
+    document: ParsedDocument,
+    number_of_conditions: int,
+    chunk_size: int = 5,
+    checkpoint: Optional[ExtractionCheckpoint] = None,
+) -> Dict[str, Any]:
+    """Extract numbered conditions using the proven chunk-by-number approach."""
+    chunks, combine = _plan_numbered_chunks(document, number_of_conditions, chunk_size, checkpoint)
+    return combine(run_chunks("chunks", get_openai_client(), chunks))
+
+
+def _extract_numbered_range(
+    document: ParsedDocument,
+    starting_condition_number: int,
+    ending_condition_number: int,
+    index: Optional[Dict[int, Tuple[int, int]]] = None,
+) -> Tuple[Any, str]:
+    """Extract a range of numbered conditions (see `_extract_numbered_range_steps`)."""
+    return run_steps(
+        get_openai_client(),
+        _extract_numbered_range_steps(document, starting_condition_number, ending_condition_number, index),
+    )
+
 
-    merged = _merge_json_chunks(chunks)
-    merged = json.loads(merged)
-    logger.info("Successfully extracted all numbered conditions!")
-    return merged
+def _extract_numbered_range_steps(
+    document: ParsedDocument,
+    starting_condition_number: int,
+    ending_condition_number: int,
+    index: Optional[Dict[int, Tuple[int, int]]] = None,
+) -> LlmSteps[Tuple[Any, str]]:
+    """Extract a range of numbered conditions with validation and retry logic.
 
+    When `index` locates every condition in the range, the first attempt sends
+    only that span of the document (plus a margin). Retries fall back to the
+    full text in case the local index was wrong.
 
-def _extract_numbered_range(file_path: str, starting_condition_number: int, ending_condition_number: int) -> Tuple[Any, str]:
-    """Extract a range of numbered conditions with validation and retry logic."""
+    Conditions returned with a number in the range are kept; when some are
+    missing, the remaining attempts ask only for those numbers instead of
+    the whole range again. Whatever is still missing after the last attempt
+    is logged and left out rather than failing the range.
+    """
 
-    def validate_response(response, expected_count):
+    def validate_response(response):
         finish_reason = response.choices[0].finish_reason
         if finish_reason == "length":
             raise LengthFinishReasonError("Response was cut off due to length of response.")
         elif finish_reason != "stop":
             raise FinishReasonError(f"Unexpected finish reason: {finish_reason}")
         response_json = json.loads(response.choices[0].message.tool_calls[0].function.arguments)
-        conditions = response_json.get("conditions", [])
-        return len(conditions) == expected_count
-
-    expected_count = ending_condition_number - starting_condition_number + 1
-    file_text = _read_file_text(file_path)
-
-    tool_schema = load_schema("condition_schema")
-    # Update description for numbered extraction
-    tool_schema["function"]["parameters"]["properties"]["conditions"]["description"] = (
-        f"Conditions {starting_condition_number} (inclusive) up to and including "
-        f"{ending_condition_number} extracted from the document. ALWAYS include the condition name."
-    )
-
-    tools = [tool_schema]
-    messages = [{"role": "user", "content": (
-        f"{EXTRACTION_SCOPE_INSTRUCTION}\n\n"
-        f"Here is a document with conditions:\n\n{file_text}\n\n"
-        f"Extract conditions {starting_condition_number} to {ending_condition_number}."
-    )}]
+        return response_json.get("conditions", [])
+
+    expected = list(range(starting_condition_number, ending_condition_number + 1))
+    expected_count = len(expected)
+    excerpt = text_for_range(document.text, index, starting_condition_number, ending_condition_number) if index else None
+
+    def request(numbers: List[int], use_excerpt: bool, retry: bool) -> Dict[str, Any]:
+        if len(numbers) == expected_count:
+            wanted = f"{starting_condition_number} to {ending_condition_number}"
+            description = (
+                f"Conditions {starting_condition_number} (inclusive) up to and including "
+                f"{ending_condition_number} extracted from the document. ALWAYS include the condition name."
+            )
+            text = excerpt if use_excerpt else None
+        else:
+            wanted = _number_list(numbers)
+            description = f"Only conditions {wanted} extracted from the document. ALWAYS include the condition name."
+            text = text_for_range(document.text, index, numbers[0], numbers[-1]) if use_excerpt and index else None
+
+        tool_schema = load_schema("condition_schema")
+        # Update description for numbered extraction
+        tool_schema["function"]["parameters"]["properties"]["conditions"]["description"] = description
+        document_text = f"an excerpt of a document with conditions:\n\n{text}" if text else f"a document with conditions:\n\n{document.text}"
+        return dict(
+            model=MODEL,
+            messages=[{"role": "user", "content": (
+                f"{EXTRACTION_SCOPE_INSTRUCTION}\n\n"
+                f"Here is {document_text}\n\n"
+                f"Extract conditions {wanted}."
+            )}],
+            tools=[tool_schema],
+            temperature=0.0,
+            tool_choice={"type": "function", "function": {"name": tool_schema["function"]["name"]}},
+            **_retry_options(retry),
+        )
 
-    client = get_openai_client()
+    # Conditions already returned with the right number; retries only ask for the rest.
+    kept: Dict[int, Dict[str, Any]] = {}
+    repairs = 0
     for attempt in range(3):
+        missing = [number for number in expected if number not in kept]
+        if kept:
+            repairs += 1
+        use_excerpt = excerpt is not None and (attempt == 0 or repairs == 1)
         try:
-            completion = client.chat.completions.create(
-                model=MODEL,
-                messages=messages,
-                tools=tools,
-                temperature=0.0,
-                tool_choice={"type": "function", "function": {"name": tool_schema["function"]["name"]}},
-            )
+            completion = yield request(missing, use_excerpt, retry=attempt > 0)
+            arguments = completion.choices[0].message.tool_calls[0].function.arguments
+            conditions = validate_response(completion)
+
+            by_number = _conditions_by_number(conditions)
+            if by_number is None or not (kept or set(by_number) & set(expected)):
+                # Unnumbered (or differently numbered) answer: fall back to checking the count alone.
+                if not kept and len(conditions) == expected_count:
+                    logger.info("Successfully extracted conditions %d to %d!", starting_condition_number, ending_condition_number)
+                    return completion, arguments
+                logger.error("Validation failed. Payload: %s", arguments)
+                logger.warning("Attempt %d: Validation failed. Retrying...", attempt + 1)
+                continue
 
-            if validate_response(completion, expected_count):
+            kept.update({number: condition for number, condition in by_number.items() if number in missing})
+            if len(kept) == expected_count:
                 logger.info("Successfully extracted conditions %d to %d!", starting_condition_number, ending_condition_number)
-                return completion, completion.choices[0].message.tool_calls[0].function.arguments
+                if not repairs and len(conditions) == expected_count:
+                    return completion, arguments
+                return None, json.dumps({"conditions": [kept[number] for number in expected]})
 
-            logger.error("Validation failed. Payload: %s", completion.choices[0].message.tool_calls[0].function.arguments)
-            logger.warning("Attempt %d: Validation failed. Retrying...", attempt + 1)
+            logger.warning(
+                "Attempt %d: conditions %s missing from the response; requesting only those",
+                attempt + 1, _number_list([number for number in expected if number not in kept]),
+            )
 
         except LengthFinishReasonError as e:
             logger.error("Exceeded GPT API response length: %s", e)
+            if kept:
+                continue
             mid = (starting_condition_number + ending_condition_number) // 2
-            logger.info("Splitting... %d to %d", starting_condition_number, mid)
-            _, first_half = _extract_numbered_range(file_path, starting_condition_number, mid)
-            logger.info("Splitting... %d to %d", mid + 1, ending_condition_number)
-            _, second_half = _extract_numbered_range(file_path, mid + 1, ending_condition_number)
+            logger.info(
+                "Splitting... %d to %d and %d to %d",
+                starting_condition_number, mid, mid + 1, ending_condition_number,
+            )
+            (_, first_half), (_, second_half) = yield Parallel([
+                _extract_numbered_range_steps(document, starting_condition_number, mid, index),
+                _extract_numbered_range_steps(document, mid + 1, ending_condition_number, index),
+            ])
             merged = _merge_json_chunks([first_half, second_half])
             return None, merged
 
         except Exception as e:
             logger.error("Exception in _extract_numbered_range: %s", e, exc_info=True)
 
-    return None, "Failed to extract the correct number of conditions after multiple attempts"
-
-
-def _extract_by_pages(file_path: str, classification: Dict[str, Any], pages_per_chunk: int = 3) -> Dict[str, Any]:
-    """Extract conditions/commitments using page-based chunking (for non-numbered docs)."""
+    if kept:
+        logger.error(
+            "Conditions %s could NOT be extracted after 3 attempts and are MISSING from the result; "
+            "keeping the other %d condition(s) of %d to %d.",
+            _number_list([number for number in expected if number not in kept]),
+            len(kept), starting_condition_number, ending_condition_number,
+        )
+        return None, json.dumps({"conditions": [kept[number] for number in expected if number in kept]})
+    return None, NUMBERED_RANGE_FAILURE
+
+
+def _conditions_by_number(conditions: List[Dict[str, Any]]) -> Optional[Dict[int, Dict[str, Any]]]:
+    """Index conditions by their condition_number, or None if any lacks a usable number."""
+    by_number: Dict[int, Dict[str, Any]] = {}
+    for condition in conditions:
+        number = condition.get("condition_number")
+        if isinstance(number, str) and number.strip().isdigit():
+            number = int(number)
+        if not isinstance(number, int) or isinstance(number, bool):
+            return None
+        by_number.setdefault(number, condition)
+    return by_number
+
+
+def _number_list(numbers: List[int]) -> str:
+    """Format condition numbers for a prompt, e.g. "7, 9 and 12"."""
+    words = [str(number) for number in numbers]
+    return words[0] if len(words) == 1 else f"{', '.join(words[:-1])} and {words[-1]}"
+
+
+def _retry_options(retry: bool) -> Dict[str, Any]:
+    """Extra request options for a resend of a rejected answer: skip the completion cache."""
+    return {"bypass_cache": True} if retry else {}
+
+
+def _plan_page_chunks(
+    document: ParsedDocument,
+    classification: Dict[str, Any],
+    pages_per_chunk: int = 3,
+    checkpoint: Optional[ExtractionCheckpoint] = None,
+) -> Tuple[List[LlmSteps[List[Dict[str, Any]]]], Callable[[List[Any]], Dict[str, Any]]]:
+    """Plan page-based chunking (for non-numbered docs).
+
+    Pages are packed into chunks by estimated tokens (EXTRACTION_CHUNK_INPUT_TOKENS
+    / EXTRACTION_CHUNK_OUTPUT_TOKENS); `pages_per_chunk` only applies when
+    packing is disabled by setting either budget to 0. With
+    EXTRACTION_TABLE_PARSER on, table-format pages whose rows parse locally
+    only have their rows tagged by the model, and the remaining pages are
+    chunked as usual.
+    """
     doc_type = classification.get("document_type", "bulleted_commitments")
     section_headers = classification.get("section_headers", [])
 
-    if file_path.endswith(".pdf"):
-        total_pages = get_page_count(file_path)
+    # Text files load as a single page
+    total_pages = document.page_count
+    pages = document.pages
+    table_pages: Dict[int, List[Dict[str, str]]] = {}
+    if doc_type == "table_format" and document.is_pdf and is_table_parser_enabled():
+        tables_by_page = [document.tables(number) for number in range(1, total_pages + 1)]
+        table_pages = parse_table_pages(pages, tables_by_page, section_headers).pages
+        pages = ["" if number in table_pages else page for number, page in enumerate(pages, start=1)]
+
+    token_budget = get_chunk_token_budget()
+    if token_budget:
+        page_chunks = pack_page_chunks(pages, token_budget)
     else:
-        # For text files, treat as single page
-        total_pages = 1
-
-    all_conditions = []
-    start_page = 1
-    while start_page <= total_pages:
-        end_page = min(start_page + pages_per_chunk - 1, total_pages)
-        logger.info("Extracting from pages %d-%d (of %d)", start_page, end_page, total_pages)
-
-        if file_path.endswith(".pdf"):
-            page_text = read_pdf_page_range(file_path, start_page, end_page)
-        else:
-            page_text = _read_file_text(file_path)
-
-        if not page_text.strip():
-            logger.warning("No extractable text on pages %d-%d; skipping", start_page, end_page)
-        else:
-            label = f"pages {start_page}-{end_page}"
-            all_conditions.extend(_extract_text_chunk_with_retry(page_text, doc_type, section_headers, label))
+        page_chunks = fixed_page_chunks(pages, pages_per_chunk)
+    if table_pages:
+        page_chunks = [chunk for chunk in page_chunks if chunk.text.strip()]
+
+    def chunk_steps(chunk: PageChunk) -> LlmSteps[List[Dict[str, Any]]]:
+        label = chunk.label
+        logger.info("Extracting from %s (of %d)", label, total_pages)
+
+        recorded = checkpoint.get("page_chunks", label) if checkpoint else None
+        if recorded is not None:
+            logger.info("Reusing checkpointed conditions from %s", label)
+            return recorded
+        if not chunk.text.strip():
+            logger.warning("No extractable text on %s; skipping", label)
+            return []
+        page_conditions = yield from _extract_text_chunk_steps(chunk.text, doc_type, section_headers, label)
+        if checkpoint:
+            checkpoint.put("page_chunks", label, page_conditions)
+        return page_conditions
+
+    def table_page_steps(number: int, rows: List[Dict[str, str]]) -> LlmSteps[List[Dict[str, Any]]]:
+        label = f"table rows on page {number}"
+        recorded = checkpoint.get("page_chunks", label) if checkpoint else None
+        if recorded is not None:
+            logger.info("Reusing checkpointed conditions from %s", label)
+            return recorded
+        page_conditions = yield from _tag_conditions_steps(rows, label)
+        if checkpoint:
+            checkpoint.put("page_chunks", label, page_conditions)
+        return page_conditions
+
+    def combine(chunks: List[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        all_conditions = [condition for chunk in chunks for condition in chunk]
+
+        # Deduplicate conditions that may span page boundaries
+        all_conditions = _deduplicate_conditions(all_conditions)
+
+        # Re-number sequentially after dedup
+        for i, cond in enumerate(all_conditions, start=1):
+            cond["condition_number"] = i
+
+        logger.info("Successfully extracted %d conditions!", len(all_conditions))
+        return {"conditions": all_conditions}
+
+    planned = [(chunk.start_page, chunk_steps(chunk)) for chunk in page_chunks]
+    planned += [(number, table_page_steps(number, rows)) for number, rows in table_pages.items()]
+    planned.sort(key=lambda item: item[0])
+    return [steps for _, steps in planned], combine
+
+
+def _tag_conditions_tool() -> Dict[str, Any]:
+    """Tool asking only for the tags of already extracted conditions.
+
+    The tag schemas are taken from the condition extraction tool so both
+    paths share one definition of the tag vocabulary.
+    """
+    condition = _tool_property(load_schema("condition_schema"), "conditions")["items"]["properties"]
+    return {
+        "type": "function",
+        "function": {
+            "name": TAG_CONDITIONS_TOOL_NAME,
+            "description": "Assign topic and subtopic tags to each numbered condition.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "tags": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "index": {
+                                    "type": "integer",
+                                    "description": "The condition's number in the list provided.",
+                                },
+                                "topic_tags": condition["topic_tags"],
+                                "subtopic_tags": condition["subtopic_tags"],
+                            },
+                            "required": ["index", "topic_tags", "subtopic_tags"],
+                        },
+                    },
+                },
+                "required": ["tags"],
+            },
+        },
+    }
+
+
+def _tag_conditions_steps(
+    rows: List[Dict[str, str]], label: str, max_attempts: int = 2
+) -> LlmSteps[List[Dict[str, Any]]]:
+    """Turn locally parsed table rows into conditions, asking the model only for their tags.
+
+    Tags are a short answer, so unlike full extraction this cannot be cut off
+    by the response length. If tagging keeps failing the conditions are kept
+    untagged rather than dropped.
+    """
+    conditions = [
+        {
+            "condition_name": row["condition_name"],
+            "condition_number": None,
+            "condition_text": row["condition_text"],
+            "topic_tags": [],
+            "subtopic_tags": [],
+        }
+        for row in rows
+    ]
+    listing = "\n\n".join(
+        f"{i}. {condition['condition_name']}: {condition['condition_text']}"
+        for i, condition in enumerate(conditions, start=1)
+    )
+    messages = [{
+        "role": "user",
+        "content": (
+            f"Here are the commitments from a table in an environmental assessment document ({label}):\n\n"
+            f"{listing}\n\n"
+            f"Assign topic and subtopic tags to every numbered commitment."
+        ),
+    }]
 
-        start_page = end_page + 1
+    for attempt in range(1, max_attempts + 1):
+        try:
+            completion = yield dict(
+                model=MODEL,
+                messages=messages,
+                tools=[_tag_conditions_tool()],
+                temperature=0.0,
+                tool_choice={"type": "function", "function": {"name": TAG_CONDITIONS_TOOL_NAME}},
+                **_retry_options(attempt > 1),
+            )
+            result = json.loads(completion.choices[0].message.tool_calls[0].function.arguments)
+            for tags in result.get("tags", []):
+                index = tags.get("index")
+                if isinstance(index, int) and 1 <= index <= len(conditions):
+                    conditions[index - 1]["topic_tags"] = tags.get("topic_tags") or []
+                    conditions[index - 1]["subtopic_tags"] = tags.get("subtopic_tags") or []
+            logger.info("Parsed %d conditions from %s locally; tagged by the model", len(conditions), label)
+            return conditions
+        except Exception as e:
+            logger.warning("Attempt %d/%d failed tagging %s: %s", attempt, max_attempts, label, e)
 
-    # Deduplicate conditions that may span page boundaries
-    all_conditions = _deduplicate_conditions(all_conditions)
+    logger.error("Could not tag %s; keeping its %d conditions untagged", label, len(conditions))
+    return conditions
 
-    # Re-number sequentially after dedup
-    for i, cond in enumerate(all_conditions, start=1):
-        cond["condition_number"] = i
 
-    logger.info("Successfully extracted %d conditions!", len(all_conditions))
-    return {"conditions": all_conditions}
+def _extract_by_pages(
+    document: ParsedDocument,
+    classification: Dict[str, Any],
+    pages_per_chunk: int = 3,
+    checkpoint: Optional[ExtractionCheckpoint] = None,
+) -> Dict[str, Any]:
+    """Extract conditions/commitments using page-based chunking (for non-numbered docs)."""
+    chunks, combine = _plan_page_chunks(document, classification, pages_per_chunk, checkpoint)
+    return combine(run_chunks("chunks", get_openai_client(), chunks))
 
 
 def _build_page_chunk_prompt(doc_type: str, section_headers: List[str], label: str, page_text: str) -> str:
@@ -320,6 +657,20 @@ def _extract_text_chunk_with_retry(
     label: str,
     max_attempts: int = 3,
 ) -> List[Dict[str, Any]]:
+    """Extract conditions from a text chunk (see `_extract_text_chunk_steps`)."""
+    return run_steps(
+        get_openai_client(),
+        _extract_text_chunk_steps(text, doc_type, section_headers, label, max_attempts),
+    )
+
+
+def _extract_text_chunk_steps(
+    text: str,
+    doc_type: str,
+    section_headers: List[str],
+    label: str,
+    max_attempts: int = 3,
+) -> LlmSteps[List[Dict[str, Any]]]:
     """Extract conditions from a text chunk without silently dropping content.
 
     A `length` finish reason splits the TEXT itself in half (not just page
@@ -338,28 +689,26 @@ def _extract_text_chunk_with_retry(
     tool_schema = load_schema("condition_schema")
     prompt = _build_page_chunk_prompt(doc_type, section_headers, label, text)
     messages = [{"role": "user", "content": prompt}]
-    client = get_openai_client()
 
     for attempt in range(1, max_attempts + 1):
         try:
-            completion = client.chat.completions.create(
+            completion = yield dict(
                 model=MODEL,
                 messages=messages,
                 tools=[tool_schema],
                 temperature=0.0,
                 tool_choice={"type": "function", "function": {"name": tool_schema["function"]["name"]}},
+                **_retry_options(attempt > 1),
             )
 
             if completion.choices[0].finish_reason == "length":
                 if len(text) > 2000:
                     first_text, second_text = _split_text_in_half(text)
                     logger.warning("Response cut off on %s; splitting text in half and retrying", label)
-                    first = _extract_text_chunk_with_retry(
-                        first_text, doc_type, section_headers, f"{label} (part 1)"
-                    )
-                    second = _extract_text_chunk_with_retry(
-                        second_text, doc_type, section_headers, f"{label} (part 2)"
-                    )
+                    first, second = yield Parallel([
+                        _extract_text_chunk_steps(first_text, doc_type, section_headers, f"{label} (part 1)"),
+                        _extract_text_chunk_steps(second_text, doc_type, section_headers, f"{label} (part 2)"),
+                    ])
                     return first + second
                 logger.warning(
                     "Response cut off on %s and text is already minimal (attempt %d/%d); retrying",
@@ -421,6 +770,11 @@ def enrich_condition(condition_text: str, condition_name: Optional[str] = None)
 
     Returns a dict with: clauses.
     """
+    return run_steps(get_openai_client(), _enrich_condition_steps(condition_text, condition_name))
+
+
+def _enrich_condition_steps(condition_text: str, condition_name: Optional[str] = None) -> LlmSteps[Dict[str, Any]]:
+    """Steps behind `enrich_condition`, shared with the async pipeline."""
     enrichment_schema = load_schema("enrichment_schema")
 
     full_text = ""
@@ -438,9 +792,8 @@ def enrich_condition(condition_text: str, condition_name: Optional[str] = None)
     messages = [{"role": "user", "content": prompt}]
     tools = [enrichment_schema]
 
-    client = get_openai_client()
     try:
-        completion = client.chat.completions.create(
+        completion = yield dict(
             model=MODEL,
             messages=messages,
             tools=tools,
@@ -456,56 +809,491 @@ def enrich_condition(condition_text: str, condition_name: Optional[str] = None)
         return {"clauses": []}
 
 
-def enrich_all_conditions(input_json: Dict[str, Any]) -> Dict[str, Any]:
+def _enrich_condition_clauses_steps(condition: Dict[str, Any]) -> LlmSteps[List[Dict[str, Any]]]:
+    """Return the clause structure for one extracted condition.
+
+    With EXTRACTION_LOCAL_CLAUSES on, regularly structured conditions are
+    parsed locally and only the rest are sent to the model.
+    """
+    clauses = local_clauses(condition.get("condition_text", ""))
+    if clauses is not None:
+        logger.debug("Parsed clauses of condition %s locally", condition.get("condition_number", "?"))
+        return clauses
+    logger.info("Enriching condition %s...", condition.get("condition_number", "?"))
+    enrichment = yield from _enrich_condition_steps(condition.get("condition_text", ""), condition.get("condition_name"))
+    return enrichment.get("clauses", [])
+
+
+def _enrich_condition_clauses(condition: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return run_steps(get_openai_client(), _enrich_condition_clauses_steps(condition))
+
+
+def enrich_all_conditions(input_json: Dict[str, Any], checkpoint: Optional[ExtractionCheckpoint] = None) -> Dict[str, Any]:
     """Enrich all conditions with their clause/subcondition structure.
 
+    Conditions are enriched concurrently (see EXTRACTION_MAX_WORKERS), and
+    short ones share a request when EXTRACTION_ENRICHMENT_BATCH_TOKENS is set.
     Modifies input_json in place and returns it.
     """
-    for condition in input_json.get("conditions", []):
-        cond_num = condition.get("condition_number", "?")
-        logger.info("Enriching condition %s...", cond_num)
+    conditions = input_json.get("conditions", [])
+    batch_tokens = get_enrichment_batch_tokens()
+    if batch_tokens:
+        all_clauses, batches, record = _plan_enrichment_batches(conditions, batch_tokens, checkpoint)
+        record(run_chunks("enrichment", get_openai_client(), batches))
+    else:
+        all_clauses = map_conditions("enrichment", _enrich_condition_clauses, conditions, list, checkpoint=checkpoint)
+    return _apply_clauses(input_json, all_clauses)
+
+
+async def enrich_all_conditions_async(
+    input_json: Dict[str, Any],
+    client,
+    checkpoint: Optional[ExtractionCheckpoint] = None,
+) -> Dict[str, Any]:
+    """Async `enrich_all_conditions` on the asyncio client."""
+    conditions = input_json.get("conditions", [])
+    batch_tokens = get_enrichment_batch_tokens()
+    if batch_tokens:
+        all_clauses, batches, record = _plan_enrichment_batches(conditions, batch_tokens, checkpoint)
+        record(await gather_chunks("enrichment", client, batches))
+    else:
+        all_clauses = await gather_conditions(
+            "enrichment", _enrich_condition_clauses_steps, conditions, list, client, checkpoint=checkpoint
+        )
+    return _apply_clauses(input_json, all_clauses)
+
+
+def get_enrichment_batch_tokens() -> int:
+    """Estimated condition-text tokens one batched enrichment request may carry (0 disables batching)."""
+    return max(0, get_int_setting("EXTRACTION_ENRICHMENT_BATCH_TOKENS", 0))
+
+
+def _plan_enrichment_batches(
+    conditions: List[Dict[str, Any]],
+    batch_tokens: int,
+    checkpoint: Optional[ExtractionCheckpoint],
+) -> Tuple[List[List[Dict[str, Any]]], List[LlmSteps[List[List[Dict[str, Any]]]]], Callable[[List[Any]], None]]:
+    """Group conditions still needing the model into batched enrichment requests.
+
+    Returns the clauses known so far (checkpointed or parsed locally, None
+    for the rest), the steps of each batch, and a function that records the
+    batch results (in batch order) into the clauses and the checkpoint.
+    Conditions over half the budget are sent on their own.
+    """
+    all_clauses: List[Any] = [None] * len(conditions)
+    pending: List[int] = []
+    parsed_locally = 0
+    for position, condition in enumerate(conditions):
+        recorded = checkpoint.get("enrichment", str(position)) if checkpoint else None
+        if recorded is None:
+            recorded = local_clauses(condition.get("condition_text", ""))
+            parsed_locally += recorded is not None
+        if recorded is None:
+            pending.append(position)
+        else:
+            all_clauses[position] = recorded
+
+    batches: List[List[int]] = []
+    current: List[int] = []
+    tokens = 0
+    for position in pending:
+        condition = conditions[position]
+        condition_tokens = estimate_tokens(f"{condition.get('condition_name') or ''}\n{condition.get('condition_text', '')}")
+        if condition_tokens > batch_tokens // 2:
+            batches.append([position])
+            continue
+        if current and tokens + condition_tokens > batch_tokens:
+            batches.append(current)
+            current, tokens = [], 0
+        current.append(position)
+        tokens += condition_tokens
+    if current:
+        batches.append(current)
+    logger.info(
+        "Enriching %d condition(s) in %d request(s) (%d checkpointed, %d parsed locally)",
+        len(pending), len(batches), len(conditions) - len(pending) - parsed_locally, parsed_locally,
+    )
+
+    def record(results: List[List[List[Dict[str, Any]]]]) -> None:
+        for batch, batch_clauses in zip(batches, results):
+            for position, clauses in zip(batch, batch_clauses):
+                all_clauses[position] = clauses
+                if checkpoint:
+                    checkpoint.put("enrichment", str(position), clauses)
+        if checkpoint:
+            checkpoint.flush()
+
+    steps = [_enrich_batch_steps([conditions[position] for position in batch]) for batch in batches]
+    return all_clauses, steps, record
+
+
+def _enrich_batch_tool() -> Dict[str, Any]:
+    """Tool returning the clause structure of several conditions, keyed as in the prompt."""
+    return {
+        "type": "function",
+        "function": {
+            "name": ENRICH_BATCH_TOOL_NAME,
+            "description": "Break each of several conditions down into its nested clause/subcondition structure.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "conditions": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "condition_key": {
+                                    "type": "string",
+                                    "description": "The key shown before the condition, e.g. '12' for 'Condition 12'.",
+                                },
+                                "clauses": _tool_property(load_schema("enrichment_schema"), "clauses"),
+                            },
+                            "required": ["condition_key", "clauses"],
+                        },
+                    },
+                },
+                "required": ["conditions"],
+            },
+        },
+    }
+
+
+def _enrich_batch_steps(batch: List[Dict[str, Any]]) -> LlmSteps[List[List[Dict[str, Any]]]]:
+    """Clauses for each condition in `batch`, from one request where possible.
+
+    Conditions are keyed by condition number (or position when numbers are
+    missing or repeated). Any condition the answer leaves out or malforms,
+    or the whole batch if the request fails, is enriched on its own instead.
+    """
+    if len(batch) == 1:
+        return [(yield from _enrich_condition_clauses_steps(batch[0]))]
+
+    numbers = [condition.get("condition_number") for condition in batch]
+    if None in numbers or len(set(map(str, numbers))) != len(numbers):
+        numbers = list(range(1, len(batch) + 1))
+    keys = [str(number) for number in numbers]
+    listing = "\n\n".join(
+        f"Condition {key}:\n" + (f"{condition['condition_name']}\n\n" if condition.get("condition_name") else "")
+        + condition.get("condition_text", "")
+        for key, condition in zip(keys, batch)
+    )
+    prompt = (
+        "Here are several conditions from an environmental assessment document:\n\n"
+        f"{listing}\n\n"
+        "For EACH condition, break it down into clauses and subconditions (nested structure with identifiers "
+        "like 1.1, a), i., etc.) and return it under its condition key. "
+        "If a condition has no sub-structure, return an empty clauses array for it."
+    )
+
+    by_key: Dict[str, Any] = {}
+    try:
+        completion = yield dict(
+            model=MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            tools=[_enrich_batch_tool()],
+            temperature=0.0,
+            tool_choice={"type": "function", "function": {"name": ENRICH_BATCH_TOOL_NAME}},
+        )
+        if completion.choices[0].finish_reason == "length":
+            raise FinishReasonError("batched enrichment response was cut off")
+        result = json.loads(completion.choices[0].message.tool_calls[0].function.arguments)
+        by_key = {
+            str(item.get("condition_key")): item.get("clauses")
+            for item in result.get("conditions", [])
+            if isinstance(item, dict)
+        }
+    except Exception as e:
+        logger.warning("Batched enrichment of conditions %s failed: %s", ", ".join(keys), e)
+
+    missing = [i for i, key in enumerate(keys) if not isinstance(by_key.get(key), list)]
+    if missing:
+        logger.info("Enriching %d of %d batched condition(s) individually", len(missing), len(batch))
+        retried = yield Parallel([_enrich_condition_clauses_steps(batch[i]) for i in missing])
+        by_key.update({keys[i]: clauses for i, clauses in zip(missing, retried)})
+    return [by_key[key] for key in keys]
+
+
+def _apply_clauses(input_json: Dict[str, Any], all_clauses: List[List[Dict[str, Any]]]) -> Dict[str, Any]:
+    for condition, clauses in zip(input_json.get("conditions", []), all_clauses):
+        condition["clauses"] = clauses
+        logger.debug("Condition %s: %d clauses", condition.get("condition_number", "?"), len(clauses))
+
+    return input_json
+
+
+# ---------------------------------------------------------------------------
+# Combined per-condition details (clauses + deliverables + reports in one call)
+# ---------------------------------------------------------------------------
+
+CONDITION_DETAILS_TOOL_NAME = "extract_condition_details"
+CONDITION_DETAIL_KEYS = ("clauses", "deliverables", "report_submissions")
+
+
+def is_combined_enrichment_enabled() -> bool:
+    """Whether steps 2-4 should use one combined call per condition."""
+    return get_bool_setting("EXTRACTION_COMBINED_ENRICHMENT", False)
+
+
+def _tool_property(tool: Dict[str, Any], name: str) -> Dict[str, Any]:
+    return tool["function"]["parameters"]["properties"][name]
+
+
+def _condition_details_tool() -> Dict[str, Any]:
+    """One tool that asks for everything the clause, deliverable and report stages do.
+
+    Property schemas are taken from the per-stage tools so both modes share
+    one definition of each field.
+    """
+    return {
+        "type": "function",
+        "function": {
+            "name": CONDITION_DETAILS_TOOL_NAME,
+            "description": (
+                "Break the condition into clauses, and extract any management plan deliverables "
+                "and report submissions it requires."
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "clauses": _tool_property(load_schema("enrichment_schema"), "clauses"),
+                    "requires_plan": _tool_property(PLAN_REQUIREMENT_TOOL, "requires_plan"),
+                    "deliverables": {
+                        **_tool_property(DELIVERABLES_TOOL, "deliverables"),
+                        "description": "The required plan/report/proposal/etc. documents. Empty array when requires_plan is false.",
+                    },
+                    "requires_report": _tool_property(REPORT_REQUIREMENT_TOOL, "requires_report"),
+                    "reports": {
+                        **_tool_property(REPORTS_TOOL, "reports"),
+                        "description": "The required report submissions. Empty array when requires_report is false.",
+                    },
+                },
+                "required": ["clauses", "requires_plan", "deliverables", "requires_report", "reports"],
+            },
+        },
+    }
+
+
+def _all_named(items: List[Any], name_key: str) -> bool:
+    return bool(items) and all(isinstance(item, dict) and item.get(name_key) for item in items)
+
+
+def _validate_condition_details(completion) -> Optional[Dict[str, Any]]:
+    """Return {clauses, deliverables, report_submissions}, or None if the output is unusable."""
+    choice = completion.choices[0]
+    if choice.finish_reason != "stop" or not choice.message.tool_calls:
+        return None
+    try:
+        result = json.loads(choice.message.tool_calls[0].function.arguments)
+    except json.JSONDecodeError:
+        return None
+
+    clauses = result.get("clauses")
+    deliverables = result.get("deliverables") or []
+    reports = result.get("reports") or []
+    if not isinstance(clauses, list) or not isinstance(deliverables, list) or not isinstance(reports, list):
+        return None
+    if not isinstance(result.get("requires_plan"), bool) or not isinstance(result.get("requires_report"), bool):
+        return None
+
+    # A "yes" without details (or malformed details) is exactly what the
+    # dedicated stages are better at; let the caller fall back to them.
+    if result["requires_plan"] and not _all_named(deliverables, "deliverable_name"):
+        return None
+    if result["requires_report"] and not _all_named(reports, "report_title"):
+        return None
+
+    return {
+        "clauses": clauses,
+        "deliverables": deliverables if result["requires_plan"] else [],
+        "report_submissions": reports if result["requires_report"] else [],
+    }
+
+
+def _condition_details_steps(condition: Dict[str, Any]) -> LlmSteps[Optional[Dict[str, Any]]]:
+    """Ask for a condition's clauses, deliverables and reports in a single call."""
+    condition_name = condition.get("condition_name")
+    full_text = f"{condition_name}\n\n" if condition_name else ""
+    full_text += condition.get("condition_text", "")
+
+    completion = yield dict(
+        model=MODEL,
+        messages=[{"role": "user", "content": (
+            "Here is a condition written by the Environmental Assessment Office:\n\n"
+            f"{full_text}\n\n"
+            "1. Break it down into clauses and subconditions (nested structure with identifiers like "
+            "1.1, a), i., etc.). If it has no sub-structure, return an empty clauses array.\n"
+            "2. Decide whether it requires a management plan (or similar document) to be written, and "
+            "if so format each required deliverable.\n"
+            "3. Decide whether it requires report submissions, and if so format each report. If the "
+            "same report recurs across multiple phases or occasions, produce ONE reports[] entry for it "
+            "with multiple submission_schedule items."
+        )}],
+        tools=[_condition_details_tool()],
+        temperature=0.0,
+        tool_choice={"type": "function", "function": {"name": CONDITION_DETAILS_TOOL_NAME}},
+    )
+    return _validate_condition_details(completion)
 
-        condition_text = condition.get("condition_text", "")
-        condition_name = condition.get("condition_name")
 
-        enrichment = enrich_condition(condition_text, condition_name)
+def _fallback_stage_steps(stage: str, condition: Dict[str, Any], steps: LlmSteps[List[Any]]) -> LlmSteps[List[Any]]:
+    """Run one per-stage fallback, isolating its failure like `map_conditions` does."""
+    try:
+        return (yield from steps)
+    except Exception as e:
+        logger.error(
+            "%s failed for condition %s: %s",
+            stage, condition.get("condition_number", "?"), e,
+            exc_info=True,
+        )
+        return []
 
-        condition["clauses"] = enrichment.get("clauses", [])
 
-        logger.debug("Condition %s: %d clauses", cond_num, len(condition["clauses"]))
+def _condition_details_with_fallback_steps(condition: Dict[str, Any]) -> LlmSteps[Dict[str, Any]]:
+    """Combined call first; the dedicated per-stage calls when its output does not validate."""
+    try:
+        details = yield from _condition_details_steps(condition)
+    except Exception as e:
+        logger.warning("Combined enrichment failed for condition %s: %s", condition.get("condition_number", "?"), e)
+        details = None
+    if details is not None:
+        return details
+
+    logger.info(
+        "Combined enrichment unusable for condition %s; falling back to per-stage calls",
+        condition.get("condition_number", "?"),
+    )
+    return {
+        "clauses": (yield from _fallback_stage_steps("enrichment", condition, _enrich_condition_clauses_steps(condition))),
+        "deliverables": (yield from _fallback_stage_steps("deliverables", condition, condition_deliverables_steps(condition))),
+        "report_submissions": (yield from _fallback_stage_steps(
+            "report_submissions", condition, condition_report_submissions_steps(condition)
+        )),
+    }
 
+
+def _condition_details_with_fallback(condition: Dict[str, Any]) -> Dict[str, Any]:
+    return run_steps(get_openai_client(), _condition_details_with_fallback_steps(condition))
+
+
+def _empty_condition_details() -> Dict[str, Any]:
+    return {key: [] for key in CONDITION_DETAIL_KEYS}
+
+
+def _apply_condition_details(input_json: Dict[str, Any], all_details: List[Dict[str, Any]]) -> Dict[str, Any]:
+    for condition, details in zip(input_json.get("conditions", []), all_details):
+        condition.update(details)
     return input_json
 
 
+def enrich_condition_details(input_json: Dict[str, Any], checkpoint: Optional[ExtractionCheckpoint] = None) -> Dict[str, Any]:
+    """Steps 2-4 in one call per condition (EXTRACTION_COMBINED_ENRICHMENT).
+
+    Modifies input_json in place and returns it.
+    """
+    conditions = input_json.get("conditions", [])
+    all_details = map_conditions(
+        "condition_details", _condition_details_with_fallback, conditions, _empty_condition_details, checkpoint=checkpoint
+    )
+    return _apply_condition_details(input_json, all_details)
+
+
+async def enrich_condition_details_async(
+    input_json: Dict[str, Any],
+    client,
+    checkpoint: Optional[ExtractionCheckpoint] = None,
+) -> Dict[str, Any]:
+    """Async `enrich_condition_details` on the asyncio client."""
+    conditions = input_json.get("conditions", [])
+    all_details = await gather_conditions(
+        "condition_details", _condition_details_with_fallback_steps, conditions, _empty_condition_details, client,
+        checkpoint=checkpoint,
+    )
+    return _apply_condition_details(input_json, all_details)
+
+
 # ---------------------------------------------------------------------------
 # Main orchestrator (new end-to-end pipeline)
 # ---------------------------------------------------------------------------
 
-def extract_and_enrich_all(file_path: str, classification: Dict[str, Any]) -> Dict[str, Any]:
+def extract_and_enrich_all(
+    document: Union[str, ParsedDocument],
+    classification: Dict[str, Any],
+    checkpoint: Optional[ExtractionCheckpoint] = None,
+) -> Dict[str, Any]:
     """Full extraction pipeline: extract conditions, enrich each one.
 
     Args:
-        file_path: file path string
+        document: ParsedDocument from load_document() (a file path is also accepted)
         classification: dict from classify_and_count()
+        checkpoint: completed work to resume from; new work is recorded in it
 
     Returns:
         dict: Complete JSON with conditions, clauses, deliverables, report_submissions
     """
+    checkpoint = checkpoint or ExtractionCheckpoint()
+    if is_async_enabled():
+        return asyncio.run(extract_and_enrich_all_async(ensure_document(document), classification, checkpoint))
+
     # Step 1: Extract all conditions
+
     logger.info("=== STEP 1: Extracting conditions ===")
-    result = extract_conditions_from_pages(file_path, classification)
+    result = checkpoint.cached(
+        "conditions",
+        lambda: extract_conditions_from_pages(document, classification, checkpoint=checkpoint),
+    )
+
+    if is_combined_enrichment_enabled():
+        logger.info("=== STEPS 2-4: Enriching conditions, deliverables and reports (combined) ===")
+        result = enrich_condition_details(result, checkpoint)
+        logger.info("=== Extraction complete: %d conditions ===", len(result.get('conditions', [])))
+        return result
 
     # Step 2: Break each condition into its clause/subcondition structure
     logger.info("=== STEP 2: Enriching conditions (clauses) ===")
-    result = enrich_all_conditions(result)
+    result = enrich_all_conditions(result, checkpoint)
 
     # Step 3: Extract deliverables using dedicated management plan extraction
     logger.info("=== STEP 3: Extracting deliverables ===")
-    result = extract_management_plan_info_from_json(result)
+    result = extract_management_plan_info_from_json(result, checkpoint)
 
     # Step 4: Extract report submissions using dedicated report extraction
     logger.info("=== STEP 4: Extracting report submissions ===")
-    result = extract_report_info_from_json(result)
+    result = extract_report_info_from_json(result, checkpoint)
+
+    logger.info("=== Extraction complete: %d conditions ===", len(result.get('conditions', [])))
+    return result
+
+
+async def extract_and_enrich_all_async(
+    document: ParsedDocument,
+    classification: Dict[str, Any],
+    checkpoint: ExtractionCheckpoint,
+) -> Dict[str, Any]:
+    """Asyncio variant of `extract_and_enrich_all` (EXTRACTION_ASYNC_ENABLED).
+
+    All chunks are requested at once, then the clause, deliverable and report
+    stages run together for every condition, since each only reads the
+    condition text. EXTRACTION_ASYNC_MAX_IN_FLIGHT bounds open requests.
+    """
+    async with async_openai_client(get_async_max_in_flight()) as client:
+        logger.info("=== STEP 1: Extracting conditions (async) ===")
+        result = checkpoint.get("conditions", "result")
+        if result is None:
+            result = await _extract_conditions_async(client, document, classification, checkpoint=checkpoint)
+            checkpoint.put("conditions", "result", result)
+            checkpoint.flush()
+        else:
+            logger.info("Reusing checkpointed conditions")
+
+        logger.info("=== STEPS 2-4: Enriching conditions, deliverables and reports (async) ===")
+        if is_combined_enrichment_enabled():
+            await enrich_condition_details_async(result, client, checkpoint)
+        else:
+            await asyncio.gather(
+                enrich_all_conditions_async(result, client, checkpoint),
+                extract_management_plan_info_from_json_async(result, client, checkpoint),
+                extract_report_info_from_json_async(result, client, checkpoint),
+            )
 
     logger.info("=== Extraction complete: %d conditions ===", len(result.get('conditions', [])))
     return result
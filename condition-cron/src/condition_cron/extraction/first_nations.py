@@ -1,15 +1,15 @@
 import json
 import logging
 
-from typing import Any, Dict
+from typing import Any, Dict, Union
 
 from condition_cron.extraction.client import get_openai_client
-from condition_cron.extraction.pdf_reader import read_pdf
+from condition_cron.extraction.document import ParsedDocument, ensure_document
 
 logger = logging.getLogger(__name__)
 
-def extract_first_nation_from_pdf(pdf_file_path: str) -> str:
-    pdf_text = read_pdf(pdf_file_path)
+def extract_first_nation_from_pdf(document: Union[str, ParsedDocument]) -> str:
+    pdf_text = ensure_document(document).text
 
     tools = [
         {
@@ -52,10 +52,17 @@ def extract_first_nation_from_pdf(pdf_file_path: str) -> str:
     logger.debug("Extracted First Nations info: %s", result)
     return result
 
-def process_single_pdf(pdf_file_path: str, old_json: Dict[str, Any]) -> Dict[str, Any]:
-    first_nations_info = extract_first_nation_from_pdf(pdf_file_path)
-    first_nations_json = json.loads(first_nations_info)
-    
+def extract_first_nations(document: Union[str, ParsedDocument]) -> Dict[str, Any]:
+    """Return the document's `first_nations` and `consultation_records_required` fields."""
+    first_nations_json = json.loads(extract_first_nation_from_pdf(document))
+    return {
+        'first_nations': first_nations_json['first_nations'],
+        'consultation_records_required': first_nations_json['consultation_records_required'],
+    }
+
+def process_single_pdf(document: Union[str, ParsedDocument], old_json: Dict[str, Any]) -> Dict[str, Any]:
+    first_nations_json = extract_first_nations(document)
+
     updated_json = old_json.copy()
     updated_json['first_nations'] = first_nations_json['first_nations']
     updated_json['consultation_records_required'] = first_nations_json['consultation_records_required']
@@ -0,0 +1,190 @@
+"""Content-addressed on-disk cache for LLM chat completions.
+
+Every extraction prompt runs at temperature 0 against a pinned model, so the
+same request always yields the same completion. Caching completions by a hash
+of the full request means a re-picked stale request, or a document uploaded
+again after rejection, does not pay for the same calls twice.
+
+Only answers the model finished (`finish_reason == "stop"`) are stored, and
+retry loops resend a rejected request with `bypass_cache=True`, which skips
+and discards the cached entry. The cache is off unless
+EXTRACTION_LLM_CACHE_ENABLED is set.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from openai.types.chat import ChatCompletion
+
+from condition_cron.extraction.settings import get_bool_setting, get_int_setting, get_setting
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(tempfile.gettempdir(), "condition-cron", "llm-cache.sqlite3")
+DEFAULT_CACHE_MAX_MB = 512
+
+# After eviction the cache is trimmed to this fraction of its size limit, so
+# a full cache does not evict on every single write.
+EVICTION_TARGET_RATIO = 0.9
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    """Hash a chat completion request (model, messages, tools, options)."""
+    payload = json.dumps(request, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CacheStats:
+    """Thread-safe hit/miss/store counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[name] += amount
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+class CompletionCache:
+    """SQLite-backed completion store with least-recently-used eviction."""
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_completions_last_used_at ON completions (last_used_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[ChatCompletion]:
+        """Return the cached completion for `key`, or None on a miss."""
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM completions WHERE key = ?", (key,)).fetchone()
+            if row:
+                self._conn.execute("UPDATE completions SET last_used_at = ? WHERE key = ?", (time.time(), key))
+                self._conn.commit()
+        if not row:
+            self.stats.increment("misses")
+            return None
+        self.stats.increment("hits")
+        return ChatCompletion.model_validate_json(row[0])
+
+    def put(self, key: str, model: str, completion: ChatCompletion) -> None:
+        """Store a completion, evicting old entries if the cache is over its limit."""
+        response = completion.model_dump_json()
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO completions (key, model, response, size, created_at, last_used_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (key, model, response, len(response), now, now),
+            )
+            self._conn.commit()
+            evicted = self._evict()
+        self.stats.increment("stores")
+        if evicted:
+            self.stats.increment("evictions", evicted)
+
+    def discard(self, key: str) -> None:
+        """Remove the entry for `key`, if any."""
+        with self._lock:
+            self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def _evict(self) -> int:
+        """Drop least-recently-used rows until the cache fits its size budget."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+
+        target = int(self.max_bytes * EVICTION_TARGET_RATIO)
+        evicted = 0
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM completions ORDER BY last_used_at ASC"
+        ).fetchall():
+            if total <= target:
+                break
+            self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        self._conn.commit()
+        logger.info("LLM cache evicted %d entries (now %d bytes)", evicted, total)
+        return evicted
+
+
+def is_cacheable(request: Dict[str, Any]) -> bool:
+    """Only deterministic (temperature 0) requests are safe to replay."""
+    return request.get("temperature") == 0 and not request.get("stream")
+
+
+def is_complete(completion: Any) -> bool:
+    """Truncated (`length`) or filtered answers are retried, never replayed."""
+    choices = getattr(completion, "choices", None)
+    return bool(choices) and choices[0].finish_reason == "stop"
+
+
+def is_cache_bypassed() -> bool:
+    """When set, cached entries are ignored but fresh completions are still stored."""
+    return get_bool_setting("EXTRACTION_LLM_CACHE_BYPASS", False)
+
+
+@lru_cache(maxsize=1)
+def get_completion_cache() -> Optional[CompletionCache]:
+    """Return the process-wide completion cache, or None when caching is disabled."""
+    if not get_bool_setting("EXTRACTION_LLM_CACHE_ENABLED", False):
+        return None
+
+    path = get_setting("EXTRACTION_LLM_CACHE_PATH", DEFAULT_CACHE_PATH)
+    max_bytes = get_int_setting("EXTRACTION_LLM_CACHE_MAX_MB", DEFAULT_CACHE_MAX_MB) * 1024 * 1024
+    try:
+        return CompletionCache(path, max_bytes)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning("LLM cache unavailable at %s; continuing without it: %s", path, e)
+        return None
+
+
+def cache_stats_snapshot() -> Dict[str, int]:
+    """Return the current cache counters (empty when caching is disabled)."""
+    cache = get_completion_cache()
+    return cache.stats.snapshot() if cache else {}
+
+
+def log_cache_stats(since: Dict[str, int], label: str) -> None:
+    """Log cache counters accumulated since an earlier snapshot."""
+    current = cache_stats_snapshot()
+    if not current:
+        return
+    delta = {name: count - since.get(name, 0) for name, count in current.items()}
+    logger.info(
+        "LLM cache for %s — hits: %d, misses: %d, stores: %d, evictions: %d",
+        label, delta["hits"], delta["misses"], delta["stores"], delta["evictions"],
+    )
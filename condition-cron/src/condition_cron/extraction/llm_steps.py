@@ -0,0 +1,100 @@
+"""Run extraction logic against either the sync or the async LLM client.
+
+Stage logic that talks to the model is written once, as a generator that
+yields `chat.completions.create` keyword arguments and receives the
+completion back (or has the request's exception thrown into it):
+
+    def _steps(text):
+        completion = yield {"model": MODEL, "messages": [...]}
+        return parse(completion)
+
+`run_steps` drives such a generator with the thread-based client and
+`run_steps_async` drives it with the asyncio client, so prompts, retries and
+parsing are shared by both pipelines. Steps compose with `yield from`, or
+run side by side by yielding `Parallel([...])`, which sends back the list of
+results.
+"""
+
+import asyncio
+import contextvars
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Any, Dict, Generator, List, Optional, TypeVar, Union
+
+T = TypeVar("T")
+
+
+@dataclass
+class Parallel:
+    """Sub-steps that may run concurrently; their results come back in order."""
+
+    steps: List["LlmSteps[Any]"]
+
+
+LlmSteps = Generator[Union[Dict[str, Any], Parallel], Any, T]
+
+
+def run_steps(client, steps: LlmSteps[T], executor: Optional[Executor] = None) -> T:
+    """Drive `steps` to completion, issuing each request on the sync client.
+
+    With an `executor`, `Parallel` sub-steps are scheduled onto it; otherwise
+    they run one after another.
+    """
+    completion, error = None, None
+    while True:
+        try:
+            request = steps.throw(error) if error else steps.send(completion)
+        except StopIteration as done:
+            return done.value
+        completion, error = None, None
+        try:
+            if isinstance(request, Parallel):
+                completion = _run_parallel(client, request.steps, executor)
+            else:
+                completion = client.chat.completions.create(**request)
+        except Exception as e:
+            error = e
+
+
+def _run_parallel(client, all_steps: List[LlmSteps[Any]], executor: Optional[Executor]) -> List[Any]:
+    """Run sub-steps on `executor`, with the calling thread taking the first one.
+
+    The caller is usually a worker of the same bounded pool. To never block a
+    worker on a sub-step that is still queued behind it, a queued sub-step is
+    cancelled and run inline instead; the caller only waits on sub-steps
+    another worker has already started.
+    """
+    if executor is None or len(all_steps) < 2:
+        return [run_steps(client, steps, executor) for steps in all_steps]
+
+    futures = [
+        executor.submit(contextvars.copy_context().run, run_steps, client, steps, executor)
+        for steps in all_steps[1:]
+    ]
+    try:
+        results = [run_steps(client, all_steps[0], executor)]
+        for future, steps in zip(futures, all_steps[1:]):
+            results.append(run_steps(client, steps, executor) if future.cancel() else future.result())
+        return results
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
+
+
+async def run_steps_async(client, steps: LlmSteps[T]) -> T:
+    """Drive `steps` to completion, awaiting each request on the async client."""
+    completion, error = None, None
+    while True:
+        try:
+            request = steps.throw(error) if error else steps.send(completion)
+        except StopIteration as done:
+            return done.value
+        completion, error = None, None
+        try:
+            if isinstance(request, Parallel):
+                completion = list(await asyncio.gather(*(run_steps_async(client, sub) for sub in request.steps)))
+            else:
+                completion = await client.chat.completions.create(**request)
+        except Exception as e:
+            error = e
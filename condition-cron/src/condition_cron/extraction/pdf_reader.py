@@ -1,34 +1,260 @@
+import logging
+import multiprocessing
+import resource
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
 import pdfplumber
+import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_raw
 
+logger = logging.getLogger(__name__)
 
-def read_pdf(file_path):
-    """Extract all text from a PDF file. Backward-compatible signature."""
-    pdf_text = ""
+
+class PdfMemoryLimitError(MemoryError):
+    """Raised when parsing a PDF pushes the process past its RSS limit."""
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB.
+
+    Reads /proc on Linux (the cron image); elsewhere falls back to the peak
+    RSS reported by getrusage, which can only overstate the current value.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * resource.getpagesize() / (1024 * 1024)
+    except (OSError, IndexError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere.
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _release_page(pdf, page):
+    """Drop what pdfplumber and pdfminer cached while parsing `page`.
+
+    pdfplumber keeps every page's layout objects until the document is
+    closed, and pdfminer keeps every object it has resolved (including
+    embedded image streams), so without this a long scanned document holds
+    all of its pages in memory at once. pdfminer has no public way to drop
+    that cache, so `_cached_objs` is cleared directly; pdfminer.six is pinned
+    in requirements.txt and test_pdf_reader checks the attribute still exists.
+    """
+    page.close()
+    cached_objects = getattr(pdf.doc, "_cached_objs", None)
+    if cached_objects is not None:
+        cached_objects.clear()
+
+
+def _check_memory(file_path, page_number, max_rss_mb):
+    if not max_rss_mb:
+        return
+    rss_mb = current_rss_mb()
+    if rss_mb > max_rss_mb:
+        raise PdfMemoryLimitError(
+            f"Parsing {file_path} used {rss_mb:.0f} MB by page {page_number}, "
+            f"over the {max_rss_mb} MB limit"
+        )
+
+
+def _iter_pdfplumber(file_path, extract, max_rss_mb=0, start_page=1, end_page=None):
     with pdfplumber.open(file_path) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text()
-            if text:
-                pdf_text += text + "\n"
-    return pdf_text
+        last_page = len(pdf.pages) if end_page is None else min(end_page, len(pdf.pages))
+        for number in range(start_page, last_page + 1):
+            page = pdf.pages[number - 1]
+            try:
+                yield extract(number, page)
+            finally:
+                _release_page(pdf, page)
+            _check_memory(file_path, number, max_rss_mb)
+
+
+def _iter_pdfium(file_path, extract, max_rss_mb=0, start_page=1, end_page=None):
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        last_page = len(pdf) if end_page is None else min(end_page, len(pdf))
+        for number in range(start_page, last_page + 1):
+            page = pdf[number - 1]
+            try:
+                yield extract(number, page)
+            finally:
+                page.close()
+            _check_memory(file_path, number, max_rss_mb)
+    finally:
+        pdf.close()
+
+
+def _pdfium_text(number, page):
+    text_page = page.get_textpage()
+    try:
+        text = text_page.get_text_bounded()
+    finally:
+        text_page.close()
+    # Match pdfplumber's layout: "\n" line breaks, no trailing spaces.
+    return "\n".join(line.rstrip() for line in text.replace("\r\n", "\n").replace("\r", "\n").split("\n")).strip("\n")
+
+
+def _pdfium_has_vector_graphics(number, page):
+    return next(iter(page.get_objects(filter=(pdfium_raw.FPDF_PAGEOBJ_PATH,))), None) is not None
+
+
+_TEXT_EXTRACTORS = {
+    "pdfium": (_iter_pdfium, _pdfium_text),
+    "pdfplumber": (_iter_pdfplumber, lambda number, page: page.extract_text() or ""),
+}
+PDF_TEXT_BACKENDS = tuple(_TEXT_EXTRACTORS)
+# pdfium matches pdfplumber's text only up to whitespace, which changes every
+# prompt (and LLM cache key); it stays opt-in until the parity benchmark has
+# been run on real condition documents.
+DEFAULT_PDF_TEXT_BACKEND = "pdfplumber"
+
+DEFAULT_PARALLEL_MIN_PAGES = 40
+
+
+def iter_pdf_pages(file_path, max_rss_mb=0, backend=DEFAULT_PDF_TEXT_BACKEND, start_page=1, end_page=None):
+    """Yield the text of each page ("" for pages without text), one page at a time.
+
+    `backend` is "pdfium" (fast, native) or "pdfplumber" (the original pure
+    Python layout engine). Each page's parse caches are released before the
+    next page is read. With `max_rss_mb`, PdfMemoryLimitError is raised as
+    soon as the process's resident memory exceeds that many MB.
+    """
+    iterate, extract = _TEXT_EXTRACTORS[backend]
+    return iterate(file_path, extract, max_rss_mb, start_page, end_page)
+
+
+def table_candidate_pages(file_path):
+    """Page numbers (1-indexed) that contain ruling lines or boxes.
+
+    pdfplumber's default table finder builds cells from drawn lines and
+    rectangles, so a page without any vector paths cannot yield a table; a
+    pdfium object scan rules such pages out without a layout pass.
+    """
+    return {
+        number
+        for number, has_paths in enumerate(_iter_pdfium(file_path, _pdfium_has_vector_graphics), start=1)
+        if has_paths
+    }
+
 
+def iter_pdf_page_tables(file_path, max_rss_mb=0, candidate_pages=None, start_page=1, end_page=None):
+    """Yield the tables on each page, one page at a time (see iter_pdf_pages).
 
-def read_pdf_by_pages(file_path):
+    Tables are always extracted with pdfplumber. With `candidate_pages`, other
+    pages are reported as having no tables without being parsed.
+    """
+    def extract(number, page):
+        if candidate_pages is not None and number not in candidate_pages:
+            return []
+        return page.extract_tables() or []
+
+    return _iter_pdfplumber(file_path, extract, max_rss_mb, start_page, end_page)
+
+
+def _read_text_range(file_path, start_page, end_page, max_rss_mb, backend):
+    return list(iter_pdf_pages(file_path, max_rss_mb, backend, start_page, end_page))
+
+
+def _read_tables_range(file_path, start_page, end_page, max_rss_mb, candidate_pages):
+    return list(iter_pdf_page_tables(file_path, max_rss_mb, candidate_pages, start_page, end_page))
+
+
+def _split_ranges(page_numbers, parts):
+    """Split sorted page numbers into at most `parts` contiguous (first, last) ranges of similar size."""
+    size = -(-len(page_numbers) // parts)
+    return [(page_numbers[i], page_numbers[min(i + size, len(page_numbers)) - 1]) for i in range(0, len(page_numbers), size)]
+
+
+def _read_ranges(read_range, file_path, start_page, end_page, busy_pages, processes, min_pages, *args):
+    """Run `read_range` over start_page..end_page, split across worker processes when worthwhile.
+
+    `busy_pages` are the pages that need real work; they are divided evenly
+    between the workers, each of which opens the file itself. Fewer than
+    `min_pages` of them are read in this process, since starting workers
+    costs more than it saves on short documents.
+    """
+    if processes <= 1 or len(busy_pages) < max(min_pages, 2):
+        return read_range(file_path, start_page, end_page, *args)
+
+    ranges = _split_ranges(busy_pages, processes)
+    # Widen the ranges so together they cover every page, in order.
+    bounds = [start_page] + [first for first, _ in ranges[1:]] + [end_page + 1]
+    spans = list(zip(bounds, [bound - 1 for bound in bounds[1:]]))
+    logger.info("%s: reading pages %d-%d in %d processes", file_path, start_page, end_page, len(spans))
+    with ProcessPoolExecutor(max_workers=len(spans), mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(read_range, file_path, first, last, *args) for first, last in spans]
+        return [page for future in futures for page in future.result()]
+
+
+def read_pdf(file_path, backend=DEFAULT_PDF_TEXT_BACKEND, processes=1, min_pages=DEFAULT_PARALLEL_MIN_PAGES):
+    """Extract all text from a PDF file. Backward-compatible signature."""
+    pages = read_pdf_pages(file_path, backend=backend, processes=processes, min_pages=min_pages)
+    return "".join(f"{text}\n" for text in pages if text)
+
+
+def read_pdf_pages(
+    file_path, max_rss_mb=0, backend=DEFAULT_PDF_TEXT_BACKEND, processes=1, min_pages=DEFAULT_PARALLEL_MIN_PAGES
+):
+    """Extract the text of every page in one pass.
+
+    Returns a list with one string per page ("" for pages without text).
+    With `processes` > 1, documents of at least `min_pages` pages are split
+    into page ranges read by that many worker processes.
+    """
+    if processes <= 1:
+        return list(iter_pdf_pages(file_path, max_rss_mb, backend))
+    return read_pdf_page_range_pages(file_path, 1, get_page_count(file_path), max_rss_mb, backend, processes, min_pages)
+
+
+def read_pdf_page_range_pages(
+    file_path, start_page, end_page, max_rss_mb=0, backend=DEFAULT_PDF_TEXT_BACKEND,
+    processes=1, min_pages=DEFAULT_PARALLEL_MIN_PAGES,
+):
+    """Text of each page in start_page..end_page (1-indexed, inclusive; see read_pdf_pages)."""
+    if processes <= 1:
+        return _read_text_range(file_path, start_page, end_page, max_rss_mb, backend)
+    end_page = min(end_page, get_page_count(file_path))
+    return _read_ranges(
+        _read_text_range, file_path, start_page, end_page, list(range(start_page, end_page + 1)),
+        processes, min_pages, max_rss_mb, backend,
+    )
+
+
+def read_pdf_page_tables(
+    file_path, max_rss_mb=0, skip_pages_without_lines=True, processes=1, min_pages=DEFAULT_PARALLEL_MIN_PAGES
+):
+    """Extract the tables on every page in one pass.
+
+    Returns one list of tables per page; each table is a list of rows. Pages
+    without ruling lines are skipped unless `skip_pages_without_lines` is off.
+    With `processes` > 1, the pages to scan are divided between that many
+    worker processes once there are at least `min_pages` of them.
+    """
+    page_count = get_page_count(file_path)
+    if skip_pages_without_lines:
+        candidates = table_candidate_pages(file_path)
+        logger.info("%s: %d page(s) with ruling lines to scan for tables", file_path, len(candidates))
+    else:
+        candidates = None
+    busy_pages = sorted(candidates) if candidates is not None else list(range(1, page_count + 1))
+    return _read_ranges(
+        _read_tables_range, file_path, 1, page_count, busy_pages, processes, min_pages, max_rss_mb, candidates
+    )
+
+
+def read_pdf_by_pages(file_path, backend=DEFAULT_PDF_TEXT_BACKEND, processes=1, min_pages=DEFAULT_PARALLEL_MIN_PAGES):
     """Extract text and tables from each page of a PDF.
 
     Returns a list of dicts:
         [{"page_number": 1, "text": "...", "tables": [[row1], [row2], ...]}, ...]
     """
-    pages_data = []
-    with pdfplumber.open(file_path) as pdf:
-        for i, page in enumerate(pdf.pages):
-            text = page.extract_text() or ""
-            tables = page.extract_tables() or []
-            pages_data.append({
-                "page_number": i + 1,
-                "text": text,
-                "tables": tables,
-            })
-    return pages_data
+    texts = read_pdf_pages(file_path, backend=backend, processes=processes, min_pages=min_pages)
+    tables = read_pdf_page_tables(file_path, processes=processes, min_pages=min_pages)
+    return [
+        {"page_number": number, "text": text, "tables": page_tables}
+        for number, (text, page_tables) in enumerate(zip(texts, tables), start=1)
+    ]
 
 
 def read_pdf_tables(file_path):
@@ -38,29 +264,29 @@ def read_pdf_tables(file_path):
     and each row is a list of cell strings.
     """
     all_tables = []
-    with pdfplumber.open(file_path) as pdf:
-        for page in pdf.pages:
-            tables = page.extract_tables() or []
-            for table in tables:
-                cleaned = []
-                for row in table:
-                    cleaned.append([cell if cell else "" for cell in row])
-                all_tables.append(cleaned)
+    for tables in iter_pdf_page_tables(file_path, candidate_pages=table_candidate_pages(file_path)):
+        for table in tables:
+            cleaned = []
+            for row in table:
+                cleaned.append([cell if cell else "" for cell in row])
+            all_tables.append(cleaned)
     return all_tables
 
 
 def get_page_count(file_path):
     """Return the number of pages in the PDF."""
-    with pdfplumber.open(file_path) as pdf:
-        return len(pdf.pages)
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
 
 
-def read_pdf_page_range(file_path, start_page, end_page):
+def read_pdf_page_range(
+    file_path, start_page, end_page, backend=DEFAULT_PDF_TEXT_BACKEND, processes=1, min_pages=DEFAULT_PARALLEL_MIN_PAGES
+):
     """Extract text from a specific range of pages (1-indexed, inclusive)."""
-    pdf_text = ""
-    with pdfplumber.open(file_path) as pdf:
-        for i in range(start_page - 1, min(end_page, len(pdf.pages))):
-            text = pdf.pages[i].extract_text()
-            if text:
-                pdf_text += text + "\n"
-    return pdf_text
+    pages = read_pdf_page_range_pages(
+        file_path, start_page, end_page, backend=backend, processes=processes, min_pages=min_pages
+    )
+    return "".join(f"{text}\n" for text in pages if text)
@@ -0,0 +1,105 @@
+"""Local lexical pre-filter in front of the deliverable and report gating calls.
+
+`management_plan_required` and `report_submission_required` ask the model a
+yes/no question for every condition. A condition that never mentions a plan,
+report, submission or similar cannot be a "yes", so the pre-filter answers
+those locally. EXTRACTION_LEXICAL_PREFILTER selects the mode:
+
+- ``off``: always ask the model.
+- ``shadow``: ask the model anyway and count how often the pre-filter agrees
+  with it, so the trigger words can be tuned before the filter is trusted.
+- ``on``: answer "no" locally when no trigger word is present.
+"""
+
+import logging
+import re
+import threading
+from typing import Dict, Pattern
+
+from condition_cron.extraction.llm_steps import LlmSteps
+from condition_cron.extraction.settings import get_setting
+
+logger = logging.getLogger(__name__)
+
+PREFILTER_MODES = ("off", "shadow", "on")
+DEFAULT_PREFILTER_MODE = "shadow"
+
+
+class PrefilterStats:
+    """Thread-safe per-gate counters.
+
+    `model_calls` counts gating calls made, `skipped` those answered locally,
+    and in shadow mode `agreed` / `missed` count trigger-free conditions the
+    model also rejected / nevertheless accepted.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def increment(self, gate: str, name: str) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(gate, {"model_calls": 0, "skipped": 0, "agreed": 0, "missed": 0})
+            counts[name] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {gate: dict(counts) for gate, counts in self._counts.items()}
+
+
+_stats = PrefilterStats()
+
+
+def get_prefilter_mode() -> str:
+    """Return the configured pre-filter mode, falling back to shadow on bad values."""
+    mode = str(get_setting("EXTRACTION_LEXICAL_PREFILTER", DEFAULT_PREFILTER_MODE)).strip().lower()
+    if mode not in PREFILTER_MODES:
+        logger.warning("Invalid EXTRACTION_LEXICAL_PREFILTER=%r; using %s", mode, DEFAULT_PREFILTER_MODE)
+        return DEFAULT_PREFILTER_MODE
+    return mode
+
+
+def gated_steps(gate: str, text: str, triggers: Pattern[str], model_steps: LlmSteps[bool]) -> LlmSteps[bool]:
+    """Answer a yes/no gating question, skipping `model_steps` for trigger-free text when allowed."""
+    mode = get_prefilter_mode()
+    if mode == "off" or triggers.search(text):
+        _stats.increment(gate, "model_calls")
+        return (yield from model_steps)
+
+    if mode == "on":
+        _stats.increment(gate, "skipped")
+        return False
+
+    _stats.increment(gate, "model_calls")
+    answer = yield from model_steps
+    if answer:
+        _stats.increment(gate, "missed")
+        logger.info("Lexical pre-filter would have skipped a %s condition the model accepted: %.120s", gate, text)
+    else:
+        _stats.increment(gate, "agreed")
+    return answer
+
+
+def trigger_pattern(*words: str) -> Pattern[str]:
+    """Compile case-insensitive word-prefix triggers (e.g. "submi" matches "submitted")."""
+    return re.compile(r"\b(?:" + "|".join(words) + r")", re.IGNORECASE)
+
+
+def prefilter_stats_snapshot() -> Dict[str, Dict[str, int]]:
+    """Return the current per-gate counters."""
+    return _stats.snapshot()
+
+
+def log_prefilter_stats(since: Dict[str, Dict[str, int]], label: str) -> None:
+    """Log per-gate pre-filter counters accumulated since an earlier snapshot."""
+    mode = get_prefilter_mode()
+    if mode == "off":
+        return
+    for gate, counts in prefilter_stats_snapshot().items():
+        delta = {name: count - since.get(gate, {}).get(name, 0) for name, count in counts.items()}
+        checked = delta["agreed"] + delta["missed"]
+        agreement = f"{delta['agreed'] / checked:.1%}" if checked else "n/a"
+        logger.info(
+            "Lexical pre-filter (%s) for %s, %s — model calls: %d, skipped: %d, shadow agreement: %s (%d missed)",
+            mode, label, gate, delta["model_calls"], delta["skipped"], agreement, delta["missed"],
+        )
@@ -0,0 +1,391 @@
+"""Process-wide request rate limiting and retries for extractor LLM calls.
+
+Every LLM call in the process goes through one `RateLimiter`, which
+
+* paces request starts and estimated tokens against per-minute budgets
+  (token buckets, so the process runs at the quota ceiling, not above it);
+* caps requests in flight, halving the cap when the provider throttles and
+  growing it back by one request per cap's worth of successes (AIMD);
+* retries 429s, 5xx responses and dropped connections with exponential
+  backoff and full jitter, honouring `Retry-After` and holding every caller
+  back for that long, so throttled threads do not all retry at once;
+* counts requests, retries and time spent throttled.
+"""
+
+import asyncio
+import email.utils
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional, TypeVar
+
+import openai
+
+from condition_cron.extraction.chunking import estimate_tokens
+from condition_cron.extraction.settings import get_float_setting, get_int_setting
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 32
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_BACKOFF_MAX_SECONDS = 60.0
+BACKOFF_BASE_SECONDS = 1.0
+
+# Providers enforce per-minute quotas over much shorter windows (Azure OpenAI
+# checks every 10 seconds), so the token bucket only lets this much of a
+# minute's budget through in a burst.
+TOKEN_BURST_SECONDS = 10.0
+# Allowance for the response when a request does not set max_tokens.
+DEFAULT_COMPLETION_TOKENS = 1000
+# Concurrent 429s from one overload only halve the in-flight cap once.
+DECREASE_COOLDOWN_SECONDS = 2.0
+# How often async callers re-check for a free in-flight slot.
+ASYNC_POLL_SECONDS = 0.02
+
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """A budget of `per_minute` units that refills continuously up to `capacity`.
+
+    Reservations may overdraw the bucket; the caller then waits until the
+    refill covers its share, so concurrent callers are served in order.
+    """
+
+    def __init__(self, per_minute: float, capacity: float):
+        self._rate = per_minute / 60.0
+        self._capacity = capacity
+        self._level = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self._level = min(self._capacity, self._level + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take `amount` from the bucket and return how long to wait before using it."""
+        self._refill(now)
+        self._level -= amount
+        return max(0.0, -self._level / self._rate)
+
+    def adjust(self, amount: float, now: float) -> None:
+        """Give back (or, if negative, take) `amount` after the fact."""
+        self._refill(now)
+        self._level = min(self._capacity, self._level + amount)
+
+
+class AdaptiveConcurrency:
+    """Cap on requests in flight, adjusted additively up and multiplicatively down.
+
+    A ceiling of 0 disables the cap.
+    """
+
+    def __init__(self, ceiling: int):
+        self._ceiling = ceiling
+        self._limit = float(ceiling)
+        self._in_flight = 0
+        self._last_decrease = float("-inf")
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def _try_enter(self) -> bool:
+        with self._condition:
+            if self._ceiling and self._in_flight >= int(self._limit):
+                return False
+            self._in_flight += 1
+            return True
+
+    def enter(self) -> None:
+        with self._condition:
+            while self._ceiling and self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    async def enter_async(self) -> None:
+        while not self._try_enter():
+            await asyncio.sleep(ASYNC_POLL_SECONDS)
+
+    def leave(self) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+
+    def increase(self) -> None:
+        if not self._ceiling:
+            return
+        with self._condition:
+            self._limit = min(float(self._ceiling), self._limit + 1.0 / self._limit)
+            self._condition.notify()
+
+    def decrease(self) -> None:
+        if not self._ceiling:
+            return
+        with self._condition:
+            now = time.monotonic()
+            if now - self._last_decrease < DECREASE_COOLDOWN_SECONDS:
+                return
+            self._last_decrease = now
+            self._limit = max(1.0, min(self._limit, float(self._in_flight)) / 2)
+        logger.warning("LLM requests throttled; in-flight cap lowered to %d", int(self._limit))
+
+
+class RateLimitStats:
+    """Thread-safe request, retry and throttling counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, float] = {
+            "requests": 0, "retries": 0, "rate_limited": 0, "server_errors": 0, "throttled_seconds": 0.0,
+        }
+
+    def increment(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self._counts[name] += amount
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._counts)
+
+
+class RateLimiter:
+    """Process-wide pacing, in-flight cap and retry policy for LLM requests.
+
+    Per-minute limits of 0 disable that limit. The limiter is shared by every
+    thread in the process, so concurrent stages draw from the same budget.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int = 0,
+        max_concurrency: int = 0,
+        max_retries: int = 0,
+        backoff_max_seconds: float = DEFAULT_BACKOFF_MAX_SECONDS,
+    ):
+        # A one-request bucket spaces request starts evenly.
+        self._requests = TokenBucket(requests_per_minute, 1) if requests_per_minute > 0 else None
+        self._tokens = (
+            TokenBucket(tokens_per_minute, tokens_per_minute * TOKEN_BURST_SECONDS / 60)
+            if tokens_per_minute > 0 else None
+        )
+        self.concurrency = AdaptiveConcurrency(max_concurrency)
+        self.stats = RateLimitStats()
+        self._max_retries = max_retries
+        self._backoff_max_seconds = backoff_max_seconds
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+
+    @property
+    def counts_tokens(self) -> bool:
+        return self._tokens is not None
+
+    def _reserve(self, tokens: int = 0) -> float:
+        """Claim the next request slot (and `tokens`) and return how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self._paused_until - now)
+            if self._requests:
+                delay = max(delay, self._requests.reserve(1, now))
+            if self._tokens and tokens:
+                delay = max(delay, self._tokens.reserve(tokens, now))
+        if delay > 0:
+            self.stats.increment("throttled_seconds", delay)
+        return delay
+
+    def acquire(self, tokens: int = 0) -> None:
+        """Block until the caller may start its next request."""
+        delay = self._reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: int = 0) -> None:
+        """Wait, without blocking the event loop, until the caller may start its next request."""
+        delay = self._reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller's next request for `seconds`."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def settle(self, estimated: int, completion: Any) -> None:
+        """Correct the token budget once the response reports the tokens actually used."""
+        usage = getattr(completion, "usage", None)
+        actual = getattr(usage, "total_tokens", None)
+        if self._tokens and isinstance(actual, int):
+            with self._lock:
+                self._tokens.adjust(estimated - actual, time.monotonic())
+
+    @contextmanager
+    def _slot(self) -> Iterator[None]:
+        started = time.monotonic()
+        self.concurrency.enter()
+        self.stats.increment("throttled_seconds", time.monotonic() - started)
+        try:
+            yield
+        finally:
+            self.concurrency.leave()
+
+    @asynccontextmanager
+    async def _slot_async(self) -> AsyncIterator[None]:
+        started = time.monotonic()
+        await self.concurrency.enter_async()
+        self.stats.increment("throttled_seconds", time.monotonic() - started)
+        try:
+            yield
+        finally:
+            self.concurrency.leave()
+
+    def call(self, create: Callable[[], T], tokens: int = 0, on_retry: Optional[Callable[[], None]] = None) -> T:
+        """Run one request under the limits, retrying transient failures (calling `on_retry` for each)."""
+        attempt = 0
+        while True:
+            with self._slot():
+                self.acquire(tokens)
+                self.stats.increment("requests")
+                try:
+                    completion = create()
+                except Exception as e:
+                    delay = self._failed(e, attempt)
+                    if delay is None:
+                        raise
+                else:
+                    self._succeeded(tokens, completion)
+                    return completion
+            attempt += 1
+            if on_retry:
+                on_retry()
+            time.sleep(delay)
+
+    async def call_async(
+        self, create: Callable[[], Awaitable[T]], tokens: int = 0, on_retry: Optional[Callable[[], None]] = None
+    ) -> T:
+        """Async `call`."""
+        attempt = 0
+        while True:
+            async with self._slot_async():
+                await self.acquire_async(tokens)
+                self.stats.increment("requests")
+                try:
+                    completion = await create()
+                except Exception as e:
+                    delay = self._failed(e, attempt)
+                    if delay is None:
+                        raise
+                else:
+                    self._succeeded(tokens, completion)
+                    return completion
+            attempt += 1
+            if on_retry:
+                on_retry()
+            await asyncio.sleep(delay)
+
+    def _succeeded(self, tokens: int, completion: Any) -> None:
+        self.concurrency.increase()
+        self.settle(tokens, completion)
+
+    def _failed(self, error: Exception, attempt: int) -> Optional[float]:
+        """Record a failed request; return the delay before retrying, or None to give up."""
+        status = getattr(error, "status_code", None)
+        if isinstance(error, openai.APIStatusError):
+            if status not in RETRYABLE_STATUS_CODES and status < 500:
+                return None
+        elif not isinstance(error, openai.APIConnectionError):
+            return None
+
+        if status == 429:
+            self.stats.increment("rate_limited")
+        elif status is not None and status >= 500:
+            self.stats.increment("server_errors")
+        if status == 429 or (status is not None and status >= 500):
+            self.concurrency.decrease()
+        if attempt >= self._max_retries:
+            return None
+
+        wait = retry_after(error)
+        if wait is not None:
+            self.pause(wait)
+            delay = wait + random.uniform(0, BACKOFF_BASE_SECONDS)
+        else:
+            delay = random.uniform(0, min(self._backoff_max_seconds, BACKOFF_BASE_SECONDS * 2 ** attempt))
+        logger.warning(
+            "LLM request failed (%s); retry %d of %d in %.1fs",
+            status or type(error).__name__, attempt + 1, self._max_retries, delay,
+        )
+        self.stats.increment("retries")
+        self.stats.increment("throttled_seconds", delay)
+        return delay
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds the provider asked us to wait, from `retry-after-ms` or `Retry-After`."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            retry_at = email.utils.parsedate_to_datetime(value)
+            return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def request_tokens(request: Dict[str, Any]) -> int:
+    """Estimate the tokens a chat completion request will use, prompt and response."""
+    prompt = sum(
+        estimate_tokens(message.get("content") or "")
+        for message in request.get("messages", [])
+        if isinstance(message.get("content"), str)
+    )
+    if request.get("tools"):
+        prompt += estimate_tokens(json.dumps(request["tools"]))
+    return prompt + (request.get("max_tokens") or DEFAULT_COMPLETION_TOKENS)
+
+
+@lru_cache(maxsize=1)
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide limiter configured by the EXTRACTION_* rate settings."""
+    return RateLimiter(
+        get_int_setting("EXTRACTION_REQUESTS_PER_MINUTE", 0),
+        tokens_per_minute=get_int_setting("EXTRACTION_TOKENS_PER_MINUTE", 0),
+        max_concurrency=max(0, get_int_setting("EXTRACTION_LLM_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)),
+        max_retries=max(0, get_int_setting("EXTRACTION_LLM_MAX_RETRIES", DEFAULT_MAX_RETRIES)),
+        backoff_max_seconds=get_float_setting("EXTRACTION_LLM_BACKOFF_MAX_SECONDS", DEFAULT_BACKOFF_MAX_SECONDS),
+    )
+
+
+def rate_limit_stats_snapshot() -> Dict[str, float]:
+    """Return the process-wide request and throttling counters."""
+    return get_rate_limiter().stats.snapshot()
+
+
+def log_rate_limit_stats(since: Dict[str, float], label: str) -> None:
+    """Log request and throttling counters accumulated since an earlier snapshot."""
+    current = rate_limit_stats_snapshot()
+    delta = {name: count - since.get(name, 0) for name, count in current.items()}
+    if not delta["requests"]:
+        return
+    logger.info(
+        "LLM requests for %s — sent: %d, retries: %d, rate limited: %d, server errors: %d, "
+        "throttled: %.1fs, in-flight cap: %d",
+        label, delta["requests"], delta["retries"], delta["rate_limited"], delta["server_errors"],
+        delta["throttled_seconds"], get_rate_limiter().concurrency.limit,
+    )
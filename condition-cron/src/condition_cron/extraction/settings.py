@@ -0,0 +1,57 @@
+"""Runtime settings lookup for the extraction package.
+
+Values come from the Flask app config when an app context is active (the cron
+job), and fall back to environment variables so the package also works from
+scripts and tests.
+"""
+
+import logging
+import os
+from typing import Any
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+_TRUE_VALUES = {"1", "true", "yes", "on"}
+
+
+def get_setting(name: str, default: Any = None) -> Any:
+    """Return a raw setting value, or `default` when it is unset or blank."""
+    try:
+        value = current_app.config.get(name)
+    except RuntimeError:
+        value = None
+    if value is None:
+        value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return value
+
+
+def get_int_setting(name: str, default: int) -> int:
+    """Return an integer setting, falling back to `default` on bad values."""
+    value = get_setting(name, default)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        logger.warning("Invalid %s=%r; using %s", name, value, default)
+        return default
+
+
+def get_float_setting(name: str, default: float) -> float:
+    """Return a float setting, falling back to `default` on bad values."""
+    value = get_setting(name, default)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        logger.warning("Invalid %s=%r; using %s", name, value, default)
+        return default
+
+
+def get_bool_setting(name: str, default: bool) -> bool:
+    """Return a boolean setting; accepts true/false, yes/no, on/off and 1/0."""
+    value = get_setting(name, default)
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in _TRUE_VALUES
@@ -0,0 +1,104 @@
+"""Dependency-ordered execution of whole-document pipeline stages.
+
+Eligibility, classification and First Nations extraction each read only the
+document text, so they need not wait for one another; condition extraction
+needs eligibility and classification. `run_stages` starts every stage as soon
+as the stages it depends on have finished and records how long each one took.
+"""
+
+import contextvars
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from condition_cron.extraction.settings import get_bool_setting
+from condition_cron.extraction.telemetry import llm_stage
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One pipeline stage; `run` receives the results of the stages named in `after`."""
+
+    name: str
+    run: Callable[[Dict[str, Any]], Any]
+    after: Tuple[str, ...] = ()
+
+
+@dataclass
+class StageRun:
+    """Stage results by name, and each stage's wall-clock time in seconds."""
+
+    results: Dict[str, Any] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+def is_concurrent_stages_enabled() -> bool:
+    return get_bool_setting("EXTRACTION_CONCURRENT_STAGES", True)
+
+
+def run_stages(stages: Sequence[Stage], max_workers: Optional[int] = None) -> StageRun:
+    """Run `stages` in dependency order, independent stages concurrently.
+
+    With `max_workers=1` stages run one at a time in the order given. When a
+    stage raises, no further stages start: stages already running finish
+    and their results are discarded, then the error is re-raised (from the
+    earliest-listed stage if several failed). That is how a stage cancels the
+    work downstream of it. Each stage runs in a copy of the caller's context,
+    so the Flask app context stays visible inside worker threads, and its LLM
+    calls are recorded under the stage's name unless a narrower stage applies.
+    """
+    names = {stage.name for stage in stages}
+    for stage in stages:
+        unknown = set(stage.after) - names
+        if unknown:
+            raise ValueError(f"Stage {stage.name!r} depends on unknown stage(s): {', '.join(sorted(unknown))}")
+
+    run = StageRun()
+    order = {stage.name: position for position, stage in enumerate(stages)}
+    pending = list(stages)
+    running: Dict[Future, Stage] = {}
+    errors: Dict[str, BaseException] = {}
+    workers = max(1, max_workers or len(stages))
+
+    def timed(stage: Stage, inputs: Dict[str, Any]) -> Any:
+        started = time.perf_counter()
+        try:
+            with llm_stage(stage.name):
+                return stage.run(inputs)
+        finally:
+            run.timings[stage.name] = round(time.perf_counter() - started, 3)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="extract-stage") as executor:
+        while True:
+            ready = [stage for stage in pending if all(name in run.results for name in stage.after)]
+            for stage in ready if not errors else ():
+                if len(running) >= workers:
+                    break
+                pending.remove(stage)
+                inputs = {name: run.results[name] for name in stage.after}
+                running[executor.submit(contextvars.copy_context().run, timed, stage, inputs)] = stage
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                try:
+                    run.results[stage.name] = future.result()
+                except BaseException as e:
+                    errors[stage.name] = e
+
+    if errors:
+        first = min(errors, key=order.__getitem__)
+        if pending:
+            logger.info(
+                "Stage %s stopped the pipeline; not running %s",
+                first, ", ".join(stage.name for stage in pending),
+            )
+        raise errors[first]
+    if pending:
+        raise ValueError(f"Stages with circular dependencies: {', '.join(stage.name for stage in pending)}")
+    return run
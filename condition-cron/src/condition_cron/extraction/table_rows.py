@@ -0,0 +1,171 @@
+"""Deterministic parsing of `table_format` commitment tables.
+
+Table-format documents list one commitment per row, under Subject Area
+headings, with a Ref # column ("A1", "C12", "4.2"). pdfplumber already
+recovers those rows as cells, so a page whose tables have a recognisable
+Ref # / commitment header (or continue a table that had one) can be turned
+into conditions without asking the model to copy every row back out. A page
+is only parsed locally when every row makes sense and the tables account for
+(nearly) all of the page's text; anything else is left to the model.
+"""
+
+import logging
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from condition_cron.extraction.settings import get_bool_setting
+
+logger = logging.getLogger(__name__)
+
+# Share of a page's words that must come from its tables before the page is
+# parsed locally; below this the page has prose the tables would lose.
+MIN_TABLE_COVERAGE = 0.9
+
+_REF_HEADER = re.compile(r"^(ref(erence)?\.?\s*(#|no\.?|number|id)?|id|#|no\.?|item( #| no\.?)?)$", re.IGNORECASE)
+_TEXT_HEADER = re.compile(r"commitment|condition|requirement|mitigation|measure|action", re.IGNORECASE)
+_SUBJECT_HEADER = re.compile(r"subject|component|category|topic|area|discipline", re.IGNORECASE)
+_REF = re.compile(r"^[A-Z]{0,3}-?\d+(\.\d+)*[a-z]?$")
+_BULLET = re.compile(r"^([•●▪◦‣\-–o]\s|\(?[a-z0-9]{1,3}[.)]\s)")
+_WORD = re.compile(r"\w+")
+
+
+@dataclass(frozen=True)
+class TableLayout:
+    """Which column holds what, taken from a table's header row."""
+
+    columns: int
+    ref: int
+    text: int
+    subject: Optional[int] = None
+
+
+@dataclass
+class TableParse:
+    """Conditions parsed per page (1-indexed); pages missing were not parsed confidently."""
+
+    pages: Dict[int, List[Dict[str, str]]] = field(default_factory=dict)
+
+    @property
+    def row_count(self) -> int:
+        return sum(len(rows) for rows in self.pages.values())
+
+
+def is_table_parser_enabled() -> bool:
+    return get_bool_setting("EXTRACTION_TABLE_PARSER", False)
+
+
+def parse_table_pages(
+    pages: List[str],
+    tables_by_page: List[List[List[List[Optional[str]]]]],
+    section_headers: Optional[List[str]] = None,
+) -> TableParse:
+    """Parse each page's tables into {"condition_name", "condition_text"} rows.
+
+    Layout and the current Subject Area carry over from page to page, since
+    long tables repeat neither their header row nor the heading. The
+    classifier's `section_headers` tell a heading row apart from a row that
+    only continues the previous commitment.
+    """
+    headings = {_heading_key(header) for header in section_headers or []}
+    result = TableParse()
+    layout: Optional[TableLayout] = None
+    subject = ""
+    for number, (text, tables) in enumerate(zip(pages, tables_by_page), start=1):
+        if not tables:
+            layout, subject = None, ""
+            continue
+        conditions: Optional[List[Dict[str, str]]] = []
+        for table in tables:
+            rows = [[_clean_cell(cell) for cell in row] for row in table]
+            header = _find_layout(rows)
+            if header is not None:
+                layout, rows = header, rows[1:]
+            if layout is None or any(len(row) != layout.columns for row in rows):
+                conditions = None
+                break
+            parsed = _parse_rows(rows, layout, subject, conditions, headings)
+            if parsed is None:
+                conditions = None
+                break
+            subject = parsed
+        if conditions is None or not conditions:
+            layout, subject = None, ""
+            continue
+        if _coverage(text, tables) < MIN_TABLE_COVERAGE:
+            continue
+        result.pages[number] = conditions
+
+    logger.info(
+        "Parsed %d table row(s) locally on %d of %d page(s)", result.row_count, len(result.pages), len(pages)
+    )
+    return result
+
+
+def _find_layout(rows: List[List[str]]) -> Optional[TableLayout]:
+    if not rows:
+        return None
+    header = rows[0]
+    ref = next((i for i, cell in enumerate(header) if _REF_HEADER.match(cell)), None)
+    text = next((i for i, cell in enumerate(header) if i != ref and _TEXT_HEADER.search(cell)), None)
+    if ref is None or text is None:
+        return None
+    subject = next(
+        (i for i, cell in enumerate(header) if i not in (ref, text) and _SUBJECT_HEADER.search(cell)), None
+    )
+    return TableLayout(columns=len(header), ref=ref, text=text, subject=subject)
+
+
+def _parse_rows(
+    rows: List[List[str]], layout: TableLayout, subject: str, conditions: List[Dict[str, str]], headings: Set[str]
+) -> Optional[str]:
+    """Append the rows' conditions; return the Subject Area in force afterwards, or None if a row is unclear."""
+    for row in rows:
+        filled = [cell for cell in row if cell]
+        ref, text = row[layout.ref], row[layout.text]
+        if layout.subject is not None and row[layout.subject]:
+            subject = row[layout.subject]
+        if not filled:
+            continue
+        if len(filled) == 1 and (
+            (not ref and not text) or (ref and not _REF.match(ref)) or _heading_key(filled[0]) in headings
+        ):
+            # A Subject Area heading row.
+            subject = filled[0]
+            continue
+        if not ref and text and conditions:
+            # The rest of the previous row, wrapped onto a new row or page.
+            conditions[-1]["condition_text"] += "\n" + text
+            continue
+        if not (ref and text and _REF.match(ref) and subject):
+            return None
+        conditions.append({"condition_name": f"{ref} - {subject}", "condition_text": text})
+    return subject
+
+
+def _heading_key(text: str) -> str:
+    return " ".join(_WORD.findall(text.lower()))
+
+
+def _clean_cell(cell: Optional[str]) -> str:
+    """Unwrap a cell's lines, keeping line breaks only before bullets and list items."""
+    lines = [" ".join(line.split()) for line in (cell or "").splitlines()]
+    text = ""
+    for line in filter(None, lines):
+        if text and _BULLET.match(line):
+            text += "\n" + line
+        else:
+            text = f"{text} {line}" if text else line
+    return text
+
+
+def _coverage(text: str, tables: List[List[List[Optional[str]]]]) -> float:
+    page_words = Counter(word.lower() for word in _WORD.findall(text))
+    table_words = Counter(
+        word.lower() for table in tables for row in table for cell in row for word in _WORD.findall(cell or "")
+    )
+    total = sum(page_words.values())
+    if not total:
+        return 1.0
+    return sum(min(count, table_words[word]) for word, count in page_words.items()) / total
@@ -0,0 +1,134 @@
+"""Per-call LLM telemetry for one extraction request.
+
+`recording()` starts collecting for the current document. Every completion
+that passes through `ExtractorClient` is then recorded with the pipeline stage
+and unit ("chunk 3", "condition 12") it belongs to, its latency, token usage,
+retries and finish reason. `CallRecorder.metrics()` sums the calls per stage
+for the `metrics` column saved next to `extracted_data`.
+
+Stage and label live in context variables, which worker threads and asyncio
+tasks inherit from the code that starts them.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+_stage: ContextVar[Optional[str]] = ContextVar("llm_stage", default=None)
+_label: ContextVar[Optional[str]] = ContextVar("llm_label", default=None)
+_recorder: ContextVar[Optional["CallRecorder"]] = ContextVar("llm_recorder", default=None)
+
+
+@dataclass
+class LlmCall:
+    """One `chat.completions.create` call as seen by the pipeline."""
+
+    stage: Optional[str]
+    label: Optional[str]
+    latency_seconds: float
+    prompt_tokens: int
+    completion_tokens: int
+    retries: int
+    finish_reason: Optional[str]
+    cached: bool
+
+
+class CallRecorder:
+    """Thread-safe list of the LLM calls made for one document."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: List[LlmCall] = []
+        self._started = time.perf_counter()
+
+    def add(self, call: LlmCall) -> None:
+        with self._lock:
+            self._calls.append(call)
+
+    @property
+    def calls(self) -> List[LlmCall]:
+        with self._lock:
+            return list(self._calls)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Totals for the whole document and per stage, plus every call."""
+        calls = self.calls
+        stages: Dict[str, List[LlmCall]] = {}
+        for call in calls:
+            stages.setdefault(call.stage or "other", []).append(call)
+        return {
+            "wall_seconds": round(time.perf_counter() - self._started, 3),
+            "llm": _totals(calls),
+            "llm_by_stage": {stage: _totals(stage_calls) for stage, stage_calls in stages.items()},
+            "calls": [asdict(call) for call in calls],
+        }
+
+
+def _totals(calls: List[LlmCall]) -> Dict[str, Any]:
+    sent = [call for call in calls if not call.cached]
+    finish_reasons: Dict[str, int] = {}
+    for call in calls:
+        reason = call.finish_reason or "unknown"
+        finish_reasons[reason] = finish_reasons.get(reason, 0) + 1
+    return {
+        "calls": len(calls),
+        "cached_calls": len(calls) - len(sent),
+        "retries": sum(call.retries for call in calls),
+        "prompt_tokens": sum(call.prompt_tokens for call in sent),
+        "completion_tokens": sum(call.completion_tokens for call in sent),
+        "latency_seconds": round(sum(call.latency_seconds for call in sent), 3),
+        "finish_reasons": finish_reasons,
+    }
+
+
+@contextmanager
+def recording() -> Iterator[CallRecorder]:
+    """Collect the LLM calls made in this context (and the threads/tasks it starts)."""
+    recorder = CallRecorder()
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+
+
+@contextmanager
+def llm_stage(stage: Optional[str], label: Optional[str] = None) -> Iterator[None]:
+    """Attribute LLM calls made in this context to `stage` (and unit `label`)."""
+    stage_token = _stage.set(stage)
+    label_token = _label.set(label)
+    try:
+        yield
+    finally:
+        _label.reset(label_token)
+        _stage.reset(stage_token)
+
+
+def in_stage(stage: Optional[str], label: Optional[str], fn: Callable[..., T], *args: Any) -> T:
+    """Call `fn(*args)` inside `llm_stage(stage, label)`; for handing to an executor."""
+    with llm_stage(stage, label):
+        return fn(*args)
+
+
+def record_call(completion: Any, latency_seconds: float, retries: int = 0, cached: bool = False) -> None:
+    """Record a completion against the current stage, if a recording is active."""
+    recorder = _recorder.get()
+    if recorder is None:
+        return
+    usage = getattr(completion, "usage", None)
+    choices = getattr(completion, "choices", None) or [None]
+    recorder.add(LlmCall(
+        stage=_stage.get(),
+        label=_label.get(),
+        latency_seconds=round(latency_seconds, 3),
+        prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+        completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+        retries=retries,
+        finish_reason=getattr(choices[0], "finish_reason", None),
+        cached=cached,
+    ))
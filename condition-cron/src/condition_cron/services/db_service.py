@@ -40,6 +40,7 @@ REQUEST_SELECT = """
         er.document_label,
         er.s3_url,
         er.status,
+        er.checkpoint_data,
         p.project_name,
         p.project_type,
         d.date_issued,
@@ -69,41 +70,129 @@ def _fetch_one_request(cur, where_clause: str, params: tuple) -> Optional[dict]:
     return dict(zip(cols, row))
 
 
-def get_pending_requests() -> list[dict]:
-    """Return at most one request that is eligible for the next cron run.
+def claim_next_request(worker_id: str) -> Optional[dict]:
+    """Lease the next eligible request to this worker, or return None.
 
     Queue rules:
-    - If a fresh processing request already exists, do not fetch another one.
-    - If a processing request is stale, retry that request first.
-    - Otherwise fetch the oldest pending request.
+    - A `processing` request whose lease has expired (its worker stopped
+      heartbeating) is reclaimed first.
+    - Legacy `processing` rows without a lease are reclaimed once they are
+      older than EXTRACTION_PROCESSING_STALE_AFTER_MINUTES.
+    - Otherwise the oldest `pending` request is claimed.
+
+    `FOR UPDATE SKIP LOCKED` lets any number of cron workers call this at the
+    same time without two of them claiming the same row.
     """
+    cfg = current_app.config
     conn, cur = _get_connection()
     try:
-        stale_after_minutes = current_app.config['EXTRACTION_PROCESSING_STALE_AFTER_MINUTES']
-
         cur.execute(
             """
-            SELECT 1
-            FROM condition.extraction_requests er
-            WHERE er.status = 'processing'
-              AND er.updated_date >= NOW() - (%s * INTERVAL '1 minute')
-            LIMIT 1
+            WITH next_request AS (
+                SELECT er.id
+                FROM condition.extraction_requests er
+                WHERE er.status = 'pending'
+                   OR (
+                        er.status = 'processing'
+                        AND (
+                            er.lease_expires_at < NOW()
+                            OR (
+                                er.lease_expires_at IS NULL
+                                AND er.updated_date < NOW() - (%s * INTERVAL '1 minute')
+                            )
+                        )
+                   )
+                ORDER BY (er.status = 'processing') DESC, er.created_date ASC
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            UPDATE condition.extraction_requests er
+            SET status = 'processing',
+                lease_owner = %s,
+                lease_expires_at = NOW() + (%s * INTERVAL '1 minute'),
+                processing_started_at = NOW(),
+                updated_date = NOW()
+            FROM next_request
+            WHERE er.id = next_request.id
+            RETURNING er.id
             """,
-            (stale_after_minutes,),
+            (
+                cfg['EXTRACTION_PROCESSING_STALE_AFTER_MINUTES'],
+                worker_id,
+                cfg['EXTRACTION_LEASE_MINUTES'],
+            ),
         )
-        if cur.fetchone():
-            return []
+        claimed = cur.fetchone()
+        conn.commit()
+        if not claimed:
+            return None
+
+        return _fetch_one_request(cur, "er.id = %s", (claimed[0],))
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
 
-        stale_request = _fetch_one_request(
-            cur,
-            "er.status = 'processing' AND er.updated_date < NOW() - (%s * INTERVAL '1 minute')",
-            (stale_after_minutes,),
+
+def heartbeat(request_id: int, worker_id: str) -> bool:
+    """Extend this worker's lease on a request.
+
+    Also bumps `updated_date` so long jobs are not mistaken for stale ones.
+    Returns False when the lease is gone, e.g. the request was rejected.
+    """
+    conn, cur = _get_connection()
+    try:
+        cur.execute(
+            """
+            UPDATE condition.extraction_requests
+            SET lease_expires_at = NOW() + (%s * INTERVAL '1 minute'),
+                updated_date = NOW()
+            WHERE id = %s
+              AND status = 'processing'
+              AND lease_owner = %s
+            """,
+            (current_app.config['EXTRACTION_LEASE_MINUTES'], request_id, worker_id),
         )
-        if stale_request:
-            return [stale_request]
+        conn.commit()
+        return cur.rowcount > 0
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+
+def save_checkpoint(request_id: int, worker_id: str, checkpoint_data: dict) -> bool:
+    """Persist partial extraction progress while this worker holds the lease.
 
-        pending_request = _fetch_one_request(cur, "er.status = 'pending'", ())
-        return [pending_request] if pending_request else []
+    Returns False when the lease is gone, so a worker that lost its request
+    cannot overwrite the progress of the worker that took it over.
+    """
+    conn, cur = _get_connection()
+    try:
+        cur.execute(
+            """
+            UPDATE condition.extraction_requests
+            SET checkpoint_data = %s,
+                updated_date = NOW()
+            WHERE id = %s
+              AND status = 'processing'
+              AND lease_owner = %s
+            """,
+            (
+                Json(checkpoint_data, dumps=lambda value: json.dumps(value, default=_json_default)),
+                request_id,
+                worker_id,
+            ),
+        )
+        conn.commit()
+        return cur.rowcount > 0
+    except Exception:
+        conn.rollback()
+        raise
     finally:
         cur.close()
         conn.close()
@@ -124,13 +213,40 @@ def get_request_status(request_id: int) -> Optional[str]:
         conn.close()
 
 
+def get_queue_stats() -> dict:
+    """Return the number of pending requests and the age in seconds of the oldest one."""
+    conn, cur = _get_connection()
+    try:
+        cur.execute(
+            """
+            SELECT COUNT(*),
+                   COALESCE(EXTRACT(EPOCH FROM (NOW() - MIN(created_date))), 0)
+            FROM condition.extraction_requests
+            WHERE status = 'pending'
+            """
+        )
+        pending, oldest_age_seconds = cur.fetchone()
+        return {'pending': int(pending), 'oldest_pending_age_seconds': float(oldest_age_seconds)}
+    finally:
+        cur.close()
+        conn.close()
+
+
 def _update_extraction_request_state(
     request_id: int,
+    worker_id: str,
     status: str,
     error_message: str = None,
     extracted_data: dict = None,
-) -> None:
-    """Update request state, optional error text, and optional extracted JSON."""
+    metrics: dict = None,
+) -> bool:
+    """Set the final state, error text, extracted JSON and run metrics, releasing the lease.
+
+    Only writes while `worker_id` still holds the lease on a processing
+    request, so a worker whose lease expired cannot overwrite the outcome of
+    the worker that re-claimed it (or a rejection). Returns False when nothing
+    was written.
+    """
     conn, cur = _get_connection()
     try:
         extracted_data_json = (
@@ -138,18 +254,30 @@ def _update_extraction_request_state(
             if extracted_data
             else None
         )
+        metrics_json = (
+            Json(metrics, dumps=lambda value: json.dumps(value, default=_json_default))
+            if metrics
+            else None
+        )
         cur.execute(
             """
             UPDATE condition.extraction_requests
             SET status = %s,
                 error_message = %s,
                 extracted_data = %s,
+                metrics = %s,
+                lease_owner = NULL,
+                lease_expires_at = NULL,
+                checkpoint_data = NULL,
                 updated_date = NOW()
             WHERE id = %s
+              AND status = 'processing'
+              AND lease_owner = %s
             """,
-            (status, error_message, extracted_data_json, request_id),
+            (status, error_message, extracted_data_json, metrics_json, request_id, worker_id),
         )
         conn.commit()
+        return cur.rowcount > 0
     except Exception:
         conn.rollback()
         raise
@@ -158,30 +286,28 @@ def _update_extraction_request_state(
         conn.close()
 
 
-def mark_processing(request_id: int) -> None:
-    """Mark an extraction request as actively processing."""
-    _update_extraction_request_state(request_id, 'processing')
-
-
-def mark_failed(request_id: int, error_message: str) -> None:
+def mark_failed(request_id: int, worker_id: str, error_message: str) -> bool:
     """Mark an extraction request as failed with an error message."""
-    _update_extraction_request_state(request_id, 'failed', error_message=error_message)
+    return _update_extraction_request_state(request_id, worker_id, 'failed', error_message=error_message)
 
 
-def mark_unsupported(request_id: int, reason: str, eligibility: dict) -> None:
+def mark_unsupported(request_id: int, worker_id: str, reason: str, eligibility: dict) -> bool:
     """Mark an extraction request as unsupported with classifier details."""
     extracted_data = {
         "conditions": [],
         "eligibility": eligibility or {},
     }
-    _update_extraction_request_state(
+    return _update_extraction_request_state(
         request_id,
+        worker_id,
         'unsupported',
         error_message=reason,
         extracted_data=extracted_data,
     )
 
 
-def save_extraction_result(request_id: int, extracted_data: dict) -> None:
-    """Save parsed extraction JSON and mark the request completed."""
-    _update_extraction_request_state(request_id, 'completed', extracted_data=extracted_data)
+def save_extraction_result(request_id: int, worker_id: str, extracted_data: dict, metrics: dict = None) -> bool:
+    """Save parsed extraction JSON (and its run metrics) and mark the request completed."""
+    return _update_extraction_request_state(
+        request_id, worker_id, 'completed', extracted_data=extracted_data, metrics=metrics
+    )
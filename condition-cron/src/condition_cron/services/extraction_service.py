@@ -6,6 +6,7 @@ service can run without the old Gradio/manual condition-parser module.
 
 import logging
 import os
+import time
 
 from flask import current_app
 
@@ -44,46 +45,112 @@ def _get_unsupported_confidence_threshold() -> float:
         return 0.75
 
 
-def extract_and_enrich(file_path: str) -> dict:
+def extract_and_enrich(file_path: str, checkpoint=None) -> dict:
     """Full pipeline: classify → extract → enrich.
 
     Delegates to condition_cron.extraction.extractor.extract_and_enrich_all().
-    Returns a dict with 'conditions' and 'classification' keys.
+    Returns a dict with 'conditions', 'classification' and 'metrics' keys;
+    'metrics' holds per-stage timings and the latency and token usage of
+    every LLM call, and is stored apart from the extracted data.
+
+    Eligibility, classification and First Nations extraction run
+    concurrently; condition extraction starts once the document is known to
+    be supported and classified. Stages already recorded in `checkpoint` (an
+    ExtractionCheckpoint) are reused, not re-run.
     """
     # Imported here so Flask has loaded env vars before the OpenAI client is built.
     from condition_cron.extraction.document_classifier import (
         classify_document_eligibility,
         is_document_supported_for_extraction,
     )
+    from condition_cron.extraction.checkpoint import ExtractionCheckpoint
+    from condition_cron.extraction.document import load_document
     from condition_cron.extraction.extractor import (
         classify_and_count,
         extract_and_enrich_all,
-        read_file_text,
     )
-    from condition_cron.extraction.first_nations import process_single_pdf
-
-    file_text = read_file_text(file_path)
-    eligibility = classify_document_eligibility(file_text)
+    from condition_cron.extraction.first_nations import extract_first_nations
+    from condition_cron.extraction.llm_cache import cache_stats_snapshot, log_cache_stats
+    from condition_cron.extraction.prefilter import log_prefilter_stats, prefilter_stats_snapshot
+    from condition_cron.extraction.rate_limit import log_rate_limit_stats, rate_limit_stats_snapshot
+    from condition_cron.extraction.stages import Stage, is_concurrent_stages_enabled, run_stages
+    from condition_cron.extraction.telemetry import recording
+
+    checkpoint = checkpoint or ExtractionCheckpoint()
+    cache_stats = cache_stats_snapshot()
+    prefilter_stats = prefilter_stats_snapshot()
+    rate_limit_stats = rate_limit_stats_snapshot()
+    # Parse the file once; every stage below reads from this document.
+    parse_started = time.perf_counter()
+    document = load_document(file_path)
+    parse_seconds = time.perf_counter() - parse_started
     threshold = _get_unsupported_confidence_threshold()
 
-    if not is_document_supported_for_extraction(eligibility, threshold):
-        logger.info(
-            "Skipping unsupported document %s: %s",
-            file_path,
-            eligibility.get("reason"),
+    def eligibility_stage(_):
+        eligibility = checkpoint.cached("eligibility", lambda: classify_document_eligibility(document.text))
+        if not is_document_supported_for_extraction(eligibility, threshold):
+            logger.info(
+                "Skipping unsupported document %s: %s",
+                file_path,
+                eligibility.get("reason"),
+            )
+            raise UnsupportedDocumentError(eligibility)
+        return eligibility
+
+    def classification_stage(_):
+        logger.info('Classifying %s', file_path)
+        return checkpoint.cached(
+            "classification",
+            lambda: classify_and_count(file_path, file_text=document.text),
         )
-        raise UnsupportedDocumentError(eligibility)
-
-    logger.info('Classifying %s', file_path)
-    classification = classify_and_count(file_path, file_text=file_text)
-
-    logger.info('Extracting and enriching conditions from %s', file_path)
-    result = extract_and_enrich_all(file_path, classification)
 
-    if result and 'conditions' in result and file_path.endswith('.pdf'):
-        result = process_single_pdf(file_path, result)
-
-    result['eligibility'] = eligibility
-    result['classification'] = classification
+    def extraction_stage(inputs):
+        logger.info('Extracting and enriching conditions from %s', file_path)
+        return extract_and_enrich_all(document, inputs["classification"], checkpoint=checkpoint)
+
+    def first_nations_stage(_):
+        return checkpoint.cached("first_nations", lambda: extract_first_nations(document))
+
+    # Eligibility is listed first so its UnsupportedDocumentError wins over
+    # errors from the stages that ran alongside it.
+    stages = [
+        Stage("eligibility", eligibility_stage),
+        Stage("classification", classification_stage),
+        Stage("extraction", extraction_stage, after=("eligibility", "classification")),
+    ]
+    if document.is_pdf:
+        stages.append(Stage("first_nations", first_nations_stage))
+    with recording() as recorder:
+        run = run_stages(stages, max_workers=None if is_concurrent_stages_enabled() else 1)
+
+    result = run.results["extraction"]
+    first_nations = run.results.get("first_nations")
+    if result and 'conditions' in result and first_nations:
+        result['first_nations'] = first_nations['first_nations']
+        result['consultation_records_required'] = first_nations['consultation_records_required']
+
+    result['eligibility'] = run.results["eligibility"]
+    result['classification'] = run.results["classification"]
+    metrics = recorder.metrics()
+    metrics['document_type'] = run.results["classification"].get('document_type')
+    metrics['stage_timings'] = run.timings
+    metrics['pdf'] = {'pages': len(document.pages), 'parse_seconds': round(parse_seconds, 3)}
+    result['metrics'] = metrics
     logger.info('Extraction complete: %d condition(s)', len(result.get('conditions', [])))
+    logger.info(
+        'Stage timings for %s: %s',
+        file_path,
+        ', '.join(f'{name} {seconds:.1f}s' for name, seconds in run.timings.items()),
+    )
+    logger.info(
+        'LLM usage for %s: %s',
+        file_path,
+        ', '.join(
+            f"{stage} {totals['calls']} call(s) {totals['prompt_tokens']}+{totals['completion_tokens']} tokens"
+            for stage, totals in metrics['llm_by_stage'].items()
+        ) or 'no calls',
+    )
+    log_cache_stats(cache_stats, file_path)
+    log_prefilter_stats(prefilter_stats, file_path)
+    log_rate_limit_stats(rate_limit_stats, file_path)
     return result
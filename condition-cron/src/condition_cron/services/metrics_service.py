@@ -0,0 +1,126 @@
+"""Prometheus metrics for one cron run.
+
+Each run collects into its own registry and exports it once, when the run
+ends: pushed to a Pushgateway (EXTRACTION_METRICS_PUSHGATEWAY_URL), written
+as a node-exporter textfile (EXTRACTION_METRICS_TEXTFILE), or both. With
+neither set, nothing is collected.
+"""
+
+import logging
+import socket
+from typing import Optional
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, push_to_gateway, write_to_textfile
+
+from condition_cron.extraction.settings import get_setting
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOB_NAME = 'condition-cron'
+
+DOCUMENT_BUCKETS = (30, 60, 120, 300, 600, 900, 1200, 1800, 2700, 3600, 5400, 7200)
+STAGE_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+LLM_LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000)
+PAGES_PER_SECOND_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+def is_enabled() -> bool:
+    """Whether a Pushgateway or textfile destination is configured."""
+    return bool(get_setting('EXTRACTION_METRICS_PUSHGATEWAY_URL') or get_setting('EXTRACTION_METRICS_TEXTFILE'))
+
+
+class RunMetrics:
+    """Histograms and gauges for the documents processed in one cron run."""
+
+    def __init__(self):
+        self.registry = CollectorRegistry()
+        self.documents = Counter(
+            'condition_cron_documents', 'Extraction requests processed, by outcome',
+            ['outcome'], registry=self.registry,
+        )
+        self.document_seconds = Histogram(
+            'condition_cron_document_duration_seconds', 'Time to process one extraction request',
+            ['outcome'], buckets=DOCUMENT_BUCKETS, registry=self.registry,
+        )
+        self.stage_seconds = Histogram(
+            'condition_cron_stage_duration_seconds', 'Time spent in each pipeline stage of a document',
+            ['stage'], buckets=STAGE_BUCKETS, registry=self.registry,
+        )
+        self.llm_seconds = Histogram(
+            'condition_cron_llm_request_duration_seconds', 'LLM request latency, including retries',
+            ['stage'], buckets=LLM_LATENCY_BUCKETS, registry=self.registry,
+        )
+        self.llm_tokens = Histogram(
+            'condition_cron_llm_tokens', 'Tokens per LLM request',
+            ['stage', 'kind'], buckets=TOKEN_BUCKETS, registry=self.registry,
+        )
+        self.llm_retries = Counter(
+            'condition_cron_llm_retries', 'LLM request retries after throttling or server errors',
+            ['stage'], registry=self.registry,
+        )
+        self.pdf_pages_per_second = Histogram(
+            'condition_cron_pdf_pages_per_second', 'PDF parsing throughput per document',
+            buckets=PAGES_PER_SECOND_BUCKETS, registry=self.registry,
+        )
+        self.queue_depth = Gauge(
+            'condition_cron_queue_pending', 'Pending extraction requests when the run started',
+            registry=self.registry,
+        )
+        self.oldest_pending_age = Gauge(
+            'condition_cron_queue_oldest_pending_age_seconds',
+            'Age of the oldest pending extraction request when the run started',
+            registry=self.registry,
+        )
+        self.last_run = Gauge(
+            'condition_cron_last_run_timestamp_seconds', 'When this worker last finished a run',
+            registry=self.registry,
+        )
+
+    def observe_queue(self, stats: dict) -> None:
+        self.queue_depth.set(stats['pending'])
+        self.oldest_pending_age.set(stats['oldest_pending_age_seconds'])
+
+    def observe_document(self, outcome: str, seconds: float) -> None:
+        self.documents.labels(outcome).inc()
+        self.document_seconds.labels(outcome).observe(seconds)
+
+    def observe_extraction(self, metrics: Optional[dict]) -> None:
+        """Record the stage timings, LLM calls and PDF throughput of one document's metrics block."""
+        if not metrics:
+            return
+        for stage, seconds in metrics.get('stage_timings', {}).items():
+            self.stage_seconds.labels(stage).observe(seconds)
+        for call in metrics.get('calls', []):
+            if call.get('cached'):
+                continue
+            stage = call.get('stage') or 'other'
+            self.llm_seconds.labels(stage).observe(call['latency_seconds'])
+            self.llm_tokens.labels(stage, 'prompt').observe(call['prompt_tokens'])
+            self.llm_tokens.labels(stage, 'completion').observe(call['completion_tokens'])
+            if call.get('retries'):
+                self.llm_retries.labels(stage).inc(call['retries'])
+        pdf = metrics.get('pdf') or {}
+        if pdf.get('pages') and pdf.get('parse_seconds'):
+            self.pdf_pages_per_second.observe(pdf['pages'] / pdf['parse_seconds'])
+
+    def export(self) -> None:
+        """Push and/or write the run's metrics. Failures are logged, never raised."""
+        self.last_run.set_to_current_time()
+        gateway = get_setting('EXTRACTION_METRICS_PUSHGATEWAY_URL')
+        if gateway:
+            try:
+                push_to_gateway(
+                    gateway,
+                    job=get_setting('EXTRACTION_METRICS_JOB', DEFAULT_JOB_NAME),
+                    registry=self.registry,
+                    grouping_key={'instance': socket.gethostname()},
+                )
+            except Exception as exc:
+                logger.warning('Could not push metrics to %s: %s', gateway, exc)
+        textfile = get_setting('EXTRACTION_METRICS_TEXTFILE')
+        if textfile:
+            try:
+                write_to_textfile(textfile, self.registry)
+            except Exception as exc:
+                logger.warning('Could not write metrics to %s: %s', textfile, exc)
@@ -1,102 +1,231 @@
 """Task: read pending extraction requests from DB, extract conditions, and load into the database."""
 
+import contextvars
 import os
 import logging
+import socket
+import threading
+import time
+import uuid
 
-from condition_cron.services import db_service, extraction_service, s3_service
+from condition_cron.extraction.checkpoint import DEFAULT_SAVE_INTERVAL_SECONDS, ExtractionCheckpoint
+from condition_cron.extraction.settings import get_int_setting
+from condition_cron.services import db_service, extraction_service, metrics_service, s3_service
 
 logger = logging.getLogger(__name__)
 
 
-class ProcessDocuments:
-    """Orchestrates the full pipeline for each pending extraction request."""
+class _LeaseHeartbeat:
+    """Background thread that keeps a request's lease alive while it is processed.
+
+    `lost` is set once a heartbeat finds the lease gone; the request's result
+    must then be dropped rather than written.
+    """
+
+    def __init__(self, request_id: int, worker_id: str, interval_seconds: int):
+        self._request_id = request_id
+        self._worker_id = worker_id
+        self._interval_seconds = interval_seconds
+        self._stopped = threading.Event()
+        self.lost = threading.Event()
+        self._thread = threading.Thread(
+            target=contextvars.copy_context().run,
+            args=(self._run,),
+            name=f'lease-heartbeat-{request_id}',
+            daemon=True,
+        )
 
-    @staticmethod
-    def process():
-        """Main entry point called by invoke_jobs.py."""
-        pending = db_service.get_pending_requests()
+    def __enter__(self):
+        self._thread.start()
+        return self
 
-        if not pending:
-            logger.info('No pending extraction requests found.')
-            return
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
 
-        success, failed, unsupported = 0, 0, 0
+    def _run(self):
+        while not self._stopped.wait(self._interval_seconds):
+            try:
+                if not db_service.heartbeat(self._request_id, self._worker_id):
+                    self.lost.set()
+                    logger.warning(
+                        'Lost lease on extraction request %d (status changed or lease expired)',
+                        self._request_id,
+                    )
+                    return
+            except Exception as exc:
+                logger.warning('Heartbeat failed for extraction request %d: %s', self._request_id, exc)
 
-        for req in pending:
-            request_id = req['id']
-            s3_key = req['s3_url']
-            local_path = None
 
-            try:
-                logger.info('Processing extraction request %d — %s', request_id, s3_key)
+class ProcessDocuments:
+    """Orchestrates the full pipeline for each pending extraction request."""
 
-                # 1. Mark as processing
-                db_service.mark_processing(request_id)
+    @staticmethod
+    def _worker_id() -> str:
+        """Return a lease owner id that is unique to this cron run."""
+        return f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
 
-                # 2. Download PDF from S3
-                local_path = s3_service.download_file(s3_key)
+    @staticmethod
+    def process():
+        """Main entry point called by invoke_jobs.py.
+
+        Claims requests one at a time until the queue is empty or
+        EXTRACTION_MAX_REQUESTS_PER_RUN is reached (0 means no limit). Several
+        cron workers can run this at once; leasing keeps them off each other's
+        requests. When a metrics destination is configured, the run's
+        Prometheus metrics are exported once it finishes.
+        """
+        run_metrics = metrics_service.RunMetrics() if metrics_service.is_enabled() else None
+        try:
+            ProcessDocuments._process_queue(run_metrics)
+        finally:
+            if run_metrics:
+                run_metrics.export()
 
-                # 3. Extract and enrich conditions
-                result = extraction_service.extract_and_enrich(local_path)
+    @staticmethod
+    def _process_queue(run_metrics):
+        """Claim and process requests, recording each into `run_metrics` when set."""
+        worker_id = ProcessDocuments._worker_id()
+        max_requests = get_int_setting('EXTRACTION_MAX_REQUESTS_PER_RUN', 0)
+        heartbeat_seconds = max(1, get_int_setting('EXTRACTION_HEARTBEAT_SECONDS', 60))
 
-                # 4. Attach metadata from the extraction_requests row
-                filename = os.path.basename(s3_key)
-                result['project_id'] = req['project_id']
-                result['document_id'] = req['document_id'] or os.path.splitext(filename)[0]
-                result['project_name'] = req['project_name'] or req['project_id']
-                result['project_type'] = req['project_type'] or ''
-                result['display_name'] = req['document_label'] or filename
-                result['document_file_name'] = req['document_file_name'] or filename
-                result['document_type'] = req['document_type'] or result.get('classification', {}).get('document_type', '')
-                result['date_issued'] = req['date_issued']
-                result['act'] = req['act']
+        if run_metrics:
+            try:
+                run_metrics.observe_queue(db_service.get_queue_stats())
+            except Exception as exc:
+                logger.warning('Could not read extraction queue stats: %s', exc)
 
-                # 5. Skip direct loading into database, instead save for human review
-                # loader_service.load_extracted_data(result)
+        outcomes = {'success': 0, 'unsupported': 0, 'failed': 0, 'skipped': 0}
+        claimed = 0
 
-                # 6. Mark as completed and save JSON blob
-                if db_service.get_request_status(request_id) == 'rejected':
-                    logger.info('Skipping save for rejected extraction request %d', request_id)
-                    continue
-
-                db_service.save_extraction_result(request_id, result)
-
-                success += 1
-                logger.info('Successfully processed extraction request %d', request_id)
-
-            except extraction_service.UnsupportedDocumentError as exc:
-                unsupported += 1
-                error_msg = str(exc)
-                logger.info(
-                    'Unsupported extraction request %d: %s',
-                    request_id,
-                    error_msg,
-                )
-                try:
-                    if db_service.get_request_status(request_id) == 'rejected':
-                        logger.info('Skipping unsupported update for rejected extraction request %d', request_id)
-                        continue
-
-                    db_service.mark_unsupported(request_id, error_msg, exc.eligibility)
-                except Exception:
-                    logger.error('Could not update status to unsupported for request %d', request_id)
+        while not max_requests or claimed < max_requests:
+            req = db_service.claim_next_request(worker_id)
+            if not req:
+                break
+            claimed += 1
 
-            except Exception as exc:
-                failed += 1
-                error_msg = str(exc)
-                logger.error('Failed to process extraction request %d: %s', request_id, error_msg, exc_info=True)
-                try:
-                    db_service.mark_failed(request_id, error_msg)
-                except Exception:
-                    logger.error('Could not update status to failed for request %d', request_id)
-
-            finally:
-                if local_path and os.path.exists(local_path):
-                    os.remove(local_path)
+            started = time.monotonic()
+            with _LeaseHeartbeat(req['id'], worker_id, heartbeat_seconds) as lease:
+                outcome = ProcessDocuments._process_request(req, worker_id, run_metrics, lease.lost)
+            outcomes[outcome] += 1
+            if run_metrics:
+                run_metrics.observe_document(outcome, time.monotonic() - started)
+
+        if not claimed:
+            logger.info('No pending extraction requests found.')
+            return
 
         logger.info(
             'ProcessDocuments complete — success: %d, unsupported: %d, failed: %d',
-            success,
-            unsupported,
-            failed,
+            outcomes['success'],
+            outcomes['unsupported'],
+            outcomes['failed'],
         )
+
+    @staticmethod
+    def _checkpoint_for(req: dict, worker_id: str) -> ExtractionCheckpoint:
+        """Resume from the progress a previous worker saved for this request."""
+        request_id = req['id']
+
+        def save(data):
+            if not db_service.save_checkpoint(request_id, worker_id, data):
+                logger.warning('Checkpoint not saved; lost lease on extraction request %d', request_id)
+
+        return ExtractionCheckpoint(
+            req.get('checkpoint_data'),
+            save=save,
+            save_interval_seconds=get_int_setting(
+                'EXTRACTION_CHECKPOINT_INTERVAL_SECONDS', DEFAULT_SAVE_INTERVAL_SECONDS
+            ),
+        )
+
+    @staticmethod
+    def _process_request(req: dict, worker_id: str, run_metrics=None, lease_lost: threading.Event = None) -> str:
+        """Run the pipeline for one claimed request and return its outcome.
+
+        Nothing is written once `lease_lost` is set or the final write finds
+        the lease gone: the request belongs to whichever worker re-claimed it.
+        """
+        request_id = req['id']
+        s3_key = req['s3_url']
+        local_path = None
+
+        def write_final_state(action: str, update, *args, **kwargs) -> bool:
+            """Run a db_service final-state update unless the lease is gone; False if nothing was written."""
+            if (lease_lost is None or not lease_lost.is_set()) and update(request_id, worker_id, *args, **kwargs):
+                return True
+            logger.warning('Lost lease on extraction request %d; not %s', request_id, action)
+            return False
+
+        try:
+            logger.info('Processing extraction request %d — %s', request_id, s3_key)
+
+            # 1. Download PDF from S3 (the claim already marked it as processing)
+            local_path = s3_service.download_file(s3_key)
+
+            # 2. Extract and enrich conditions
+            checkpoint = ProcessDocuments._checkpoint_for(req, worker_id)
+            result = extraction_service.extract_and_enrich(local_path, checkpoint=checkpoint)
+            metrics = result.pop('metrics', None)
+            if run_metrics:
+                run_metrics.observe_extraction(metrics)
+
+            # 3. Attach metadata from the extraction_requests row
+            filename = os.path.basename(s3_key)
+            result['project_id'] = req['project_id']
+            result['document_id'] = req['document_id'] or os.path.splitext(filename)[0]
+            result['project_name'] = req['project_name'] or req['project_id']
+            result['project_type'] = req['project_type'] or ''
+            result['display_name'] = req['document_label'] or filename
+            result['document_file_name'] = req['document_file_name'] or filename
+            result['document_type'] = req['document_type'] or result.get('classification', {}).get('document_type', '')
+            result['date_issued'] = req['date_issued']
+            result['act'] = req['act']
+
+            # 4. Skip direct loading into database, instead save for human review
+            # loader_service.load_extracted_data(result)
+
+            # 5. Mark as completed and save JSON blob
+            if db_service.get_request_status(request_id) == 'rejected':
+                logger.info('Skipping save for rejected extraction request %d', request_id)
+                return 'skipped'
+
+            if not write_final_state('saving the result', db_service.save_extraction_result, result, metrics=metrics):
+                return 'skipped'
+
+            logger.info('Successfully processed extraction request %d', request_id)
+            return 'success'
+
+        except extraction_service.UnsupportedDocumentError as exc:
+            error_msg = str(exc)
+            logger.info(
+                'Unsupported extraction request %d: %s',
+                request_id,
+                error_msg,
+            )
+            try:
+                if db_service.get_request_status(request_id) == 'rejected':
+                    logger.info('Skipping unsupported update for rejected extraction request %d', request_id)
+                    return 'skipped'
+
+                if not write_final_state(
+                    'marking it unsupported', db_service.mark_unsupported, error_msg, exc.eligibility
+                ):
+                    return 'skipped'
+            except Exception:
+                logger.error('Could not update status to unsupported for request %d', request_id)
+            return 'unsupported'
+
+        except Exception as exc:
+            error_msg = str(exc)
+            logger.error('Failed to process extraction request %d: %s', request_id, error_msg, exc_info=True)
+            try:
+                if not write_final_state('marking it failed', db_service.mark_failed, error_msg):
+                    return 'skipped'
+            except Exception:
+                logger.error('Could not update status to failed for request %d', request_id)
+            return 'failed'
+
+        finally:
+            if local_path and os.path.exists(local_path):
+                os.remove(local_path)
@@ -0,0 +1,125 @@
+"""Tests for the asyncio extraction pipeline and the shared LLM step drivers."""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from condition_cron.extraction.document import ParsedDocument
+from condition_cron.extraction.extractor import extract_and_enrich_all
+from condition_cron.extraction.llm_steps import run_steps, run_steps_async
+
+CLASSIFICATION = {
+    "document_type": "bulleted_commitments",
+    "has_numbered_conditions": False,
+    "section_headers": [],
+}
+
+RESPONSES = {
+    "format_conditions": {"conditions": [
+        {"condition_number": 1, "condition_name": "Policies", "condition_text": "Maintain an environmental policy."},
+        {"condition_number": 2, "condition_name": "Wildlife", "condition_text": "Prepare a wildlife management plan."},
+    ]},
+    "enrich_condition": {"clauses": []},
+    "extract_info": {"requires_plan": True, "requires_report": False},
+    "format_info": {"deliverables": [{"deliverable_name": "Wildlife Management Plan"}]},
+}
+
+
+def _completion(kwargs):
+    name = kwargs["tool_choice"]["function"]["name"]
+    return SimpleNamespace(choices=[SimpleNamespace(
+        finish_reason="stop",
+        message=SimpleNamespace(tool_calls=[
+            SimpleNamespace(function=SimpleNamespace(arguments=json.dumps(RESPONSES[name])))
+        ]),
+    )])
+
+
+class _SyncCompletions:
+    def create(self, **kwargs):
+        return _completion(kwargs)
+
+
+class _AsyncCompletions:
+    def __init__(self):
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def create(self, **kwargs):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return _completion(kwargs)
+
+
+def _document():
+    return ParsedDocument("commitments.txt", ["Policies\n- Maintain a policy.\nWildlife\n- Prepare a plan."])
+
+
+def test_async_pipeline_matches_thread_pipeline(monkeypatch):
+    """Both pipelines run the same steps, so they must produce the same result."""
+    sync_client = SimpleNamespace(chat=SimpleNamespace(completions=_SyncCompletions()))
+    for module in ("extractor", "management_plans", "reports"):
+        monkeypatch.setattr(f"condition_cron.extraction.{module}.get_openai_client", lambda: sync_client)
+    expected = extract_and_enrich_all(_document(), CLASSIFICATION)
+
+    completions = _AsyncCompletions()
+
+    @asynccontextmanager
+    async def fake_async_client(max_in_flight):  # noqa: ARG001
+        yield SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    monkeypatch.setattr("condition_cron.extraction.extractor.async_openai_client", fake_async_client)
+    monkeypatch.setenv("EXTRACTION_ASYNC_ENABLED", "true")
+    result = extract_and_enrich_all(_document(), CLASSIFICATION)
+
+    assert result == expected
+    assert result["conditions"][1]["deliverables"] == [{"deliverable_name": "Wildlife Management Plan"}]
+    # Stages 2-4 for both conditions were in flight together.
+    assert completions.peak_in_flight > 2
+
+
+def _retrying_steps():
+    for attempt in range(3):
+        try:
+            completion = yield {"attempt": attempt}
+            return completion
+        except RuntimeError:
+            continue
+    return None
+
+
+def test_step_drivers_throw_request_errors_into_steps():
+    """A failed request surfaces inside the steps, so their retry logic runs."""
+    attempts = []
+
+    def create(**kwargs):
+        attempts.append(kwargs["attempt"])
+        if kwargs["attempt"] == 0:
+            raise RuntimeError("transient")
+        return "ok"
+
+    async def create_async(**kwargs):
+        return create(**kwargs)
+
+    assert run_steps(SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))),
+                     _retrying_steps()) == "ok"
+    async_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create_async)))
+    assert asyncio.run(run_steps_async(async_client, _retrying_steps())) == "ok"
+    assert attempts == [0, 1, 0, 1]
+
+
+def test_step_drivers_propagate_unhandled_errors():
+    """Errors the steps do not catch reach the caller unchanged."""
+    def steps():
+        yield {}
+
+    def create(**kwargs):  # noqa: ARG001
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        run_steps(SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))), steps())
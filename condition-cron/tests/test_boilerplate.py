@@ -0,0 +1,46 @@
+"""Tests for running header/footer removal."""
+
+from condition_cron.extraction.boilerplate import strip_boilerplate
+
+
+def _page(number, body):
+    return f"Environmental Assessment Certificate #E21-01\nSchedule B  -  Table of Conditions  Page {number}\n{body}\n\n{number}"
+
+
+def test_repeated_headers_and_page_numbers_are_removed_after_first_page():
+    pages = [_page(n, f"{n}. The Holder must   monitor site {n}.") for n in range(1, 5)]
+
+    cleaned, report = strip_boilerplate(pages)
+
+    assert cleaned[0] == (
+        "Environmental Assessment Certificate #E21-01\nSchedule B - Table of Conditions Page 1\n"
+        "1. The Holder must monitor site 1.\n\n1"
+    )
+    assert cleaned[2] == "3. The Holder must monitor site 3."
+    assert report.lines_removed == 9
+    assert report.tokens_saved > 0
+
+
+def test_body_text_and_short_documents_are_kept():
+    """Lines repeated in the body, or on too few pages, are not boilerplate."""
+    pages = ["Header\nThe Holder must comply.\nline\nline\nline\nline\nThe Holder must comply.\nFooter"] * 2
+
+    cleaned, report = strip_boilerplate(pages)
+
+    assert cleaned == pages
+    assert report.lines_removed == 0
+
+
+def test_condition_headings_at_the_top_of_each_page_are_kept():
+    """Headings that differ only by number are not a running header."""
+    pages = [
+        f"Condition {n}\nSchedule B {n}\nThe Holder must monitor site {n}.\nPage {n} of 4"
+        for n in range(1, 5)
+    ]
+
+    cleaned, report = strip_boilerplate(pages)
+
+    assert [page.splitlines()[0] for page in cleaned] == [f"Condition {n}" for n in range(1, 5)]
+    assert all(f"Schedule B {n}" in cleaned[n - 1] for n in range(1, 5))
+    assert cleaned[1] == "Condition 2\nSchedule B 2\nThe Holder must monitor site 2."
+    assert report.lines_removed == 3
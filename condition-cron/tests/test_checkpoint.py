@@ -0,0 +1,54 @@
+"""Tests for resumable extraction checkpoints."""
+
+from condition_cron.extraction.checkpoint import CHECKPOINT_VERSION, ExtractionCheckpoint
+from condition_cron.extraction.concurrency import map_conditions
+
+
+def test_resumed_checkpoint_skips_completed_conditions():
+    """Conditions recorded by an earlier worker are not processed again."""
+    saved = []
+    first = ExtractionCheckpoint(save=saved.append, save_interval_seconds=3600)
+    map_conditions("enrichment", lambda value: value * 10, [1, 2], list, checkpoint=first)
+
+    calls = []
+    resumed = ExtractionCheckpoint(saved[-1])
+    results = map_conditions(
+        "enrichment",
+        lambda value: calls.append(value) or value * 10,
+        [1, 2, 3],
+        list,
+        checkpoint=resumed,
+    )
+
+    assert results == [10, 20, 30]
+    assert calls == [3]
+
+
+def test_checkpoint_throttles_saves_until_flush():
+    """Units are batched between saves; flush persists whatever is pending."""
+    saved = []
+    checkpoint = ExtractionCheckpoint(save=saved.append, save_interval_seconds=3600)
+
+    checkpoint.put("page_chunks", "pages 1-3", [{"condition_number": 1}])
+    checkpoint.put("page_chunks", "pages 4-6", [])
+    assert saved == []
+
+    checkpoint.flush()
+    checkpoint.flush()
+    assert len(saved) == 1
+    assert saved[0]["stages"]["page_chunks"]["pages 4-6"] == []
+
+
+def test_cached_stage_is_computed_once():
+    """Whole-stage results are saved right away and reused on resume."""
+    saved = []
+    ExtractionCheckpoint(save=saved.append).cached("classification", lambda: {"document_type": "table_format"})
+
+    resumed = ExtractionCheckpoint(saved[-1])
+    assert resumed.cached("classification", lambda: {"document_type": "other"}) == {"document_type": "table_format"}
+
+
+def test_checkpoint_from_other_version_is_ignored():
+    """Progress saved in an older layout is discarded rather than misread."""
+    stale = {"version": CHECKPOINT_VERSION + 1, "stages": {"conditions": {"result": {"conditions": []}}}}
+    assert ExtractionCheckpoint(stale).get("conditions", "result") is None
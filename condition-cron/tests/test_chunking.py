@@ -0,0 +1,49 @@
+"""Tests for token-aware page chunking."""
+
+from condition_cron.extraction.chunking import (
+    estimate_tokens,
+    fixed_page_chunks,
+    get_chunk_token_budget,
+    pack_page_chunks,
+)
+
+
+def test_table_text_counts_denser_than_prose():
+    """Short cells and reference numbers cost more tokens per character."""
+    prose = "The Holder must develop a wildlife management plan in consultation with agencies. " * 4
+    table = "| A1 | 3.2 | C-12 | 45 | Y | N | 7.1 | B4 | 2024-05 |\n" * 6
+    assert len(table) < len(prose) * 1.1
+    assert estimate_tokens(table) > estimate_tokens(prose)
+
+
+def test_sparse_pages_are_merged_into_one_chunk():
+    """Short pages share a request instead of one request per few pages."""
+    pages = ["Condition text on a short page."] * 10
+    chunks = pack_page_chunks(pages, token_budget=1000)
+
+    assert [(chunk.start_page, chunk.end_page) for chunk in chunks] == [(1, 10)]
+    assert chunks[0].label == "pages 1-10"
+
+
+def test_dense_page_is_split_before_it_is_sent():
+    """A page over budget on its own is split at lines into labelled parts."""
+    dense = "".join(f"| R{row} | Monitor water quality at station {row} monthly |\n" for row in range(200))
+    pages = ["Intro page.", dense, "Closing page."]
+    budget = 400
+    chunks = pack_page_chunks(pages, token_budget=budget)
+
+    dense_parts = [chunk for chunk in chunks if chunk.start_page == 2]
+    assert len(dense_parts) > 1
+    assert dense_parts[0].label == f"pages 2-2 (part 1 of {len(dense_parts)})"
+    assert all(estimate_tokens(part.text) <= budget for part in dense_parts)
+    assert "".join(part.text for part in dense_parts) == dense + "\n"
+    assert (chunks[0].start_page, chunks[-1].end_page) == (1, 3)
+
+
+def test_zero_budget_disables_packing(monkeypatch):
+    """Setting a budget to 0 returns to fixed pages-per-chunk."""
+    monkeypatch.setenv("EXTRACTION_CHUNK_OUTPUT_TOKENS", "0")
+    assert get_chunk_token_budget() == 0
+
+    chunks = fixed_page_chunks(["a", "b", "c", "d"], pages_per_chunk=3)
+    assert [(chunk.start_page, chunk.end_page, chunk.text) for chunk in chunks] == [(1, 3, "a\nb\nc\n"), (4, 4, "d\n")]
@@ -0,0 +1,80 @@
+"""Tests for the local clause parser."""
+
+from types import SimpleNamespace
+
+from condition_cron.extraction.clauses import CONFIDENT, parse_clauses
+from condition_cron.extraction.extractor import enrich_all_conditions
+
+
+def test_nested_lettered_and_roman_items():
+    """Wrapped lines join their item and roman numerals nest under letters."""
+    parsed = parse_clauses(
+        "The Holder must develop a plan that includes:\n"
+        "a) a description of\nmonitoring;\n"
+        "b) mitigation measures:\n(i) for fish;\n(ii) for birds; and\n"
+        "c) reporting."
+    )
+
+    assert parsed.confidence == CONFIDENT
+    assert parsed.clauses == [{
+        "clause_identifier": "",
+        "clause_text": "The Holder must develop a plan that includes:",
+        "subconditions": [
+            {"subcondition_identifier": "a)", "subcondition_text": "a description of monitoring;", "subconditions": []},
+            {
+                "subcondition_identifier": "b)",
+                "subcondition_text": "mitigation measures:",
+                "subconditions": [
+                    {"subcondition_identifier": "(i)", "subcondition_text": "for fish;"},
+                    {"subcondition_identifier": "(ii)", "subcondition_text": "for birds; and"},
+                ],
+            },
+            {"subcondition_identifier": "c)", "subcondition_text": "reporting.", "subconditions": []},
+        ],
+    }]
+
+
+def test_letter_i_continues_a_lettered_list():
+    parsed = parse_clauses("\n".join(f"({letter}) item;" for letter in "abcdefghi"))
+    assert [clause["clause_identifier"] for clause in parsed.clauses][-2:] == ["(h)", "(i)"]
+
+
+def test_plain_condition_has_no_clauses():
+    parsed = parse_clauses("The Holder must retain a Qualified Professional.")
+    assert (parsed.clauses, parsed.confidence) == ([], 1.0)
+
+
+def test_unclear_structure_is_left_to_the_model():
+    for text in (
+        "The Holder must: (a) monitor; and (b) report.",
+        "The plan must include:\na) x;\nb) y.\nThe Holder must implement the plan.",
+        "a) first\nc) third",
+        "The Holder must meet the requirements of section\n3.1 of the Environmental Management Act.",
+        "The Holder must submit the plan within\n1. year of the start of construction.",
+        "The plan must include:\na) air quality\nb) water quality.",
+    ):
+        assert parse_clauses(text).confidence < CONFIDENT
+
+
+def test_only_unclear_conditions_are_sent_for_enrichment(monkeypatch):
+    monkeypatch.setenv("EXTRACTION_LOCAL_CLAUSES", "true")
+    sent = []
+
+    def create(**kwargs):
+        sent.append(kwargs["messages"][0]["content"])
+        arguments = '{"clauses": []}'
+        return SimpleNamespace(choices=[SimpleNamespace(
+            message=SimpleNamespace(tool_calls=[SimpleNamespace(function=SimpleNamespace(arguments=arguments))]),
+        )])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr("condition_cron.extraction.extractor.get_openai_client", lambda: client)
+    conditions = {"conditions": [
+        {"condition_number": 1, "condition_text": "The Holder must comply."},
+        {"condition_number": 2, "condition_text": "The Holder must: (a) monitor; and (b) report."},
+    ]}
+
+    enrich_all_conditions(conditions)
+
+    assert len(sent) == 1 and "(a) monitor" in sent[0]
+    assert conditions["conditions"][0]["clauses"] == []
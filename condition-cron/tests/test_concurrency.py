@@ -0,0 +1,97 @@
+"""Tests for the per-condition concurrency helpers."""
+
+import threading
+import time
+from types import SimpleNamespace
+
+from condition_cron.extraction.concurrency import map_conditions, run_chunks
+from condition_cron.extraction.llm_steps import Parallel
+from condition_cron.extraction.rate_limit import RateLimiter
+
+
+def test_map_conditions_preserves_input_order():
+    """Results line up with their conditions even when later ones finish first."""
+    conditions = [{"condition_number": n} for n in range(1, 7)]
+
+    def slow_for_early_conditions(condition):
+        time.sleep(0.01 * (7 - condition["condition_number"]))
+        return condition["condition_number"] * 10
+
+    results = map_conditions("test", slow_for_early_conditions, conditions, lambda: None, max_workers=6)
+
+    assert results == [10, 20, 30, 40, 50, 60]
+
+
+def test_map_conditions_isolates_failures():
+    """One failing condition falls back to the default without affecting the others."""
+    conditions = [{"condition_number": n} for n in range(1, 4)]
+
+    def fail_on_second(condition):
+        if condition["condition_number"] == 2:
+            raise RuntimeError("model error")
+        return ["ok"]
+
+    results = map_conditions("test", fail_on_second, conditions, list, max_workers=3)
+
+    assert results == [["ok"], [], ["ok"]]
+
+
+def test_map_conditions_bounds_concurrency():
+    """No more than max_workers conditions run at the same time."""
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    def track(condition):  # noqa: ARG001
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.01)
+        with lock:
+            state["active"] -= 1
+
+    map_conditions("test", track, [{} for _ in range(12)], lambda: None, max_workers=3)
+
+    assert state["peak"] <= 3
+
+
+def test_rate_limiter_spaces_requests():
+    """A 600 rpm limit spaces request starts roughly 0.1s apart."""
+    limiter = RateLimiter(600)
+    started = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+
+    assert time.monotonic() - started >= 0.19
+
+
+def _split_steps(items):
+    """Steps that split any range longer than one item, like a length cut-off does."""
+    if len(items) > 1:
+        mid = len(items) // 2
+        first, second = yield Parallel([_split_steps(items[:mid]), _split_steps(items[mid:])])
+        return first + second
+    completion = yield {"item": items[0]}
+    return [completion]
+
+
+def test_run_chunks_schedules_splits_on_the_same_bounded_pool():
+    """Nested splits share the pool without deadlocking, and results keep chunk order."""
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    def create(**kwargs):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.02)
+        with lock:
+            state["active"] -= 1
+        return kwargs["item"] * 10
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    chunks = [_split_steps(list(range(start, start + 4))) for start in (0, 4, 8)]
+
+    results = run_chunks("test", client, chunks, max_workers=2)
+
+    assert results == [[0, 10, 20, 30], [40, 50, 60, 70], [80, 90, 100, 110]]
+    assert state["peak"] == 2
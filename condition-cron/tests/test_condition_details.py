@@ -0,0 +1,87 @@
+"""Tests for combined per-condition enrichment."""
+
+import json
+from types import SimpleNamespace
+
+from condition_cron.extraction.extractor import enrich_condition_details
+
+DELIVERABLE = {"deliverable_name": "Wildlife Management Plan"}
+REPORT = {"report_title": "Annual Monitoring Report"}
+
+
+class _FakeCompletions:
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+
+    def create(self, **kwargs):
+        name = kwargs["tool_choice"]["function"]["name"]
+        self.calls.append(name)
+        arguments = self.responses[name]
+        if isinstance(arguments, list):
+            arguments = arguments.pop(0)
+        return SimpleNamespace(choices=[SimpleNamespace(
+            finish_reason="stop",
+            message=SimpleNamespace(tool_calls=[
+                SimpleNamespace(function=SimpleNamespace(arguments=json.dumps(arguments)))
+            ]),
+        )])
+
+
+def _use_client(monkeypatch, completions):
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    for module in ("extractor", "management_plans", "reports"):
+        monkeypatch.setattr(f"condition_cron.extraction.{module}.get_openai_client", lambda: client)
+
+
+def _conditions():
+    return {"conditions": [{
+        "condition_number": 1,
+        "condition_name": "Wildlife",
+        "condition_text": "The Holder must prepare a wildlife management plan and report annually.",
+    }]}
+
+
+def test_combined_call_fills_every_stage(monkeypatch):
+    """One valid combined response replaces the five per-stage calls."""
+    completions = _FakeCompletions({"extract_condition_details": {
+        "clauses": [],
+        "requires_plan": True,
+        "deliverables": [DELIVERABLE],
+        "requires_report": False,
+        "reports": [REPORT],
+    }})
+    _use_client(monkeypatch, completions)
+
+    condition = enrich_condition_details(_conditions())["conditions"][0]
+
+    assert completions.calls == ["extract_condition_details"]
+    assert condition["deliverables"] == [DELIVERABLE]
+    # Details the model attached despite answering "no" are dropped.
+    assert condition["report_submissions"] == []
+    assert condition["clauses"] == []
+
+
+def test_invalid_combined_output_falls_back_to_stage_calls(monkeypatch):
+    """A "requires a plan" answer without any plan details is retried per stage."""
+    completions = _FakeCompletions({
+        "extract_condition_details": {
+            "clauses": [],
+            "requires_plan": True,
+            "deliverables": [],
+            "requires_report": False,
+            "reports": [],
+        },
+        "enrich_condition": {"clauses": [{"clause_identifier": "", "clause_text": "The Holder must"}]},
+        "extract_info": [{"requires_plan": True}, {"requires_report": True}],
+        "format_info": [{"deliverables": [DELIVERABLE]}, {"reports": [REPORT]}],
+    })
+    _use_client(monkeypatch, completions)
+
+    condition = enrich_condition_details(_conditions())["conditions"][0]
+
+    assert completions.calls[0] == "extract_condition_details"
+    assert len(completions.calls) == 6
+    assert condition["deliverables"] == [DELIVERABLE]
+    assert condition["report_submissions"] == [REPORT]
+    assert condition["clauses"][0]["clause_text"] == "The Holder must"
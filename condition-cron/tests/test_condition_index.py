@@ -0,0 +1,87 @@
+"""Tests for the local numbered-condition boundary index."""
+
+from condition_cron.extraction.condition_index import build_condition_index, text_for_range
+
+CONTENTS = "Table of Contents\n1. Definitions\n2. Monitoring\n3. Reporting\n\n"
+CONDITIONS = (
+    "1. Definitions\nIn this certificate the Holder means the certificate holder.\n"
+    "2. Monitoring\nThe Holder must retain an environmental monitor:\n"
+    "1) during construction; and\n"
+    "2) during operations.\n"
+    "3. Reporting\nThe Holder must report non-compliance within 30 days.\n"
+    "30 days after that the Holder must file a summary.\n"
+)
+
+
+def test_index_skips_table_of_contents():
+    """The contents page has the same numbering but far less text per entry."""
+    text = CONTENTS + CONDITIONS
+    index = build_condition_index(text, 3)
+
+    assert sorted(index) == [1, 2, 3]
+    assert text[index[1][0]:].startswith("1. Definitions\nIn this certificate")
+    assert text[index[2][0]:index[2][1]].startswith("2. Monitoring")
+    assert "2) during operations." in text[index[2][0]:index[2][1]]
+    assert text[index[3][0]:index[3][1]].endswith("file a summary.\n")
+
+
+def test_index_prefers_explicit_condition_headings():
+    """'Condition N' headings win over nested numbered lists."""
+    text = (
+        "Condition 1 Environmental Monitor\n1. The Holder must retain a monitor.\n"
+        "Condition 2 Reporting\n1. The Holder must report annually.\n"
+    )
+    index = build_condition_index(text, 2)
+
+    assert text[index[2][0]:].startswith("Condition 2 Reporting")
+
+
+def test_text_for_range_falls_back_when_conditions_are_missing():
+    """A range with any unlocated condition returns None so callers send the full text."""
+    index = build_condition_index(CONDITIONS, 5)
+
+    assert text_for_range(CONDITIONS, index, 1, 3, margin=0) == CONDITIONS
+    assert text_for_range(CONDITIONS, index, 3, 5) is None
+    assert build_condition_index("No numbered conditions here.", 3) == {}
+
+
+def test_index_ignores_numbered_list_inside_a_condition():
+    """A sub-list in condition 1 is not taken for conditions 2 and 3."""
+    text = (
+        "1. Environmental Management Plan\nThe Holder must prepare a plan that includes:\n"
+        "1. baseline surveys of the project area;\n"
+        "2. mitigation measures for each effect;\n"
+        "3. monitoring of the mitigation measures.\n"
+        "2. Reporting\nThe Holder must report non-compliance within 30 days.\n"
+        "3. Decommissioning\nThe Holder must submit a decommissioning plan.\n"
+    )
+    index = build_condition_index(text, 3)
+
+    assert text[index[2][0]:].startswith("2. Reporting")
+    assert text[index[3][0]:].startswith("3. Decommissioning")
+    assert "3. monitoring" in text[index[1][0]:index[1][1]]
+
+
+def test_index_with_ambiguous_anchors_falls_back_to_full_text():
+    """Heading-like list items that could start condition 2 leave nothing trusted to index."""
+    text = (
+        "1. Environmental Management Plan\nThe Holder must prepare a plan with these parts:\n"
+        "1. Baseline Surveys\nSurveys of the project area before construction.\n"
+        "2. Mitigation Measures\nMeasures for each effect identified.\n"
+        "2. Reporting\nThe Holder must report non-compliance within 30 days.\n"
+    )
+
+    assert build_condition_index(text, 2) == {}
+
+
+def test_index_with_one_far_shorter_condition_falls_back_to_full_text():
+    """A span far shorter than the median one means the anchors are not trusted."""
+    body = "The Holder must carry out the work described in this condition. " * 5
+    text = (
+        f"1. Monitoring\n{body}\n"
+        "2. Reporting Schedule\nSee\n"
+        f"3. Decommissioning\n{body}\n"
+        f"4. Closure\n{body}\n"
+    )
+
+    assert build_condition_index(text, 4) == {}
@@ -5,7 +5,13 @@ from datetime import date, datetime
 import pytest
 from flask import Flask
 
-from condition_cron.services.db_service import _json_default, get_pending_requests
+from condition_cron.services.db_service import (
+    _json_default,
+    claim_next_request,
+    heartbeat,
+    save_checkpoint,
+    save_extraction_result,
+)
 
 
 def test_json_default_serializes_date_values():
@@ -21,6 +27,15 @@ def test_json_default_rejects_unknown_values():
 
 
 class _FakeConnection:
+    def __init__(self):
+        self.commits = 0
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        return None
+
     def close(self):
         return None
 
@@ -34,6 +49,7 @@ class _FakeCursor:
         ("document_label",),
         ("s3_url",),
         ("status",),
+        ("checkpoint_data",),
         ("project_name",),
         ("project_type",),
         ("date_issued",),
@@ -42,11 +58,13 @@ class _FakeCursor:
         ("document_type",),
     ]
 
-    def __init__(self, fetchone_results):
+    def __init__(self, fetchone_results, rowcount=0):
         self._fetchone_results = iter(fetchone_results)
+        self.rowcount = rowcount
+        self.queries = []
 
     def execute(self, query, params=None):
-        return None
+        self.queries.append((query, params))
 
     def fetchone(self):
         return next(self._fetchone_results, None)
@@ -55,16 +73,90 @@ class _FakeCursor:
         return None
 
 
-def test_get_pending_requests_blocks_new_work_when_processing_is_active(monkeypatch):
-    """A fresh processing request should stop the cron from claiming new work."""
+def _app() -> Flask:
     app = Flask(__name__)
     app.config["EXTRACTION_PROCESSING_STALE_AFTER_MINUTES"] = 120
-    cursor = _FakeCursor([(1,)])
+    app.config["EXTRACTION_LEASE_MINUTES"] = 10
+    return app
+
+
+def test_claim_next_request_returns_none_when_queue_is_empty(monkeypatch):
+    """Nothing claimable (or everything locked by other workers) yields no work."""
+    connection = _FakeConnection()
+    cursor = _FakeCursor([None])
+
+    monkeypatch.setattr(
+        "condition_cron.services.db_service._get_connection",
+        lambda: (connection, cursor),
+    )
+
+    with _app().app_context():
+        assert claim_next_request("worker-1") is None
+
+    assert "FOR UPDATE SKIP LOCKED" in cursor.queries[0][0]
+    assert connection.commits == 1
+
+
+def test_claim_next_request_leases_row_to_worker(monkeypatch):
+    """The claimed row is returned with the worker recorded as lease owner."""
+    row = (7, "project-1", "document-1", 1, "Certificate", "key.pdf", "processing", None,
+           "Project 1", "Mines", None, None, "key.pdf", "Certificate")
+    connection = _FakeConnection()
+    cursor = _FakeCursor([(7,), row])
+
+    monkeypatch.setattr(
+        "condition_cron.services.db_service._get_connection",
+        lambda: (connection, cursor),
+    )
+
+    with _app().app_context():
+        claimed = claim_next_request("worker-1")
+
+    assert claimed["id"] == 7
+    assert claimed["status"] == "processing"
+    assert cursor.queries[0][1] == (120, "worker-1", 10)
+    assert cursor.queries[1][1] == (7,)
+
+
+def test_heartbeat_reports_lost_lease(monkeypatch):
+    """A heartbeat that matches no row means another state change won."""
+    cursor = _FakeCursor([], rowcount=0)
+
+    monkeypatch.setattr(
+        "condition_cron.services.db_service._get_connection",
+        lambda: (_FakeConnection(), cursor),
+    )
+
+    with _app().app_context():
+        assert heartbeat(7, "worker-1") is False
+
+
+def test_save_checkpoint_only_writes_while_lease_is_held(monkeypatch):
+    """A worker that lost its lease must not overwrite the new owner's progress."""
+    cursor = _FakeCursor([], rowcount=0)
+
+    monkeypatch.setattr(
+        "condition_cron.services.db_service._get_connection",
+        lambda: (_FakeConnection(), cursor),
+    )
+
+    with _app().app_context():
+        assert save_checkpoint(7, "worker-1", {"version": 1, "stages": {}}) is False
+    assert cursor.queries[0][1][1:] == (7, "worker-1")
+
+
+def test_save_extraction_result_only_writes_while_lease_is_held(monkeypatch):
+    """A worker whose lease expired must not overwrite the outcome of the worker that re-claimed it."""
+    cursor = _FakeCursor([], rowcount=0)
 
     monkeypatch.setattr(
         "condition_cron.services.db_service._get_connection",
         lambda: (_FakeConnection(), cursor),
     )
 
-    with app.app_context():
-        assert get_pending_requests() == []
+    with _app().app_context():
+        assert save_extraction_result(7, "worker-1", {"conditions": []}) is False
+    query, params = cursor.queries[0]
+    assert "AND status = 'processing'" in query
+    assert "AND lease_owner = %s" in query
+    assert params[-2:] == (7, "worker-1")
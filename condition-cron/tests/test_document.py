@@ -0,0 +1,38 @@
+"""Tests for the shared parsed document model."""
+
+import pytest
+
+from condition_cron.extraction.document import ParsedDocument, ensure_document, load_document
+
+
+def test_page_range_text_matches_full_text_layout():
+    """Page ranges use the same newline-per-page layout as the full text."""
+    document = ParsedDocument(file_path="certificate.pdf", pages=["Page one", "", "Page three"])
+
+    assert document.page_count == 3
+    assert document.text == "Page one\nPage three\n"
+    assert document.page_range_text(1, 2) == "Page one\n"
+    assert document.page_range_text(2, 3) == "Page three\n"
+    assert document.page_offsets == [0, 9, 9]
+
+
+def test_load_document_reads_text_files_as_one_page(tmp_path):
+    """TXT sources load as a single page so page-based stages treat them uniformly."""
+    source = tmp_path / "conditions.txt"
+    source.write_text("1. The Holder must comply.", encoding="utf-8")
+
+    document = load_document(str(source))
+
+    assert document.page_count == 1
+    assert document.is_pdf is False
+    assert document.tables(1) == []
+    assert ensure_document(document) is document
+
+
+def test_load_document_rejects_unsupported_types(tmp_path):
+    """Only PDF and TXT sources are supported."""
+    source = tmp_path / "conditions.docx"
+    source.write_bytes(b"")
+
+    with pytest.raises(ValueError):
+        load_document(str(source))
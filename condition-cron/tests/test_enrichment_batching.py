@@ -0,0 +1,63 @@
+"""Tests for batched clause enrichment."""
+
+import json
+from types import SimpleNamespace
+
+from condition_cron.extraction.extractor import enrich_all_conditions
+
+CLAUSES = [{"clause_identifier": "", "clause_text": "The Holder must", "subconditions": []}]
+
+
+def _completion(arguments):
+    return SimpleNamespace(choices=[SimpleNamespace(
+        finish_reason="stop",
+        message=SimpleNamespace(tool_calls=[SimpleNamespace(function=SimpleNamespace(arguments=json.dumps(arguments)))]),
+    )])
+
+
+def _use_client(monkeypatch, batch_answer):
+    calls = []
+
+    def create(**kwargs):
+        name = kwargs["tool_choice"]["function"]["name"]
+        calls.append(name)
+        if name == "enrich_conditions":
+            return _completion(batch_answer)
+        return _completion({"clauses": CLAUSES})
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr("condition_cron.extraction.extractor.get_openai_client", lambda: client)
+    monkeypatch.setenv("EXTRACTION_ENRICHMENT_BATCH_TOKENS", "1000")
+    return calls
+
+
+def _conditions(count):
+    return {"conditions": [
+        {"condition_number": n, "condition_name": f"Name {n}", "condition_text": f"The Holder must do {n}."}
+        for n in range(1, count + 1)
+    ]}
+
+
+def test_short_conditions_share_one_request(monkeypatch):
+    calls = _use_client(monkeypatch, {"conditions": [
+        {"condition_key": "2", "clauses": []},
+        {"condition_key": "1", "clauses": CLAUSES},
+        {"condition_key": "3", "clauses": []},
+    ]})
+
+    result = enrich_all_conditions(_conditions(3))
+
+    assert calls == ["enrich_conditions"]
+    assert [condition["clauses"] for condition in result["conditions"]] == [CLAUSES, [], []]
+
+
+def test_conditions_missing_from_the_batch_answer_are_enriched_alone(monkeypatch):
+    calls = _use_client(monkeypatch, {"conditions": [
+        {"condition_key": "1", "clauses": []},
+        {"condition_key": "2", "clauses": "not a list"},
+    ]})
+
+    result = enrich_all_conditions(_conditions(3))
+
+    assert calls == ["enrich_conditions", "enrich_condition", "enrich_condition"]
+    assert [condition["clauses"] for condition in result["conditions"]] == [[], CLAUSES, CLAUSES]
@@ -33,6 +33,7 @@ def test_extract_and_enrich_blocks_high_confidence_unsupported(monkeypatch, tmp_
     def fail_if_called(*args, **kwargs):  # noqa: ARG001
         raise AssertionError("Extraction should not run for unsupported documents")
 
+    # Classification may start alongside eligibility; its outcome is discarded.
     monkeypatch.setattr("condition_cron.extraction.extractor.classify_and_count", fail_if_called)
     monkeypatch.setattr("condition_cron.extraction.extractor.extract_and_enrich_all", fail_if_called)
 
@@ -42,6 +43,31 @@ def test_extract_and_enrich_blocks_high_confidence_unsupported(monkeypatch, tmp_
     assert exc.value.eligibility["confidence"] == 0.9
 
 
+def test_sequential_stages_skip_classification_for_unsupported(monkeypatch, tmp_path):
+    """With concurrent stages off, nothing after eligibility starts."""
+    document = tmp_path / "rental.txt"
+    document.write_text("Rental application tenant landlord monthly rent.", encoding="utf-8")
+    monkeypatch.setenv("EXTRACTION_CONCURRENT_STAGES", "false")
+    monkeypatch.setattr(
+        "condition_cron.extraction.document_classifier.classify_document_eligibility",
+        lambda file_text: _unsupported_eligibility(0.9),
+    )
+    monkeypatch.setattr(
+        "condition_cron.services.extraction_service._get_unsupported_confidence_threshold",
+        lambda: 0.75,
+    )
+    calls = []
+    monkeypatch.setattr(
+        "condition_cron.extraction.extractor.classify_and_count",
+        lambda path, file_text=None: calls.append(path),
+    )
+
+    with pytest.raises(extraction_service.UnsupportedDocumentError):
+        extraction_service.extract_and_enrich(str(document))
+
+    assert calls == []
+
+
 def test_extract_and_enrich_allows_low_confidence_unsupported(monkeypatch, tmp_path):
     """Uncertain documents should continue through the existing extraction path."""
     document = tmp_path / "maybe-conditions.txt"
@@ -68,10 +94,11 @@ def test_extract_and_enrich_allows_low_confidence_unsupported(monkeypatch, tmp_p
     )
     monkeypatch.setattr(
         "condition_cron.extraction.extractor.extract_and_enrich_all",
-        lambda path, extracted_classification: {"conditions": []},
+        lambda path, extracted_classification, checkpoint=None: {"conditions": []},
     )
 
     result = extraction_service.extract_and_enrich(str(document))
 
     assert result["classification"] == classification
     assert result["eligibility"]["confidence"] == 0.5
+    assert set(result["metrics"]["stage_timings"]) == {"eligibility", "classification", "extraction"}
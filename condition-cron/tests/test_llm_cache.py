@@ -0,0 +1,159 @@
+"""Tests for the on-disk LLM completion cache."""
+
+import json
+from types import SimpleNamespace
+
+from openai.types.chat import ChatCompletion
+
+from condition_cron.extraction.client import ExtractorClient
+from condition_cron.extraction.document import ParsedDocument
+from condition_cron.extraction.extractor import _extract_numbered_range
+from condition_cron.extraction.llm_cache import CompletionCache, request_key
+from condition_cron.extraction.rate_limit import RateLimiter
+
+
+def _completion(arguments: str = '{"conditions": []}', finish_reason: str = "stop") -> ChatCompletion:
+    return ChatCompletion.model_validate({
+        "id": "chatcmpl-1",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4o-2024-05-13",
+        "choices": [{
+            "index": 0,
+            "finish_reason": finish_reason,
+            "message": {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [{
+                    "id": "call-1",
+                    "type": "function",
+                    "function": {"name": "extract", "arguments": arguments},
+                }],
+            },
+        }],
+    })
+
+
+class _CountingCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **kwargs):  # noqa: ARG002
+        self.calls += 1
+        return _completion()
+
+
+def _client(cache, completions):
+    return ExtractorClient(
+        SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+        RateLimiter(0),
+        cache,
+    )
+
+
+def test_request_key_ignores_dict_ordering():
+    """The key is content-addressed, not order-sensitive."""
+    first = {"model": "m", "temperature": 0.0, "messages": [{"role": "user", "content": "x"}]}
+    second = {"messages": [{"content": "x", "role": "user"}], "temperature": 0.0, "model": "m"}
+
+    assert request_key(first) == request_key(second)
+
+
+def test_client_replays_cached_completion(tmp_path):
+    """A deterministic request answered in an earlier run is served from the cache."""
+    cache = CompletionCache(str(tmp_path / "cache.sqlite3"), 1024 * 1024)
+    completions = _CountingCompletions()
+    request = {"model": "gpt-4o-2024-05-13", "temperature": 0.0, "messages": [{"role": "user", "content": "x"}]}
+
+    first = _client(cache, completions).chat.completions.create(**request)
+    second = _client(cache, completions).chat.completions.create(**request)
+
+    assert completions.calls == 1
+    assert second.choices[0].message.tool_calls[0].function.arguments == (
+        first.choices[0].message.tool_calls[0].function.arguments
+    )
+    assert cache.stats.snapshot()["hits"] == 1
+
+
+def test_client_bypass_skips_reads_but_refreshes(tmp_path, monkeypatch):
+    """The bypass flag always calls the model and still stores the response."""
+    monkeypatch.setenv("EXTRACTION_LLM_CACHE_BYPASS", "true")
+    cache = CompletionCache(str(tmp_path / "cache.sqlite3"), 1024 * 1024)
+    completions = _CountingCompletions()
+    request = {"model": "m", "temperature": 0.0, "messages": []}
+
+    _client(cache, completions).chat.completions.create(**request)
+    _client(cache, completions).chat.completions.create(**request)
+
+    assert completions.calls == 2
+    assert cache.stats.snapshot()["stores"] == 2
+
+
+def test_identical_request_in_one_run_is_served_from_cache(tmp_path):
+    """Only an explicit bypass_cache resend skips the cache, not a repeat of the same request."""
+    cache = CompletionCache(str(tmp_path / "cache.sqlite3"), 1024 * 1024)
+    completions = _CountingCompletions()
+    client = _client(cache, completions)
+    request = {"model": "m", "temperature": 0.0, "messages": []}
+
+    client.chat.completions.create(**request)
+    client.chat.completions.create(**request)
+    assert completions.calls == 1
+
+    client.chat.completions.create(bypass_cache=True, **request)
+    assert completions.calls == 2
+
+
+def test_truncated_completion_is_not_stored(tmp_path):
+    cache = CompletionCache(str(tmp_path / "cache.sqlite3"), 1024 * 1024)
+    completions = SimpleNamespace(create=lambda **kwargs: _completion(finish_reason="length"))
+    request = {"model": "m", "temperature": 0.0, "messages": []}
+
+    _client(cache, completions).chat.completions.create(**request)
+
+    assert cache.stats.snapshot()["stores"] == 0
+    assert cache.get(request_key(request)) is None
+
+
+def test_retry_after_rejected_answer_reaches_the_model(tmp_path, monkeypatch):
+    """A retry skips the cache and the rejected answer is not replayed in a later run."""
+    document = ParsedDocument("certificate.pdf", ["\n".join(f"Condition text {n}." for n in range(1, 5))])
+    answers = [[9], [1, 2, 3, 4], [9], [1, 2, 3, 4]]
+    upstream = []
+
+    def create(**kwargs):  # noqa: ARG001
+        numbers = answers[len(upstream)]
+        upstream.append(numbers)
+        conditions = [{"condition_number": n, "condition_name": f"C{n}", "condition_text": "Do it."} for n in numbers]
+        return _completion(json.dumps({"conditions": conditions}))
+
+    cache = CompletionCache(str(tmp_path / "cache.sqlite3"), 1024 * 1024)
+    client = _client(cache, SimpleNamespace(create=create))
+    monkeypatch.setattr("condition_cron.extraction.extractor.get_openai_client", lambda: client)
+
+    _, arguments = _extract_numbered_range(document, 1, 4)
+
+    assert len(upstream) == 2
+    assert [c["condition_number"] for c in json.loads(arguments)["conditions"]] == [1, 2, 3, 4]
+
+    # A new run (fresh client) replays only the accepted answer.
+    client = _client(cache, SimpleNamespace(create=create))
+    _, arguments = _extract_numbered_range(document, 1, 4)
+
+    assert len(upstream) == 2
+    assert [c["condition_number"] for c in json.loads(arguments)["conditions"]] == [1, 2, 3, 4]
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """Going over the size limit drops the oldest entries first."""
+    entry_size = len(_completion().model_dump_json())
+    cache = CompletionCache(str(tmp_path / "cache.sqlite3"), entry_size * 5 // 2)
+
+    cache.put("a", "m", _completion())
+    cache.put("b", "m", _completion())
+    cache.get("a")
+    cache.put("c", "m", _completion())
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
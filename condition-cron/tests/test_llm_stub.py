@@ -0,0 +1,59 @@
+"""End-to-end extraction against the benchmark LLM stub, with no network."""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from condition_cron.extraction import client, llm_cache, rate_limit
+from condition_cron.services import extraction_service
+
+# The stub and the synthetic PDF writer live with the benchmarks.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+from llm_stub import StubState, make_server  # noqa: E402
+from synthetic_pdf import write_pdf  # noqa: E402
+
+
+def _clear_caches():
+    client.get_openai_client.cache_clear()
+    rate_limit.get_rate_limiter.cache_clear()
+    llm_cache.get_completion_cache.cache_clear()
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    state = StubState(latency_ms=0, error_rate=0.0)
+    server = make_server(state)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("EXTRACTOR_API_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setenv("EXTRACTOR_API_KEY", "test")
+    monkeypatch.setenv("EXTRACTION_LLM_CACHE_ENABLED", "false")
+    monkeypatch.setenv("EXTRACTION_LLM_BACKOFF_MAX_SECONDS", "0")
+    _clear_caches()
+    yield state
+    server.shutdown()
+    server.server_close()
+    _clear_caches()
+
+
+def test_pipeline_extracts_numbered_conditions_from_stub(stub, tmp_path):
+    path = write_pdf(str(tmp_path / "conditions.pdf"), 2, lines_per_page=4)
+
+    result = extraction_service.extract_and_enrich(path)
+
+    assert [c["condition_number"] for c in result["conditions"]] == list(range(1, 9))
+    assert result["metrics"]["llm"]["calls"] == stub.counts["requests"]
+    assert result["metrics"]["llm"]["prompt_tokens"] == stub.counts["prompt_tokens"] > 0
+
+
+def test_stub_throttles_and_pipeline_retries(stub, tmp_path):
+    stub.error_rate = 0.2
+    stub.retry_after = 0
+    path = write_pdf(str(tmp_path / "conditions.pdf"), 2, lines_per_page=4)
+
+    result = extraction_service.extract_and_enrich(path)
+
+    assert len(result["conditions"]) == 8
+    assert stub.counts["throttled"] > 0
+    assert result["metrics"]["llm"]["retries"] == stub.counts["throttled"]
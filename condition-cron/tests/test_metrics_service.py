@@ -0,0 +1,61 @@
+"""Tests for the Prometheus run metrics exporter."""
+
+from condition_cron.services import metrics_service
+from condition_cron.tasks.process_documents import ProcessDocuments
+
+EXTRACTION_METRICS = {
+    "stage_timings": {"classification": 4.2, "extraction": 95.0},
+    "calls": [
+        {"stage": "chunks", "latency_seconds": 3.1, "prompt_tokens": 4000, "completion_tokens": 900,
+         "retries": 1, "cached": False},
+        {"stage": "chunks", "latency_seconds": 0.0, "prompt_tokens": 4000, "completion_tokens": 900,
+         "retries": 0, "cached": True},
+    ],
+    "pdf": {"pages": 60, "parse_seconds": 1.5},
+}
+
+
+def test_run_metrics_are_written_to_the_textfile(monkeypatch, tmp_path):
+    textfile = tmp_path / "condition_cron.prom"
+    monkeypatch.setenv("EXTRACTION_METRICS_TEXTFILE", str(textfile))
+
+    run_metrics = metrics_service.RunMetrics()
+    run_metrics.observe_queue({"pending": 7, "oldest_pending_age_seconds": 5400.0})
+    run_metrics.observe_extraction(EXTRACTION_METRICS)
+    run_metrics.observe_document("success", 130.0)
+    run_metrics.export()
+
+    text = textfile.read_text()
+    assert "condition_cron_queue_pending 7.0" in text
+    assert "condition_cron_queue_oldest_pending_age_seconds 5400.0" in text
+    assert 'condition_cron_documents_total{outcome="success"} 1.0' in text
+    assert 'condition_cron_stage_duration_seconds_count{stage="extraction"} 1.0' in text
+    # Cached completions cost nothing and are left out of the LLM histograms.
+    assert 'condition_cron_llm_request_duration_seconds_count{stage="chunks"} 1.0' in text
+    assert 'condition_cron_llm_tokens_sum{kind="prompt",stage="chunks"} 4000.0' in text
+    assert 'condition_cron_llm_retries_total{stage="chunks"} 1.0' in text
+    assert "condition_cron_pdf_pages_per_second_sum 40.0" in text
+
+
+def test_process_exports_metrics_for_an_empty_queue(monkeypatch, tmp_path):
+    textfile = tmp_path / "condition_cron.prom"
+    monkeypatch.setenv("EXTRACTION_METRICS_TEXTFILE", str(textfile))
+    monkeypatch.setattr(
+        "condition_cron.tasks.process_documents.db_service.get_queue_stats",
+        lambda: {"pending": 0, "oldest_pending_age_seconds": 0.0},
+    )
+    monkeypatch.setattr(
+        "condition_cron.tasks.process_documents.db_service.claim_next_request",
+        lambda worker_id: None,
+    )
+
+    ProcessDocuments.process()
+
+    assert "condition_cron_queue_pending 0.0" in textfile.read_text()
+
+
+def test_metrics_are_off_without_a_destination(monkeypatch):
+    monkeypatch.delenv("EXTRACTION_METRICS_TEXTFILE", raising=False)
+    monkeypatch.delenv("EXTRACTION_METRICS_PUSHGATEWAY_URL", raising=False)
+
+    assert not metrics_service.is_enabled()
@@ -0,0 +1,66 @@
+"""Tests for numbered-range extraction and its targeted repair of missing conditions."""
+
+import json
+from types import SimpleNamespace
+
+from condition_cron.extraction.document import ParsedDocument
+from condition_cron.extraction.extractor import NUMBERED_RANGE_FAILURE, _extract_numbered_range
+
+DOCUMENT = ParsedDocument("certificate.pdf", [
+    "\n".join(f"{n}. Condition {n}\nThe Holder must do {n}." for n in range(1, 5)),
+])
+
+
+def _condition(number):
+    return {"condition_number": number, "condition_name": f"Condition {number}", "condition_text": f"Do {number}."}
+
+
+def _completion(numbers):
+    arguments = json.dumps({"conditions": [_condition(n) for n in numbers]})
+    return SimpleNamespace(choices=[SimpleNamespace(
+        finish_reason="stop",
+        message=SimpleNamespace(tool_calls=[SimpleNamespace(function=SimpleNamespace(arguments=arguments))]),
+    )])
+
+
+def _use_client(monkeypatch, answers):
+    prompts = []
+
+    def create(**kwargs):
+        prompts.append(kwargs["messages"][0]["content"])
+        return _completion(answers[len(prompts) - 1])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr("condition_cron.extraction.extractor.get_openai_client", lambda: client)
+    return prompts
+
+
+def test_missing_conditions_are_requested_alone(monkeypatch):
+    """Conditions 1, 2 and 4 are kept and the follow-up asks only for 3."""
+    prompts = _use_client(monkeypatch, [[1, 2, 4, 9], [3]])
+
+    _, arguments = _extract_numbered_range(DOCUMENT, 1, 4)
+
+    assert [c["condition_number"] for c in json.loads(arguments)["conditions"]] == [1, 2, 3, 4]
+    assert prompts[0].endswith("Extract conditions 1 to 4.")
+    assert prompts[1].endswith("Extract conditions 3.")
+
+
+def test_conditions_still_missing_are_left_out(monkeypatch):
+    """After the last attempt the range keeps what was found instead of failing."""
+    prompts = _use_client(monkeypatch, [[1, 4], [2], [2]])
+
+    _, arguments = _extract_numbered_range(DOCUMENT, 1, 4)
+
+    assert [c["condition_number"] for c in json.loads(arguments)["conditions"]] == [1, 2, 4]
+    assert prompts[1].endswith("Extract conditions 2 and 3.")
+    assert prompts[2].endswith("Extract conditions 3.")
+
+
+def test_complete_answer_is_returned_unchanged(monkeypatch):
+    _use_client(monkeypatch, [[1, 2, 3, 4]])
+
+    completion, arguments = _extract_numbered_range(DOCUMENT, 1, 4)
+
+    assert completion is not None
+    assert arguments != NUMBERED_RANGE_FAILURE
@@ -0,0 +1,128 @@
+"""Tests for the streaming PDF reader."""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from condition_cron.extraction import pdf_reader
+
+# The synthetic PDF writer is shared with the benchmarks.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+from synthetic_pdf import page_lines, table_rows, write_pdf  # noqa: E402
+
+
+class _FakePage:
+    def __init__(self, text, closed):
+        self.text = text
+        self.closed = closed
+
+    def extract_text(self):
+        return self.text
+
+    def close(self):
+        self.closed.append(self.text)
+
+
+class _FakePdf:
+    def __init__(self, texts):
+        self.closed = []
+        self.pages = [_FakePage(text, self.closed) for text in texts]
+        self.doc = SimpleNamespace(_cached_objs={1: b"image"})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def _open(monkeypatch, texts):
+    pdf = _FakePdf(texts)
+    monkeypatch.setattr(pdf_reader.pdfplumber, "open", lambda path: pdf)
+    return pdf
+
+
+def test_pages_are_released_as_they_are_read(monkeypatch):
+    """Each page is closed, and the parser's object cache cleared, before the next is read."""
+    pdf = _open(monkeypatch, ["one", None, "three"])
+    pages = pdf_reader.iter_pdf_pages("doc.pdf", backend="pdfplumber")
+
+    assert next(pages) == "one"
+    assert pdf.closed == []
+    assert next(pages) == ""
+    assert pdf.closed == ["one"]
+    assert pdf.doc._cached_objs == {}
+    assert list(pages) == ["three"]
+    assert pdf.closed == ["one", None, "three"]
+
+
+def test_read_pdf_keeps_its_layout(monkeypatch):
+    """Empty pages are skipped and every page ends with a newline."""
+    _open(monkeypatch, ["one", None, "three"])
+    assert pdf_reader.read_pdf("doc.pdf", backend="pdfplumber") == "one\nthree\n"
+
+
+def test_memory_guard_stops_parsing(monkeypatch):
+    """Passing the RSS limit raises instead of reading further pages."""
+    pdf = _open(monkeypatch, ["one", "two", "three"])
+    monkeypatch.setattr(pdf_reader, "current_rss_mb", lambda: 900.0)
+
+    with pytest.raises(pdf_reader.PdfMemoryLimitError):
+        pdf_reader.read_pdf_pages("doc.pdf", max_rss_mb=512, backend="pdfplumber")
+    assert pdf.closed == ["one"]
+
+
+def test_current_rss_is_reported():
+    assert pdf_reader.current_rss_mb() > 0
+
+
+def test_pdfminer_object_cache_is_still_there(tmp_path):
+    """_release_page clears pdfminer's private object cache; fail loudly if an upgrade renames it."""
+    path = write_pdf(str(tmp_path / "conditions.pdf"), pages=2, lines_per_page=5)
+
+    with pdf_reader.pdfplumber.open(path) as pdf:
+        page = pdf.pages[0]
+        page.extract_text()
+        assert pdf.doc._cached_objs
+        pdf_reader._release_page(pdf, page)
+        assert pdf.doc._cached_objs == {}
+
+
+def test_pdfium_text_matches_pdfplumber(tmp_path):
+    """Both text backends return the same page layout."""
+    path = write_pdf(str(tmp_path / "conditions.pdf"), pages=2, lines_per_page=5)
+
+    fast = pdf_reader.read_pdf_pages(path, backend="pdfium")
+
+    assert fast == pdf_reader.read_pdf_pages(path, backend="pdfplumber")
+    assert fast[1].splitlines()[1:] == page_lines(2, 5)[1:]
+
+
+def test_tables_are_only_scanned_on_pages_with_ruling_lines(tmp_path):
+    """Pages without drawn lines are skipped without changing the result."""
+    path = write_pdf(str(tmp_path / "conditions.pdf"), pages=3, lines_per_page=5, table_every=2)
+
+    assert pdf_reader.table_candidate_pages(path) == {2}
+    tables = pdf_reader.read_pdf_page_tables(path)
+    assert tables == [[], [table_rows(2)], []]
+    assert tables == pdf_reader.read_pdf_page_tables(path, skip_pages_without_lines=False)
+
+
+def test_process_pool_returns_pages_in_order(tmp_path):
+    """Page ranges read by worker processes are reassembled in page order."""
+    path = write_pdf(str(tmp_path / "conditions.pdf"), pages=5, lines_per_page=3, table_every=2)
+
+    assert pdf_reader.read_pdf_pages(path, processes=2, min_pages=1) == pdf_reader.read_pdf_pages(path)
+    assert pdf_reader.read_pdf_page_tables(path, processes=2, min_pages=1) == [
+        [], [table_rows(2)], [], [table_rows(4)], [],
+    ]
+
+
+def test_short_documents_stay_in_process(tmp_path, monkeypatch):
+    """Below the page threshold no worker processes are started."""
+    path = write_pdf(str(tmp_path / "conditions.pdf"), pages=3, lines_per_page=3)
+    monkeypatch.setattr(pdf_reader, "ProcessPoolExecutor", None)
+
+    assert len(pdf_reader.read_pdf_pages(path, processes=4, min_pages=10)) == 3
@@ -0,0 +1,53 @@
+"""Tests for the lexical pre-filter in front of the gating calls."""
+
+import json
+from types import SimpleNamespace
+
+from condition_cron.extraction.management_plans import management_plan_required
+from condition_cron.extraction.prefilter import prefilter_stats_snapshot
+from condition_cron.extraction.reports import report_submission_required
+
+NO_TRIGGERS = "The Holder must not clear vegetation within 30 m of a watercourse."
+
+
+def _client(answer, calls):
+    def create(**kwargs):
+        calls.append(kwargs["tool_choice"]["function"]["name"])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(tool_calls=[
+            SimpleNamespace(function=SimpleNamespace(arguments=json.dumps(answer)))
+        ]))])
+
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def test_on_mode_answers_trigger_free_conditions_locally(monkeypatch):
+    """No plan/report wording means no gating call at all."""
+    calls = []
+    monkeypatch.setenv("EXTRACTION_LEXICAL_PREFILTER", "on")
+    monkeypatch.setattr(
+        "condition_cron.extraction.management_plans.get_openai_client",
+        lambda: _client({"requires_plan": True}, calls),
+    )
+
+    assert management_plan_required(NO_TRIGGERS) is False
+    assert calls == []
+    assert management_plan_required("The Holder must develop a Wildlife Management Plan.") is True
+    assert calls == ["extract_info"]
+
+
+def test_shadow_mode_still_asks_and_counts_disagreements(monkeypatch):
+    """Shadow mode keeps the model's answer and records where the filter would have been wrong."""
+    calls = []
+    monkeypatch.setenv("EXTRACTION_LEXICAL_PREFILTER", "shadow")
+    monkeypatch.setattr(
+        "condition_cron.extraction.reports.get_openai_client",
+        lambda: _client({"requires_report": True}, calls),
+    )
+    before = prefilter_stats_snapshot().get("report_submissions", {})
+
+    assert report_submission_required(NO_TRIGGERS) is True
+
+    after = prefilter_stats_snapshot()["report_submissions"]
+    assert calls == ["extract_info"]
+    assert after["missed"] == before.get("missed", 0) + 1
+    assert after["skipped"] == before.get("skipped", 0)
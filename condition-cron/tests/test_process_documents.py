@@ -1,9 +1,17 @@
 """Tests for document processing orchestration."""
 
+import threading
+
 from condition_cron.tasks.process_documents import ProcessDocuments
 from condition_cron.services import extraction_service
 
 
+def _claim_once(request):
+    """Return a claim stub that hands out `request` once, then an empty queue."""
+    queue = [request]
+    return lambda worker_id: queue.pop() if queue else None
+
+
 def test_process_skips_save_when_request_was_rejected(monkeypatch, tmp_path):
     """A request rejected mid-process should not be overwritten as completed."""
     downloaded = tmp_path / "document.pdf"
@@ -11,8 +19,8 @@ def test_process_skips_save_when_request_was_rejected(monkeypatch, tmp_path):
     calls = {"saved": False, "failed": False}
 
     monkeypatch.setattr(
-        "condition_cron.tasks.process_documents.db_service.get_pending_requests",
-        lambda: [{
+        "condition_cron.tasks.process_documents.db_service.claim_next_request",
+        _claim_once({
             "id": 1,
             "s3_url": "condition_extraction_documents/document.pdf",
             "project_id": "project-1",
@@ -24,11 +32,7 @@ def test_process_skips_save_when_request_was_rejected(monkeypatch, tmp_path):
             "document_type": "Certificate",
             "date_issued": None,
             "act": None,
-        }],
-    )
-    monkeypatch.setattr(
-        "condition_cron.tasks.process_documents.db_service.mark_processing",
-        lambda request_id: None,
+        }),
     )
     monkeypatch.setattr(
         "condition_cron.tasks.process_documents.s3_service.download_file",
@@ -36,7 +40,7 @@ def test_process_skips_save_when_request_was_rejected(monkeypatch, tmp_path):
     )
     monkeypatch.setattr(
         "condition_cron.tasks.process_documents.extraction_service.extract_and_enrich",
-        lambda path: {"conditions": []},
+        lambda path, checkpoint=None: {"conditions": []},
     )
     monkeypatch.setattr(
         "condition_cron.tasks.process_documents.db_service.get_request_status",
@@ -44,11 +48,11 @@ def test_process_skips_save_when_request_was_rejected(monkeypatch, tmp_path):
     )
     monkeypatch.setattr(
         "condition_cron.tasks.process_documents.db_service.save_extraction_result",
-        lambda request_id, extracted_data: calls.update(saved=True),
+        lambda request_id, worker_id, extracted_data, metrics=None: calls.update(saved=True) or True,
     )
     monkeypatch.setattr(
         "condition_cron.tasks.process_documents.db_service.mark_failed",
-        lambda request_id, error_message: calls.update(failed=True),
+        lambda request_id, worker_id, error_message: calls.update(failed=True) or True,
     )
 
     ProcessDocuments.process()
@@ -71,8 +75,8 @@ def test_process_marks_unsupported_documents(monkeypatch, tmp_path):
     calls = {"saved": False, "failed": False, "unsupported": False}
 
     monkeypatch.setattr(
-        "condition_cron.tasks.process_documents.db_service.get_pending_requests",
-        lambda: [{
+        "condition_cron.tasks.process_documents.db_service.claim_next_request",
+        _claim_once({
             "id": 2,
             "s3_url": "condition_extraction_documents/rental.pdf",
             "project_id": "project-1",
@@ -84,18 +88,14 @@ def test_process_marks_unsupported_documents(monkeypatch, tmp_path):
             "document_type": "Certificate",
             "date_issued": None,
             "act": None,
-        }],
-    )
-    monkeypatch.setattr(
-        "condition_cron.tasks.process_documents.db_service.mark_processing",
-        lambda request_id: None,
+        }),
     )
     monkeypatch.setattr(
         "condition_cron.tasks.process_documents.s3_service.download_file",
         lambda s3_key: str(downloaded),
     )
 
-    def raise_unsupported(path):  # noqa: ARG001
+    def raise_unsupported(path, checkpoint=None):  # noqa: ARG001
         raise extraction_service.UnsupportedDocumentError(eligibility)
 
     monkeypatch.setattr(
@@ -108,19 +108,19 @@ def test_process_marks_unsupported_documents(monkeypatch, tmp_path):
     )
     monkeypatch.setattr(
         "condition_cron.tasks.process_documents.db_service.mark_unsupported",
-        lambda request_id, reason, extracted_eligibility: calls.update(
+        lambda request_id, worker_id, reason, extracted_eligibility: calls.update(
             unsupported=True,
             reason=reason,
             eligibility=extracted_eligibility,
-        ),
+        ) or True,
     )
     monkeypatch.setattr(
         "condition_cron.tasks.process_documents.db_service.save_extraction_result",
-        lambda request_id, extracted_data: calls.update(saved=True),
+        lambda request_id, worker_id, extracted_data, metrics=None: calls.update(saved=True) or True,
     )
     monkeypatch.setattr(
         "condition_cron.tasks.process_documents.db_service.mark_failed",
-        lambda request_id, error_message: calls.update(failed=True),
+        lambda request_id, worker_id, error_message: calls.update(failed=True) or True,
     )
 
     ProcessDocuments.process()
@@ -129,3 +129,115 @@ def test_process_marks_unsupported_documents(monkeypatch, tmp_path):
     assert calls["eligibility"] == eligibility
     assert calls["saved"] is False
     assert calls["failed"] is False
+
+
+def test_process_drains_queue_until_empty(monkeypatch, tmp_path):
+    """A worker keeps claiming requests until the queue has nothing left."""
+    downloaded = tmp_path / "document.pdf"
+    claimed = []
+    saved = []
+    queue = [
+        {
+            "id": request_id,
+            "s3_url": f"condition_extraction_documents/{request_id}.pdf",
+            "project_id": "project-1",
+            "document_id": None,
+            "project_name": None,
+            "project_type": None,
+            "document_label": None,
+            "document_file_name": None,
+            "document_type": None,
+            "date_issued": None,
+            "act": None,
+        }
+        for request_id in (3, 2, 1)
+    ]
+
+    def claim(worker_id):
+        claimed.append(worker_id)
+        return queue.pop() if queue else None
+
+    def download(s3_key):  # noqa: ARG001
+        downloaded.write_text("pdf")
+        return str(downloaded)
+
+    monkeypatch.setattr("condition_cron.tasks.process_documents.db_service.claim_next_request", claim)
+    monkeypatch.setattr("condition_cron.tasks.process_documents.s3_service.download_file", download)
+    monkeypatch.setattr(
+        "condition_cron.tasks.process_documents.extraction_service.extract_and_enrich",
+        lambda path, checkpoint=None: {"conditions": []},
+    )
+    monkeypatch.setattr(
+        "condition_cron.tasks.process_documents.db_service.get_request_status",
+        lambda request_id: "processing",
+    )
+    monkeypatch.setattr(
+        "condition_cron.tasks.process_documents.db_service.save_extraction_result",
+        lambda request_id, worker_id, extracted_data, metrics=None: saved.append(request_id) or True,
+    )
+
+    ProcessDocuments.process()
+
+    assert saved == [1, 2, 3]
+    assert len(claimed) == 4
+    assert len(set(claimed)) == 1
+
+
+def _request(request_id):
+    return {
+        "id": request_id,
+        "s3_url": f"condition_extraction_documents/{request_id}.pdf",
+        "project_id": "project-1",
+        "document_id": None,
+        "project_name": None,
+        "project_type": None,
+        "document_label": None,
+        "document_file_name": None,
+        "document_type": None,
+        "date_issued": None,
+        "act": None,
+    }
+
+
+def _extract_in_place(monkeypatch, tmp_path):
+    downloaded = tmp_path / "document.pdf"
+    downloaded.write_text("pdf")
+    monkeypatch.setattr("condition_cron.tasks.process_documents.s3_service.download_file", lambda s3_key: str(downloaded))
+    monkeypatch.setattr(
+        "condition_cron.tasks.process_documents.extraction_service.extract_and_enrich",
+        lambda path, checkpoint=None: {"conditions": []},
+    )
+    monkeypatch.setattr(
+        "condition_cron.tasks.process_documents.db_service.get_request_status",
+        lambda request_id: "processing",
+    )
+
+
+def test_result_is_dropped_after_heartbeat_lost_the_lease(monkeypatch, tmp_path):
+    """Once the heartbeat reports the lease gone, the worker writes nothing."""
+    _extract_in_place(monkeypatch, tmp_path)
+    saved = []
+    monkeypatch.setattr(
+        "condition_cron.tasks.process_documents.db_service.save_extraction_result",
+        lambda request_id, worker_id, extracted_data, metrics=None: saved.append(request_id) or True,
+    )
+    lease_lost = threading.Event()
+    lease_lost.set()
+
+    outcome = ProcessDocuments._process_request(_request(4), "worker-1", lease_lost=lease_lost)
+
+    assert outcome == "skipped"
+    assert saved == []
+
+
+def test_result_written_after_lease_moved_on_is_skipped(monkeypatch, tmp_path):
+    """A final write that matches no row (another worker re-claimed it) is not a success."""
+    _extract_in_place(monkeypatch, tmp_path)
+    monkeypatch.setattr(
+        "condition_cron.tasks.process_documents.db_service.save_extraction_result",
+        lambda request_id, worker_id, extracted_data, metrics=None: False,
+    )
+
+    outcome = ProcessDocuments._process_request(_request(5), "worker-1", lease_lost=threading.Event())
+
+    assert outcome == "skipped"
@@ -0,0 +1,97 @@
+"""Tests for the process-wide LLM rate limiter and retry policy."""
+
+import time
+
+import httpx
+import openai
+import pytest
+
+from condition_cron.extraction.rate_limit import AdaptiveConcurrency, RateLimiter, request_tokens, retry_after
+
+REQUEST = httpx.Request("POST", "http://extractor/v1/chat/completions")
+
+
+def _error(status, headers=None):
+    response = httpx.Response(status, headers=headers or {}, request=REQUEST)
+    error_class = openai.RateLimitError if status == 429 else openai.InternalServerError
+    return error_class("error", response=response, body=None)
+
+
+def _flaky(*errors):
+    """A create() that raises `errors` in turn, then succeeds."""
+    remaining = list(errors)
+    calls = []
+
+    def create():
+        calls.append(time.monotonic())
+        if remaining:
+            raise remaining.pop(0)
+        return "completion"
+
+    return create, calls
+
+
+def test_token_budget_paces_requests():
+    """A 6000 tokens/minute budget lets 1000 tokens through, then 100 tokens per second."""
+    limiter = RateLimiter(0, tokens_per_minute=6000)
+    started = time.monotonic()
+    limiter.acquire(1000)
+    limiter.acquire(20)
+
+    assert time.monotonic() - started >= 0.19
+
+
+def test_retry_after_is_honoured_for_every_caller():
+    limiter = RateLimiter(0, max_retries=2)
+    create, calls = _flaky(_error(429, {"retry-after": "0.2"}))
+
+    assert limiter.call(create) == "completion"
+    assert calls[1] - calls[0] >= 0.2
+    stats = limiter.stats.snapshot()
+    assert (stats["requests"], stats["retries"], stats["rate_limited"]) == (2, 1, 1)
+    assert stats["throttled_seconds"] >= 0.2
+
+
+def test_server_errors_retry_until_the_budget_runs_out():
+    limiter = RateLimiter(0, max_retries=1, backoff_max_seconds=0.01)
+    create, calls = _flaky(_error(500), _error(503))
+
+    with pytest.raises(openai.InternalServerError):
+        limiter.call(create)
+    assert len(calls) == 2
+    assert limiter.stats.snapshot()["server_errors"] == 2
+
+
+def test_client_errors_are_not_retried():
+    limiter = RateLimiter(0, max_retries=3)
+    create, calls = _flaky(ValueError("bad request body"))
+
+    with pytest.raises(ValueError):
+        limiter.call(create)
+    assert len(calls) == 1
+
+
+def test_concurrency_halves_on_throttling_and_recovers():
+    concurrency = AdaptiveConcurrency(8)
+    for _ in range(4):
+        concurrency.enter()
+    concurrency.decrease()
+    concurrency.decrease()  # same overload; ignored
+
+    assert concurrency.limit == 2
+    # About one more request per cap's worth of successes: 2 + 3 + ... + 7.
+    for _ in range(30):
+        concurrency.increase()
+    assert concurrency.limit == 8
+
+
+def test_retry_after_parsing():
+    assert retry_after(_error(429, {"retry-after-ms": "1500"})) == 1.5
+    assert retry_after(_error(429, {"retry-after": "3"})) == 3.0
+    assert retry_after(_error(429)) is None
+
+
+def test_request_tokens_counts_prompt_tools_and_response():
+    request = {"messages": [{"role": "user", "content": "one two three"}], "max_tokens": 50}
+
+    assert request_tokens(request) == 53
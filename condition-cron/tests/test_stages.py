@@ -0,0 +1,71 @@
+"""Tests for the pipeline stage executor."""
+
+import threading
+
+import pytest
+
+from condition_cron.extraction.stages import Stage, run_stages
+
+
+def test_independent_stages_run_concurrently():
+    """Both first stages must be running at once to pass the barrier."""
+    barrier = threading.Barrier(2, timeout=5)
+
+    def meet(_):
+        barrier.wait()
+        return True
+
+    run = run_stages([
+        Stage("eligibility", meet),
+        Stage("classification", meet),
+        Stage("extraction", lambda inputs: sorted(inputs), after=("eligibility", "classification")),
+    ])
+
+    assert run.results["extraction"] == ["classification", "eligibility"]
+    assert set(run.timings) == {"eligibility", "classification", "extraction"}
+
+
+def test_failure_cancels_downstream_stages():
+    started = []
+
+    def unsupported(_):
+        raise LookupError("unsupported")
+
+    with pytest.raises(LookupError):
+        run_stages([
+            Stage("eligibility", unsupported),
+            Stage("classification", lambda _: started.append("classification")),
+            Stage("extraction", lambda _: started.append("extraction"), after=("eligibility", "classification")),
+        ])
+
+    assert "extraction" not in started
+
+
+def test_earliest_listed_failure_is_raised():
+    release = threading.Event()
+
+    def eligibility(_):
+        release.wait(5)
+        raise LookupError("unsupported")
+
+    def classification(_):
+        release.set()
+        raise RuntimeError("classification failed")
+
+    with pytest.raises(LookupError):
+        run_stages([Stage("eligibility", eligibility), Stage("classification", classification)])
+
+
+def test_single_worker_runs_stages_in_order():
+    order = []
+    run_stages(
+        [Stage(name, lambda _, name=name: order.append(name)) for name in ("a", "b", "c")],
+        max_workers=1,
+    )
+
+    assert order == ["a", "b", "c"]
+
+
+def test_unknown_dependency_is_rejected():
+    with pytest.raises(ValueError):
+        run_stages([Stage("extraction", lambda _: None, after=("classification",))])
@@ -0,0 +1,89 @@
+"""Tests for local parsing of table_format commitment tables."""
+
+import json
+from types import SimpleNamespace
+
+from condition_cron.extraction.document import ParsedDocument
+from condition_cron.extraction.extractor import extract_conditions_from_pages
+from condition_cron.extraction.table_rows import parse_table_pages
+
+HEADER = ["Ref #", "Commitment"]
+WILDLIFE_TABLE = [
+    HEADER,
+    ["Wildlife & Terrestrial Resources", None],
+    ["C1", "The Holder must survey\nbird nests before clearing."],
+    ["C2", "The Holder must:\n• fence the site\n• report\nincidents"],
+]
+
+
+def _page_text(table):
+    return "\n".join(" ".join(cell or "" for cell in row) for row in table)
+
+
+def test_rows_become_named_conditions_across_pages():
+    """Headings and column layout carry over to a continuation page without a header row."""
+    continuation = [["C3", "The Holder must monitor dens."], [None, "Monitoring continues for two years."]]
+    pages = [_page_text(WILDLIFE_TABLE), _page_text(continuation)]
+
+    parsed = parse_table_pages(pages, [[WILDLIFE_TABLE], [continuation]])
+
+    assert parsed.pages == {
+        1: [
+            {"condition_name": "C1 - Wildlife & Terrestrial Resources",
+             "condition_text": "The Holder must survey bird nests before clearing."},
+            {"condition_name": "C2 - Wildlife & Terrestrial Resources",
+             "condition_text": "The Holder must:\n• fence the site\n• report incidents"},
+        ],
+        2: [
+            {"condition_name": "C3 - Wildlife & Terrestrial Resources",
+             "condition_text": "The Holder must monitor dens.\nMonitoring continues for two years."},
+        ],
+    }
+
+
+def test_unclear_pages_are_left_to_the_model():
+    """Rows without a Subject Area, or prose outside the table, are not parsed locally."""
+    no_subject = [HEADER, ["C1", "The Holder must survey bird nests."]]
+    prose = "The following commitments apply during construction and operations of the mine.\n"
+
+    parsed = parse_table_pages(
+        [_page_text(no_subject), prose * 3 + _page_text(WILDLIFE_TABLE)],
+        [[no_subject], [WILDLIFE_TABLE]],
+    )
+
+    assert parsed.pages == {}
+
+
+def test_parsed_pages_are_only_tagged_by_the_model(monkeypatch):
+    """Parsed pages skip full extraction; other pages are still sent for extraction."""
+    monkeypatch.setenv("EXTRACTION_TABLE_PARSER", "true")
+    tool_calls = []
+
+    def create(**kwargs):
+        name = kwargs["tool_choice"]["function"]["name"]
+        tool_calls.append(name)
+        if name == "tag_conditions":
+            arguments = {"tags": [{"index": 1, "topic_tags": ["Environment"], "subtopic_tags": []}]}
+        else:
+            arguments = {"conditions": [{
+                "condition_name": "General", "condition_number": 1, "condition_text": "Prose commitment.",
+                "topic_tags": [], "subtopic_tags": [],
+            }]}
+        return SimpleNamespace(choices=[SimpleNamespace(
+            finish_reason="stop",
+            message=SimpleNamespace(tool_calls=[SimpleNamespace(function=SimpleNamespace(arguments=json.dumps(arguments)))]),
+        )])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr("condition_cron.extraction.extractor.get_openai_client", lambda: client)
+    document = ParsedDocument(file_path="commitments.pdf", pages=["Prose commitment.", _page_text(WILDLIFE_TABLE)])
+    document._tables = [[], [WILDLIFE_TABLE]]
+
+    result = extract_conditions_from_pages(document, {"document_type": "table_format"})
+
+    assert sorted(tool_calls) == ["format_conditions", "tag_conditions"]
+    assert [c["condition_name"] for c in result["conditions"]] == [
+        "General", "C1 - Wildlife & Terrestrial Resources", "C2 - Wildlife & Terrestrial Resources",
+    ]
+    assert [c["condition_number"] for c in result["conditions"]] == [1, 2, 3]
+    assert result["conditions"][1]["topic_tags"] == ["Environment"]
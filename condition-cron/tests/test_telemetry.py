@@ -0,0 +1,67 @@
+"""Tests for per-call LLM telemetry."""
+
+from types import SimpleNamespace
+
+import httpx
+import openai
+
+from condition_cron.extraction.client import ExtractorClient
+from condition_cron.extraction.concurrency import map_conditions
+from condition_cron.extraction.rate_limit import RateLimiter
+from condition_cron.extraction.telemetry import llm_stage, recording
+
+
+def _completion(finish_reason="stop"):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(finish_reason=finish_reason)],
+        usage=SimpleNamespace(prompt_tokens=100, completion_tokens=20),
+    )
+
+
+class _ThrottledOnce:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **kwargs):  # noqa: ARG002
+        self.calls += 1
+        if self.calls == 1:
+            request = httpx.Request("POST", "http://extractor/v1/chat/completions")
+            response = httpx.Response(429, headers={"retry-after-ms": "10"}, request=request)
+            raise openai.RateLimitError("slow down", response=response, body=None)
+        return _completion()
+
+
+def _client(completions):
+    return ExtractorClient(SimpleNamespace(chat=SimpleNamespace(completions=completions)), RateLimiter(0, max_retries=2))
+
+
+def test_calls_are_recorded_per_stage_and_condition():
+    client = _client(_ThrottledOnce())
+    conditions = [{"condition_number": 1}, {"condition_number": 2}]
+
+    with recording() as recorder:
+        with llm_stage("classification"):
+            client.chat.completions.create(model="m", messages=[])
+        map_conditions("deliverables", lambda c: client.chat.completions.create(model="m", messages=[]),
+                       conditions, lambda: None, max_workers=1)
+    metrics = recorder.metrics()
+
+    assert [(call["stage"], call["label"]) for call in metrics["calls"]] == [
+        ("classification", None), ("deliverables", "condition 1"), ("deliverables", "condition 2"),
+    ]
+    assert metrics["calls"][0]["retries"] == 1
+    assert metrics["llm"]["prompt_tokens"] == 300
+    assert metrics["llm_by_stage"]["deliverables"] == {
+        "calls": 2, "cached_calls": 0, "retries": 0, "prompt_tokens": 200, "completion_tokens": 40,
+        "latency_seconds": metrics["llm_by_stage"]["deliverables"]["latency_seconds"],
+        "finish_reasons": {"stop": 2},
+    }
+
+
+def test_nothing_is_recorded_outside_a_recording():
+    client = _client(_ThrottledOnce())
+    client.chat.completions.create(model="m", messages=[])
+
+    with recording() as recorder:
+        pass
+    assert recorder.metrics()["calls"] == []
@@ -62,7 +62,7 @@ def create_app() -> Flask:
         body = request.get_json(force=True, silent=True) or {}
 
         if settings.openai_api_key:
-            upstream = "https://api.openai.com/v1/chat/completions"
+            upstream = f"{settings.openai_base_url.rstrip('/')}/chat/completions"
             headers = {
                 "Authorization": f"Bearer {settings.openai_api_key}",
                 "Content-Type": "application/json",
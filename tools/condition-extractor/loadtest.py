@@ -0,0 +1,240 @@
+"""
+EPIC Condition Extractor — load test
+
+Measures how many concurrent callers the proxy sustains, without a live
+model. Starts a fake OpenAI upstream (configurable latency distribution and
+error rate), starts the proxy pointed at it (gunicorn with the Dockerfile's
+sync workers by default), then drives it at each concurrency level and
+reports throughput, p50/p99 end-to-end and added latency, and connection
+usage on both sides of the proxy.
+
+Usage
+-----
+python loadtest.py run [--concurrency 1,4,16,32] [--duration 10] [--latency-ms 500]
+                       [--distribution lognormal] [--error-rate 0.01] [--workers 2] [--threads 1]
+                       [--max-added-p99-ms 50] [--min-throughput 5] [--json results.json]
+python loadtest.py upstream --port 9000 [--latency-ms 500] ...
+
+`run --proxy-url` targets an already running proxy instead: start it with
+OPENAI_API_KEY set and OPENAI_BASE_URL=http://127.0.0.1:<port>/v1, and pass
+the same `--upstream-port`. `upstream` runs the fake upstream on its own, for
+pointing a proxy (and condition-cron behind it) at by hand.
+`--max-added-p99-ms` and `--min-throughput` make the run exit non-zero when a
+level misses them, for use as a regression check.
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from dataclasses import asdict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.loadtest import LATENCY_DISTRIBUTIONS, FakeUpstream, UpstreamProfile, run_level
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+COLUMNS = (
+    ("concurrency", "conc"),
+    ("requests", "requests"),
+    ("errors", "errors"),
+    ("throughput", "req/s"),
+    ("p50_ms", "p50 ms"),
+    ("p99_ms", "p99 ms"),
+    ("added_p50_ms", "added p50"),
+    ("added_p99_ms", "added p99"),
+    ("client_connections", "client conns"),
+    ("upstream_connections", "upstream conns"),
+    ("upstream_peak_connections", "peak upstream conns"),
+    ("upstream_peak_in_flight", "peak in flight"),
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_healthy(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(f"{url}/health", timeout=1):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise SystemExit(f"Proxy at {url} did not become healthy within {timeout:.0f}s")
+            time.sleep(0.2)
+
+
+def _proxy_env(upstream_url: str) -> dict:
+    env = dict(os.environ)
+    env.update(OPENAI_API_KEY="loadtest", OPENAI_BASE_URL=upstream_url, API_KEY="")
+    return env
+
+
+def _start_gunicorn(upstream_url: str, workers: int, threads: int):
+    port = _free_port()
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "gunicorn", "app:app",
+            "--bind", f"127.0.0.1:{port}",
+            "--workers", str(workers),
+            "--threads", str(threads),
+            "--timeout", "300",
+            "--log-level", "warning",
+        ],
+        cwd=HERE,
+        env=_proxy_env(upstream_url),
+    )
+    return f"http://127.0.0.1:{port}", process.terminate
+
+
+def _start_flask(upstream_url: str):
+    os.environ.update(_proxy_env(upstream_url))
+    from werkzeug.serving import make_server
+    from src.config import get_settings
+
+    get_settings.cache_clear()
+    from app import create_app
+
+    import logging
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", 0, create_app(), threaded=True)
+    threading.Thread(target=server.serve_forever, name="proxy", daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server.shutdown
+
+
+def _profile(args) -> UpstreamProfile:
+    return UpstreamProfile(
+        latency_ms=args.latency_ms,
+        distribution=args.distribution,
+        latency_sigma=args.latency_sigma,
+        latency_max_ms=args.latency_max_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        response_kb=args.response_kb,
+        seed=args.seed,
+    )
+
+
+def _print_table(results) -> None:
+    widths = [max(len(title), 8) for _, title in COLUMNS]
+    print("  ".join(title.rjust(width) for (_, title), width in zip(COLUMNS, widths)))
+    for result in results:
+        row = asdict(result)
+        row["errors"] = result.errors
+        print("  ".join(
+            ("-" if row[name] is None else str(row[name])).rjust(width)
+            for (name, _), width in zip(COLUMNS, widths)
+        ))
+
+
+def _check(results, args) -> list:
+    failures = []
+    for result in results:
+        if args.max_added_p99_ms is not None and (result.added_p99_ms is None or result.added_p99_ms > args.max_added_p99_ms):
+            failures.append(f"concurrency {result.concurrency}: added p99 {result.added_p99_ms} ms > {args.max_added_p99_ms} ms")
+        if args.min_throughput is not None and result.throughput < args.min_throughput:
+            failures.append(f"concurrency {result.concurrency}: {result.throughput} req/s < {args.min_throughput} req/s")
+    return failures
+
+
+def run(args) -> int:
+    upstream = FakeUpstream(_profile(args), port=args.upstream_port).start()
+    stop = None
+    try:
+        if args.proxy_url:
+            proxy_url = args.proxy_url.rstrip("/")
+        elif args.server == "gunicorn":
+            proxy_url, stop = _start_gunicorn(upstream.base_url, args.workers, args.threads)
+        else:
+            proxy_url, stop = _start_flask(upstream.base_url)
+        _wait_healthy(proxy_url)
+        print(f"Proxy {proxy_url} -> fake upstream {upstream.base_url} "
+              f"({args.distribution} latency, median {args.latency_ms:g} ms, error rate {args.error_rate:g})", flush=True)
+
+        results = []
+        for concurrency in args.concurrency:
+            results.append(run_level(proxy_url, upstream, concurrency, args.duration,
+                                     api_key=args.api_key, prompt_kb=args.prompt_kb, timeout=args.timeout))
+            print(f"  concurrency {concurrency}: {results[-1].throughput} req/s", flush=True)
+            if results[-1].requests and not results[-1].upstream_connections:
+                print(f"  warning: no requests reached {upstream.base_url}; added latency is unavailable", flush=True)
+    finally:
+        if stop:
+            stop()
+        upstream.stop()
+
+    _print_table(results)
+    if args.json:
+        with open(args.json, "w") as out:
+            json.dump([dict(asdict(result), errors=result.errors) for result in results], out, indent=2)
+    failures = _check(results, args)
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def upstream(args) -> int:
+    server = FakeUpstream(_profile(args), host=args.host, port=args.port)
+    print(f"Fake upstream listening on {server.base_url} (set OPENAI_BASE_URL to this)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _add_upstream_arguments(parser) -> None:
+    parser.add_argument("--latency-ms", type=float, default=500.0, help="median upstream latency (mean for exponential)")
+    parser.add_argument("--distribution", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="spread of the lognormal distribution")
+    parser.add_argument("--latency-max-ms", type=float, default=30000.0, help="cap on any single latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=429)
+    parser.add_argument("--response-kb", type=float, default=1.0, help="size of each completion's content")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load-test the condition-extractor proxy against a fake upstream.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="start a fake upstream and the proxy, then measure the proxy")
+    run_parser.add_argument("--concurrency", type=lambda value: [int(n) for n in value.split(",")], default=[1, 4, 16, 32],
+                            help="comma-separated concurrent callers, one level each")
+    run_parser.add_argument("--duration", type=float, default=10.0, help="seconds per concurrency level")
+    run_parser.add_argument("--prompt-kb", type=float, default=8.0, help="size of each request's prompt")
+    run_parser.add_argument("--timeout", type=float, default=130.0, help="client timeout per request")
+    run_parser.add_argument("--proxy-url", help="measure an already running proxy instead of starting one")
+    run_parser.add_argument("--api-key", default="", help="API_KEY of the proxy given by --proxy-url")
+    run_parser.add_argument("--server", choices=("gunicorn", "flask"), default="gunicorn" if os.name != "nt" else "flask",
+                            help="how to start the proxy; gunicorn matches the Dockerfile")
+    run_parser.add_argument("--workers", type=int, default=2, help="gunicorn workers")
+    run_parser.add_argument("--threads", type=int, default=1, help="gunicorn threads per worker")
+    run_parser.add_argument("--upstream-port", type=int, default=0, help="fake upstream port (0 picks a free one)")
+    run_parser.add_argument("--max-added-p99-ms", type=float, help="fail when any level's added p99 exceeds this")
+    run_parser.add_argument("--min-throughput", type=float, help="fail when any level's req/s falls below this")
+    run_parser.add_argument("--json", help="write the per-level results here")
+    _add_upstream_arguments(run_parser)
+    run_parser.set_defaults(handler=run)
+
+    upstream_parser = commands.add_parser("upstream", help="run only the fake upstream")
+    upstream_parser.add_argument("--host", default="127.0.0.1")
+    upstream_parser.add_argument("--port", type=int, default=9000)
+    _add_upstream_arguments(upstream_parser)
+    upstream_parser.set_defaults(handler=upstream)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
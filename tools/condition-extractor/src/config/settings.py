@@ -15,6 +15,7 @@ class Settings(BaseSettings):
     azure_openai_deployment: str = Field("", alias="AZURE_OPENAI_DEPLOYMENT")
     azure_openai_api_version: str = Field("2024-10-21", alias="AZURE_OPENAI_API_VERSION")
     openai_api_key: str = Field("", alias="OPENAI_API_KEY")
+    openai_base_url: str = Field("https://api.openai.com/v1", alias="OPENAI_BASE_URL")
     api_key: str = Field("", alias="API_KEY")
     port: int = Field(8000, alias="PORT")
 
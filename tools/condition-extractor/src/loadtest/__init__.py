@@ -0,0 +1,12 @@
+from .fake_upstream import LATENCY_DISTRIBUTIONS, FakeUpstream, UpstreamProfile, UpstreamStats
+from .generator import LevelResult, percentile, run_level
+
+__all__ = [
+    "LATENCY_DISTRIBUTIONS",
+    "FakeUpstream",
+    "UpstreamProfile",
+    "UpstreamStats",
+    "LevelResult",
+    "percentile",
+    "run_level",
+]
@@ -0,0 +1,186 @@
+"""
+Fake OpenAI chat completions upstream for load-testing the proxy.
+
+Answers POST .../chat/completions with a small, valid chat.completion after a
+latency drawn from a configurable distribution, and answers a configurable
+share of requests with an error status instead. It counts the TCP connections
+the proxy opens to it and how many are open at once, and records how long it
+spent on each request, keyed by the request's `user` field, so the load
+generator can subtract upstream time from end-to-end time.
+"""
+
+import json
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+
+@dataclass
+class UpstreamProfile:
+    """How the fake upstream behaves; `latency_ms` is the median (mean for exponential)."""
+
+    latency_ms: float = 500.0
+    distribution: str = "lognormal"
+    latency_sigma: float = 0.5
+    latency_max_ms: float = 30000.0
+    error_rate: float = 0.0
+    error_status: int = 429
+    response_kb: float = 1.0
+    seed: int = 0
+
+    def __post_init__(self):
+        if self.distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution {self.distribution!r}; use one of {', '.join(LATENCY_DISTRIBUTIONS)}")
+
+
+@dataclass
+class UpstreamStats:
+    """Counters since the last reset; `service_seconds` maps request `user` to time spent upstream."""
+
+    requests: int = 0
+    errors: int = 0
+    connections: int = 0
+    peak_connections: int = 0
+    peak_in_flight: int = 0
+    service_seconds: Dict[str, float] = field(default_factory=dict)
+
+
+class FakeUpstream:
+    """A threaded HTTP server playing the model behind the proxy."""
+
+    def __init__(self, profile: UpstreamProfile, host: str = "127.0.0.1", port: int = 0):
+        self.profile = profile
+        self._lock = threading.Lock()
+        self._rng = random.Random(profile.seed)
+        self._open_connections = 0
+        self._in_flight = 0
+        self.stats = UpstreamStats()
+        self._server = ThreadingHTTPServer((host, port), _handler(self))
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeUpstream":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-upstream", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset(self) -> UpstreamStats:
+        """Return the stats so far and start counting afresh."""
+        with self._lock:
+            stats, self.stats = self.stats, UpstreamStats()
+            self.stats.peak_connections = self._open_connections
+            self.stats.peak_in_flight = self._in_flight
+            return stats
+
+    def _draw(self):
+        """(latency seconds, error?) for the next request."""
+        profile = self.profile
+        with self._lock:
+            median = profile.latency_ms / 1000
+            if profile.distribution == "fixed":
+                latency = median
+            elif profile.distribution == "uniform":
+                latency = self._rng.uniform(0, 2 * median)
+            elif profile.distribution == "exponential":
+                latency = self._rng.expovariate(1 / median) if median else 0.0
+            else:
+                latency = median * math.exp(self._rng.gauss(0, profile.latency_sigma))
+            return min(latency, profile.latency_max_ms / 1000), self._rng.random() < profile.error_rate
+
+    def _connected(self, delta: int) -> None:
+        with self._lock:
+            self._open_connections += delta
+            if delta > 0:
+                self.stats.connections += 1
+                self.stats.peak_connections = max(self.stats.peak_connections, self._open_connections)
+
+    def _request_started(self) -> None:
+        with self._lock:
+            self.stats.requests += 1
+            self._in_flight += 1
+            self.stats.peak_in_flight = max(self.stats.peak_in_flight, self._in_flight)
+
+    def _request_finished(self, user: Optional[str], seconds: float, error: bool) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self.stats.errors += error
+            if user:
+                self.stats.service_seconds[user] = seconds
+
+    def _completion(self, body: dict) -> dict:
+        content = "x" * int(self.profile.response_kb * 1024)
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+
+def _handler(upstream: FakeUpstream):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            upstream._connected(1)
+
+        def finish(self):
+            try:
+                super().finish()
+            finally:
+                upstream._connected(-1)
+
+        def log_message(self, *args):
+            return
+
+        def _send(self, status: int, payload: dict):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._send(200, {"status": "ok"})
+
+        def do_POST(self):
+            started = time.perf_counter()
+            raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if not self.path.split("?")[0].rstrip("/").endswith("/chat/completions"):
+                self._send(404, {"error": "not found"})
+                return
+            upstream._request_started()
+            body = json.loads(raw or b"{}")
+            latency, error = upstream._draw()
+            try:
+                time.sleep(latency)
+                if error:
+                    self._send(upstream.profile.error_status, {"error": {"message": "Injected error (fake upstream)"}})
+                else:
+                    self._send(200, upstream._completion(body))
+            finally:
+                upstream._request_finished(body.get("user"), time.perf_counter() - started, error)
+
+    return Handler
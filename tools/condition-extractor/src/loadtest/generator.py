@@ -0,0 +1,161 @@
+"""
+Closed-loop load generator for the proxy.
+
+`run_level` keeps `concurrency` callers busy for `duration` seconds, each
+sending chat completion requests back to back over its own keep-alive
+connection, the way concurrent condition-cron workers do. Every request
+carries a unique `user` so its end-to-end time can be matched with the time
+the fake upstream spent on it; the difference is the latency the proxy adds.
+"""
+
+import http.client
+import json
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from .fake_upstream import FakeUpstream, UpstreamStats
+
+
+@dataclass
+class LevelResult:
+    """Measurements for one concurrency level."""
+
+    concurrency: int
+    seconds: float
+    requests: int
+    statuses: Dict[str, int]
+    throughput: float
+    p50_ms: float
+    p99_ms: float
+    added_p50_ms: Optional[float]
+    added_p99_ms: Optional[float]
+    client_connections: int
+    upstream_connections: int
+    upstream_peak_connections: int
+    upstream_peak_in_flight: int
+
+    @property
+    def errors(self) -> int:
+        return sum(count for status, count in self.statuses.items() if not status.startswith("2"))
+
+
+@dataclass
+class _Worker:
+    latencies: List[float] = field(default_factory=list)
+    users: List[str] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    connections: int = 0
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of `values` (q in 0..100), or None when empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+class _CountingConnection(http.client.HTTPConnection):
+    def __init__(self, worker: _Worker, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._worker = worker
+
+    def connect(self):
+        super().connect()
+        self._worker.connections += 1
+
+
+def _request_body(prompt_kb: float, user: str) -> bytes:
+    return json.dumps({
+        "model": "loadtest",
+        "user": user,
+        "messages": [
+            {"role": "system", "content": "You extract conditions from documents."},
+            {"role": "user", "content": "x" * int(prompt_kb * 1024)},
+        ],
+    }).encode()
+
+
+def _call(worker: _Worker, proxy_url: str, api_key: str, prompt_kb: float, deadline: float, index: int,
+          timeout: float) -> None:
+    parts = urlsplit(proxy_url)
+    path = f"{parts.path.rstrip('/')}/v1/chat/completions"
+    headers = {"Content-Type": "application/json"}
+    if api_key:
+        headers["Authorization"] = f"Bearer {api_key}"
+    conn = _CountingConnection(worker, parts.hostname, parts.port or 80, timeout=timeout)
+    sent = 0
+    try:
+        while time.perf_counter() < deadline:
+            user = f"loadtest-{index}-{sent}"
+            body = _request_body(prompt_kb, user)
+            started = time.perf_counter()
+            try:
+                conn.request("POST", path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                status = str(response.status)
+            except (OSError, http.client.HTTPException) as exc:
+                conn.close()
+                status = type(exc).__name__
+            worker.latencies.append(time.perf_counter() - started)
+            worker.users.append(user if status == "200" else "")
+            worker.statuses[status] += 1
+            sent += 1
+    finally:
+        conn.close()
+
+
+def run_level(proxy_url: str, upstream: Optional[FakeUpstream], concurrency: int, duration: float,
+              api_key: str = "", prompt_kb: float = 8.0, timeout: float = 130.0) -> LevelResult:
+    """Drive the proxy with `concurrency` callers for `duration` seconds and measure it."""
+    if upstream is not None:
+        upstream.reset()
+    workers = [_Worker() for _ in range(concurrency)]
+    started = time.perf_counter()
+    deadline = started + duration
+    threads = [
+        threading.Thread(target=_call, args=(worker, proxy_url, api_key, prompt_kb, deadline, i, timeout), daemon=True)
+        for i, worker in enumerate(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stats = upstream.reset() if upstream is not None else UpstreamStats()
+
+    latencies = [latency for worker in workers for latency in worker.latencies]
+    added = [
+        latency - stats.service_seconds[user]
+        for worker in workers
+        for latency, user in zip(worker.latencies, worker.users)
+        if user in stats.service_seconds
+    ]
+    statuses = Counter()
+    for worker in workers:
+        statuses.update(worker.statuses)
+
+    def ms(value):
+        return None if value is None else round(value * 1000, 1)
+
+    return LevelResult(
+        concurrency=concurrency,
+        seconds=round(elapsed, 2),
+        requests=len(latencies),
+        statuses=dict(statuses),
+        throughput=round(statuses.get("200", 0) / elapsed, 2),
+        p50_ms=ms(percentile(latencies, 50)),
+        p99_ms=ms(percentile(latencies, 99)),
+        added_p50_ms=ms(percentile(added, 50)),
+        added_p99_ms=ms(percentile(added, 99)),
+        client_connections=sum(worker.connections for worker in workers),
+        upstream_connections=stats.connections,
+        upstream_peak_connections=stats.peak_connections,
+        upstream_peak_in_flight=stats.peak_in_flight,
+    )